@@ -0,0 +1,355 @@
+#============================================================================
+# Name        : course_planner_benchmark.py
+# Author      : Bryan Pirrone
+# Version     : 1.0
+# Description : Reproducible benchmarks for the course planners in Enhancement_3 and Enhanced_Artifact.
+#               Generates synthetic catalogs (sorted, random or skewed ID order; mixed, deep-chain or
+#               wide fan-in prerequisites) at any size and times loading, inserting, searching,
+#               traversal, keyword search, prerequisite sorting and the MongoDB functions.
+#               Results are written as JSON so runs of different versions can be compared.
+#============================================================================
+
+#============================================================================
+# Usage
+#   python Benchmarks/course_planner_benchmark.py --target Enhancement_3/course_planner.py --output e3.json
+#   python Benchmarks/course_planner_benchmark.py --target Enhanced_Artifact/course_planner.py --sizes 1000 1000000
+#   python Benchmarks/course_planner_benchmark.py --compare e3.json ea.json
+#
+# MongoDB functions run against mongomock (an in-process stand-in) by default, against a real
+# server with --mongo mongodb://localhost:27017/, or are skipped with --mongo none.
+#============================================================================
+
+import argparse
+import builtins
+import contextlib
+import csv
+import gc
+import importlib.util
+import inspect
+import io
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+
+ORDERS = ("sorted", "random", "skewed")
+SHAPES = ("mixed", "chain", "fan_in")
+DEPARTMENTS = ("CSCI", "MATH", "PHYS", "CHEM", "BIOL", "ECON", "HIST", "ENGL", "STAT", "PSYC")
+NAME_WORDS = ("introduction", "advanced", "topics", "data", "structures", "algorithms", "systems", "theory",
+              "analysis", "design", "methods", "applied", "principles", "laboratory", "seminar", "foundations")
+KEYWORD_QUERIES = ("algorithms", "data structures", "csci1", "seminar", "zzzz")
+FUZZY_QUERIES = ("algoritms", "strucutres", "CSC1001", "foundatoins")
+
+# Synthetic catalog of count (course_id, course_name, prerequisites) rows, the same for a given seed.
+# order  - sorted: IDs ascending (the worst case for an unbalanced BST)
+#          random: IDs shuffled
+#          skewed: 80% of courses in one department, arriving in long ascending runs
+# shape  - mixed:  0-3 prerequisites drawn from earlier courses
+#          chain:  every course requires the one before it (one prerequisite chain as deep as the catalog)
+#          fan_in: every course requires 5-10 of a small set of hub courses
+def generate_catalog(count, order="random", shape="mixed", seed=0):
+    rng = random.Random(seed)
+    if order == "skewed":
+        hot = count * 4 // 5
+        ids = [f"CSCI{number:07d}" for number in range(hot)]
+        ids += [f"{DEPARTMENTS[1 + number % (len(DEPARTMENTS) - 1)]}{number:07d}" for number in range(count - hot)]
+    else:
+        ids = [f"{DEPARTMENTS[number % len(DEPARTMENTS)]}{number:07d}" for number in range(count)]
+    ids.sort()
+
+    # Prerequisites only ever point at earlier IDs, so the generated catalog has no cycles
+    hubs = ids[:max(10, count // 100)]
+    rows = []
+    for position, course_id in enumerate(ids):
+        if shape == "chain":
+            prerequisites = [ids[position - 1]] if position else []
+        elif shape == "fan_in":
+            earlier = hubs[:position] if position < len(hubs) else hubs
+            prerequisites = rng.sample(earlier, min(len(earlier), rng.randint(5, 10)))
+        else:
+            prerequisites = [ids[rng.randrange(position)] for _ in range(min(position, rng.randint(0, 3)))]
+            prerequisites = list(dict.fromkeys(prerequisites))
+        rows.append((course_id, " ".join(rng.sample(NAME_WORDS, 3)).title(), prerequisites))
+
+    if order == "random":
+        rng.shuffle(rows)
+    elif order == "skewed":
+        runs = [rows[start:start + 1000] for start in range(0, len(rows), 1000)]
+        rng.shuffle(runs)
+        rows = [row for run in runs for row in run]
+    return rows
+
+def write_catalog_csv(rows, path):
+    with open(path, "w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file)
+        writer.writerow(["course_id", "course_name", "prerequisites"])
+        for course_id, course_name, prerequisites in rows:
+            writer.writerow([course_id, course_name, *prerequisites])
+
+def load_target(path):
+    spec = importlib.util.spec_from_file_location("benchmarked_course_planner", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def target_version(path):
+    with open(path, encoding="utf-8") as file:
+        for line in file:
+            if line.startswith("# Version"):
+                return line.split(":", 1)[1].strip()
+    return None
+
+# Stand-in for the GUI's background task handle when timing the Enhanced_Artifact load path
+class _Task:
+    def check_cancelled(self):
+        pass
+
+    def report_progress(self, value):
+        pass
+
+def read_catalog_csv(path):
+    with open(path, newline="", encoding="utf-8") as file:
+        reader = csv.reader(file)
+        next(reader)
+        return [(row[0], row[1], [prereq for prereq in row[2:] if prereq]) for row in reader]
+
+# Adapts the planners' different APIs to the operations being timed. Older versions (the
+# baseline Enhancement_2/Enhancement_3 and Enhanced_Artifact) lack some features; each one is
+# detected here and operations a version does not have are recorded as skipped.
+class Planner:
+    def __init__(self, module):
+        self.module = module
+        self.is_cli = hasattr(module, "load_courses")
+        tree = module.BinarySearchTree
+        self.balanced = "balanced" in inspect.signature(tree).parameters
+        self.snapshot_suffix = getattr(module, "SNAPSHOT_SUFFIX", None)
+        self.has_collect = hasattr(tree, "collect_courses")
+        self.has_keyword_search = self.is_cli or hasattr(tree, "keyword_search")
+        self.has_fuzzy_search = hasattr(tree, "fuzzy_search")
+        self.has_prerequisite_graph = hasattr(module, "PrerequisiteGraph") and self.has_collect
+        self.has_sort = any(hasattr(owner, name) for owner, name in (
+            (tree, "sort_by_prerequisites"), (tree, "courses_by_prerequisites"), (module, "print_sorted_courses_by_prerequisites")))
+        self.has_mongo = all(hasattr(module, name) for name in ("sync_courses_to_mongodb", "find_courses_in_mongodb", "iter_courses_from_mongodb"))
+
+    def new_tree(self):
+        return self.module.BinarySearchTree(balanced=True) if self.balanced else self.module.BinarySearchTree()
+
+    # A loaded catalog, including any indexing a snapshot load leaves running in the background
+    def load_courses(self, csv_path):
+        if self.is_cli:
+            bst = self.new_tree()
+            if self.snapshot_suffix:
+                self.module.load_courses(csv_path, bst, snapshot_path=csv_path + self.snapshot_suffix)
+            else:
+                self.module.load_courses(csv_path, bst)
+        elif hasattr(self.module, "build_catalog_from_csv"):
+            bst = self.module.build_catalog_from_csv(_Task(), self.new_tree(), csv_path)[0]
+        else:
+            bst = self.insert_all(read_catalog_csv(csv_path))  # The baseline GUI only loads through Tk
+        if hasattr(bst, "wait_until_loaded"):
+            bst.wait_until_loaded()
+        return bst
+
+    def insert_all(self, rows):
+        bst = self.new_tree()
+        if self.is_cli:
+            for course_id, course_name, prerequisites in rows:
+                bst.insert(self.module.Course(course_id, course_name, list(prerequisites)))
+        else:
+            for course_id, course_name, prerequisites in rows:
+                bst.insert(course_id, course_name, list(prerequisites))
+        return bst
+
+    def interactive_search(self, bst, query):
+        if self.is_cli:
+            original_input = builtins.input
+            builtins.input = lambda prompt="": query
+            try:
+                self.module.interactive_search(bst)
+            finally:
+                builtins.input = original_input
+        else:
+            courses = bst.keyword_search(query)
+            if not courses and self.has_fuzzy_search:
+                bst.fuzzy_search(query)
+
+    def sort_by_prerequisites(self, bst):
+        if hasattr(bst, "sort_by_prerequisites"):
+            bst.sort_by_prerequisites()
+        elif hasattr(bst, "courses_by_prerequisites"):
+            for _ in bst.courses_by_prerequisites():
+                pass
+        else:
+            self.module.print_sorted_courses_by_prerequisites(bst)
+
+# Best wall time of repeat runs of function(); stdout is discarded so printing planners are comparable
+def best_time(function, repeat):
+    best = None
+    for _ in range(repeat):
+        gc.collect()
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            function()
+            elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def mongo_collection(module, mongo):
+    if mongo == "none":
+        return None
+    if mongo == "mongomock":
+        try:
+            import mongomock
+        except ImportError:
+            print("mongomock is not installed; skipping the MongoDB benchmarks.", file=sys.stderr)
+            return None
+        return mongomock.MongoClient()["course_planner_benchmark"]["courses"]
+    return module.MongoConnectionManager(uri=mongo, database="course_planner_benchmark").collection()
+
+# Time every operation for one generated catalog. Returns a list of result records.
+def run_case(planner, size, order, shape, seed, repeat, mongo, workdir):
+    module = planner.module
+    rows = generate_catalog(size, order, shape, seed)
+    csv_path = os.path.join(workdir, f"courses_{size}_{order}_{shape}.csv")
+    write_catalog_csv(rows, csv_path)
+    rng = random.Random(seed)
+    hits = [rows[rng.randrange(size)][0] for _ in range(min(size, 10000))]
+    misses = [course_id + "X" for course_id in hits]
+    results = []
+
+    def record(operation, seconds, ops=1):
+        results.append({"size": size, "order": order, "shape": shape, "operation": operation,
+                        "seconds": round(seconds, 6), "ops": ops, "us_per_op": round(seconds / ops * 1e6, 3)})
+
+    def skip(operation, reason):
+        results.append({"size": size, "order": order, "shape": shape, "operation": operation,
+                        "seconds": None, "ops": 0, "us_per_op": None, "skipped": reason})
+
+    # Time one operation, or record it as skipped when this version does not have it. Versions
+    # with recursive traversals of an unbalanced tree cannot walk very deep trees at all.
+    def measure(operation, function, ops, supported=True, runs=repeat):
+        if not supported:
+            skip(operation, "not supported by this version")
+            return
+        try:
+            record(operation, best_time(function, runs), ops)
+        except RecursionError:
+            skip(operation, "tree too deep for this version's recursion limit")
+
+    snapshot_path = csv_path + (planner.snapshot_suffix or "")
+
+    def load_from_csv():
+        if planner.snapshot_suffix and os.path.exists(snapshot_path):
+            os.remove(snapshot_path)
+        planner.load_courses(csv_path)
+
+    measure("load_courses_csv", load_from_csv, size)
+    measure("load_courses_snapshot", lambda: planner.load_courses(csv_path), size, supported=planner.snapshot_suffix is not None)
+    measure("insert", lambda: planner.insert_all(rows), size, runs=1)
+
+    tree_operations = ("search_hit", "search_miss", "collect_courses", "interactive_search", "fuzzy_search",
+                       "sort_by_prerequisites", "prerequisite_graph", "mongo_sync", "mongo_find_batch", "mongo_iter_courses")
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            bst = planner.load_courses(csv_path)
+    except RecursionError:
+        for operation in tree_operations:
+            skip(operation, "catalog could not be loaded: tree too deep for this version's recursion limit")
+        return results
+    measure("search_hit", lambda: [bst.search(course_id) for course_id in hits], len(hits))
+    measure("search_miss", lambda: [bst.search(course_id) for course_id in misses], len(misses))
+    measure("collect_courses", lambda: bst.collect_courses(bst.root, []), size, supported=planner.has_collect)
+    measure("interactive_search", lambda: [planner.interactive_search(bst, query) for query in KEYWORD_QUERIES], len(KEYWORD_QUERIES),
+            supported=planner.has_keyword_search)
+    if planner.has_fuzzy_search:
+        bst.fuzzy_search("warm up")  # The fuzzy index is built on first use; time queries, not the build
+    measure("fuzzy_search", lambda: [bst.fuzzy_search(query) for query in FUZZY_QUERIES], len(FUZZY_QUERIES), supported=planner.has_fuzzy_search)
+    measure("sort_by_prerequisites", lambda: planner.sort_by_prerequisites(bst), size, supported=planner.has_sort)
+    measure("prerequisite_graph", lambda: module.PrerequisiteGraph(bst.collect_courses(bst.root, [])), size, supported=planner.has_prerequisite_graph)
+
+    collection = mongo_collection(module, mongo) if planner.has_mongo else None
+    if collection is not None:
+        def sync():
+            collection.delete_many({})
+            module.sync_courses_to_mongodb(bst, collection)
+
+        lookups = hits[:1000]
+        measure("mongo_sync", sync, size, runs=1)
+        measure("mongo_find_batch", lambda: module.find_courses_in_mongodb(lookups, collection), len(lookups))
+        measure("mongo_iter_courses", lambda: sum(1 for _ in module.iter_courses_from_mongodb(collection)), size)
+        collection.drop()
+    elif mongo != "none" and not planner.has_mongo:
+        for operation in ("mongo_sync", "mongo_find_batch", "mongo_iter_courses"):
+            skip(operation, "not supported by this version")
+    return results
+
+def run_benchmarks(args):
+    module = load_target(args.target)
+    planner = Planner(module)
+    report = {
+        "target": args.target,
+        "version": target_version(args.target),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "seed": args.seed,
+        "repeat": args.repeat,
+        "mongo": args.mongo,
+        "results": [],
+    }
+    with tempfile.TemporaryDirectory() as workdir:
+        for size in args.sizes:
+            for order in args.orders:
+                for shape in args.shapes:
+                    print(f"{size} courses, {order} order, {shape} prerequisites...", file=sys.stderr)
+                    report["results"].extend(run_case(planner, size, order, shape, args.seed, args.repeat, args.mongo, workdir))
+    return report
+
+# Print per-operation time ratios between two result files (new / old; above 1 is slower)
+def compare_reports(old_path, new_path):
+    with open(old_path, encoding="utf-8") as file:
+        old = json.load(file)
+    with open(new_path, encoding="utf-8") as file:
+        new = json.load(file)
+    key = lambda result: (result["size"], result["order"], result["shape"], result["operation"])
+    old_results = {key(result): result for result in old["results"]}
+    print(f"{'size':>8} {'order':<7} {'shape':<7} {'operation':<22} {'old us/op':>11} {'new us/op':>11} {'ratio':>7}")
+    for result in new["results"]:
+        before = old_results.get(key(result))
+        if before is None or before["us_per_op"] is None or result["us_per_op"] is None:
+            continue  # Missing or skipped in one of the runs
+        ratio = result["us_per_op"] / before["us_per_op"] if before["us_per_op"] else float("inf")
+        print(f"{result['size']:>8} {result['order']:<7} {result['shape']:<7} {result['operation']:<22} "
+              f"{before['us_per_op']:>11.3f} {result['us_per_op']:>11.3f} {ratio:>7.2f}")
+
+def parse_arguments(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark a course_planner.py on synthetic catalogs.")
+    parser.add_argument("--target", default=os.path.join("Enhancement_3", "course_planner.py"), help="course_planner.py to benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000], help="catalog sizes (default: 1000 10000 100000)")
+    parser.add_argument("--orders", nargs="+", choices=ORDERS, default=list(ORDERS), help="course ID orders to generate")
+    parser.add_argument("--shapes", nargs="+", choices=SHAPES, default=list(SHAPES), help="prerequisite shapes to generate")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the catalog generator")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per operation; the best time is kept")
+    parser.add_argument("--mongo", default="mongomock", help="mongomock, none, or a MongoDB URI to benchmark against")
+    parser.add_argument("--output", default="-", help="file to write the JSON results to (default: stdout)")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="compare two result files instead of running")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_arguments(argv)
+    if args.compare:
+        compare_reports(*args.compare)
+        return 0
+    report = run_benchmarks(args)
+    text = json.dumps(report, indent=2)
+    if args.output == "-":
+        print(text)
+    else:
+        with open(args.output, "w", encoding="utf-8") as file:
+            file.write(text + "\n")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,187 @@
+#============================================================================
+# Name        : course_service_load.py
+# Author      : Bryan Pirrone
+# Version     : 1.0
+# Description : Local load generator for the course planner's HTTP service mode (--serve).
+#               Many concurrent keep-alive clients send a mix of course lookups, keyword
+#               searches, prerequisite chains and sorted pages, optionally with hot reloads
+#               while the load runs, and the latency percentiles are checked against a p99 target.
+#============================================================================
+
+#============================================================================
+# Usage
+#   python Benchmarks/course_service_load.py --size 100000
+#   python Benchmarks/course_service_load.py --catalog Enhancement_3/courses.csv --reload-every 2
+#   python Benchmarks/course_service_load.py --url http://127.0.0.1:8300 --clients 200 --requests 50000
+#
+# With --size or --catalog the service is started for the run (on a free port) and stopped
+# afterwards; with --url an already running service is used. The exit status is 1 when the
+# p99 latency is over --p99-ms or any request fails, so the check can run in CI.
+#============================================================================
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from urllib.parse import quote, urlsplit
+
+from course_planner_benchmark import generate_catalog, write_catalog_csv
+
+# Share of each request type in the generated mix
+REQUEST_MIX = (("lookup", 0.6), ("search", 0.2), ("chain", 0.1), ("sorted", 0.1))
+SEARCH_QUERIES = ("algorithms", "data structures", "seminar", "csci1", "algoritms", "zzzz")
+
+async def http_request(reader, writer, method, path):
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode("latin-1"))
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        if name.strip().lower() == "content-length":
+            length = int(value)
+    return status, await reader.readexactly(length)
+
+# Request paths in the configured mix, built from course IDs the service actually holds
+async def request_paths(host, port, count, seed):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        status, body = await http_request(reader, writer, "GET", "/courses?sort=prerequisites&limit=1000")
+    finally:
+        writer.close()
+    if status != 200:
+        raise RuntimeError(f"could not list courses (HTTP {status})")
+    courses = json.loads(body)["courses"]
+    course_ids = [course["course_id"] for course in courses] or ["NONE"]
+    cursors = [f"{len(course['prerequisites'])}:{course['course_id']}" for course in courses] or ["0:NONE"]
+    rng = random.Random(seed)
+    kinds = rng.choices([kind for kind, _ in REQUEST_MIX], [share for _, share in REQUEST_MIX], k=count)
+    paths = []
+    for kind in kinds:
+        if kind == "lookup":
+            paths.append(f"/courses/{quote(rng.choice(course_ids))}")
+        elif kind == "search":
+            paths.append(f"/search?q={quote(rng.choice(SEARCH_QUERIES))}&limit=20")
+        elif kind == "chain":
+            paths.append(f"/courses/{quote(rng.choice(course_ids))}/prerequisites")
+        else:
+            paths.append(f"/courses?sort=prerequisites&after={quote(rng.choice(cursors))}&limit=50")
+    return paths
+
+# One keep-alive client taking paths from the shared queue until it is empty
+async def client(host, port, paths, latencies, errors):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        while paths:
+            path = paths.pop()
+            start = time.perf_counter()
+            try:
+                status, _ = await http_request(reader, writer, "GET", path)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                errors.append(path)
+                writer.close()
+                reader, writer = await asyncio.open_connection(host, port)
+                continue
+            latencies.append(time.perf_counter() - start)
+            if status >= 500:
+                errors.append(path)
+    finally:
+        writer.close()
+
+async def reload_periodically(host, port, interval, reloads):
+    while True:
+        await asyncio.sleep(interval)
+        reader, writer = await asyncio.open_connection(host, port)
+        try:
+            status, _ = await http_request(reader, writer, "POST", "/reload")
+            reloads.append(status)
+        finally:
+            writer.close()
+
+def percentile(ordered, fraction):
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+async def run_load(host, port, args):
+    paths = await request_paths(host, port, args.requests, args.seed)
+    latencies, errors, reloads = [], [], []
+    reloader = asyncio.ensure_future(reload_periodically(host, port, args.reload_every, reloads)) if args.reload_every else None
+    start = time.perf_counter()
+    await asyncio.gather(*(client(host, port, paths, latencies, errors) for _ in range(args.clients)))
+    elapsed = time.perf_counter() - start
+    if reloader:
+        reloader.cancel()
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "clients": args.clients,
+        "errors": len(errors),
+        "reloads": len(reloads),
+        "failed_reloads": sum(status != 200 for status in reloads),
+        "seconds": round(elapsed, 3),
+        "requests_per_second": round(len(latencies) / elapsed, 1) if elapsed else None,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 3) if latencies else None,
+        "p90_ms": round(percentile(latencies, 0.90) * 1000, 3) if latencies else None,
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 3) if latencies else None,
+        "max_ms": round(latencies[-1] * 1000, 3) if latencies else None,
+        "p99_target_ms": args.p99_ms,
+    }
+
+# Start the service on a free port and wait for it to report its address
+def start_service(target, catalog):
+    process = subprocess.Popen([sys.executable, target, "--serve", "--port", "0", "--catalog", catalog],
+                               stderr=subprocess.PIPE, text=True)
+    line = process.stderr.readline()
+    if not line.startswith("Serving"):
+        process.kill()
+        raise RuntimeError(f"service did not start: {line.strip() or 'no output'}")
+    address = urlsplit(line.split()[-1])
+    return process, address.hostname, address.port
+
+def parse_arguments(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test the course planner HTTP service and check its p99 latency.")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--url", help="an already running service, e.g. http://127.0.0.1:8300")
+    source.add_argument("--catalog", help="course CSV (or folder of campus CSVs) to start a service with")
+    source.add_argument("--size", type=int, default=10000, help="start a service on a synthetic catalog of this many courses (default: 10000)")
+    parser.add_argument("--target", default=os.path.join("Enhancement_3", "course_planner.py"), help="course_planner.py to start with --catalog or --size")
+    parser.add_argument("--clients", type=int, default=20, help="concurrent connections (default: 20)")
+    parser.add_argument("--requests", type=int, default=20000, help="total requests to send (default: 20000)")
+    parser.add_argument("--reload-every", type=float, default=0, help="seconds between hot reloads during the run (default: no reloads)")
+    parser.add_argument("--p99-ms", type=float, default=50.0, help="p99 latency target in milliseconds (default: 50)")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the request mix and synthetic catalog")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_arguments(argv)
+    process = None
+    with tempfile.TemporaryDirectory() as workdir:
+        if args.url:
+            address = urlsplit(args.url)
+            host, port = address.hostname, address.port or 80
+        else:
+            catalog = args.catalog
+            if catalog is None:
+                catalog = os.path.join(workdir, "catalog.csv")
+                write_catalog_csv(generate_catalog(args.size, seed=args.seed), catalog)
+            process, host, port = start_service(args.target, catalog)
+        try:
+            report = asyncio.run(run_load(host, port, args))
+        finally:
+            if process:
+                process.terminate()
+                process.wait()
+    print(json.dumps(report, indent=2))
+    passed = report["errors"] == 0 and report["failed_reloads"] == 0 and report["p99_ms"] is not None and report["p99_ms"] <= args.p99_ms
+    print(f"p99 {report['p99_ms']} ms against a {args.p99_ms} ms target: {'PASS' if passed else 'FAIL'}", file=sys.stderr)
+    return 0 if passed else 1
+
+if __name__ == "__main__":
+    sys.exit(main())
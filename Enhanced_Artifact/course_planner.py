@@ -1,7 +1,7 @@
 #============================================================================
 # Name        : course_planner.py
 # Author      : Bryan Pirrone
-# Version     : 8.0
+# Version     : 8.21
 # References  : 1) SNHU CS-300 Project 2, source.cpp
 #               2) Python Tkinter Documents, https://docs.python.org/3/library/tkinter.html
 # Description : This program allows the user to load a list of courses from a CSV file into a binary search tree (BST). 
@@ -20,68 +20,2120 @@
 # 6.0 - Added MongoDB integration for course data storage (loading and searching only)
 # 7.0 - Resolved interactive search bug
 # 8.0 - GUI implementation
+# 8.1 - Added balanced (AVL) BST mode and made all tree traversals iterative
+# 8.2 - Added bulk loading that builds a perfectly balanced BST from a sorted catalog
+# 8.3 - Added trigram index for fast keyword search
+# 8.4 - Added compiled prerequisite graph (full prerequisite chains, cycle and missing-course checks)
+# 8.5 - Added cached prerequisite closures with incremental invalidation
+# 8.6 - Added chunked, streaming CSV loading with a progress display that keeps the GUI responsive
+# 8.7 - Added memory-mapped binary catalog snapshots for fast startup
+# 8.8 - Added __slots__ tree nodes and interned course IDs to cut memory per course
+# 8.9 - Added batched MongoDB lookups and bulk upsert of the BST into MongoDB
+# 8.10 - Stream MongoDB courses through a projected, batched cursor and render them as they arrive
+# 8.11 - Replaced the import-time MongoClient with a lazy, pooled connection manager
+# 8.12 - Added a read-through LRU/TTL cache in front of MongoDB course lookups
+# 8.13 - Run CSV loads and MongoDB queries on a background worker pool so the GUI stays responsive
+# 8.14 - Show long result lists one page at a time instead of inserting every row into the output pane
+# 8.15 - Added lazy in-order iteration plus course ID range and prefix queries
+# 8.16 - Added an index of courses by prerequisite count (and depth) for sorted views that never re-sort
+# 8.17 - Added typo-tolerant fuzzy search when a keyword search finds nothing
+# 8.18 - Added a degree-plan scheduler
+# 8.19 - Added opt-in timers, counters and cProfile/tracemalloc profiling (Diagnostics menu)
+# 8.20 - Reloading a CSV now applies only the added, changed and removed courses (no more duplicate nodes)
+# 8.21 - Added a reverse-prerequisite index: what a course unlocks and the impact of removing courses
 #============================================================================
 
 import tkinter as tk
 from tkinter import filedialog, messagebox
+import cProfile
 import csv
-from pymongo import MongoClient
+import functools
+import hashlib
+import heapq
+import io
+import mmap
+import os
+import pstats
+import queue
+import re
+import struct
+import sys
+import threading
+import time
+import tracemalloc
+from array import array
+from bisect import bisect_left, insort
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from itertools import islice
+from operator import attrgetter
+
+# Rows parsed per chunk when streaming a CSV
+DEFAULT_CHUNK_SIZE = 5000
+
+# Course IDs per $in lookup and documents per bulk_write when talking to MongoDB
+MONGO_BATCH_SIZE = 1000
+
+# Course documents are fetched without their _id. An exclusion projection keeps every
+# prerequisite_N field, however many prerequisites a course has.
+COURSE_PROJECTION = {"_id": 0}
+
+# Size and time-to-live (seconds) of the cache in front of MongoDB course lookups
+COURSE_CACHE_SIZE = 1024
+COURSE_CACHE_TTL = 300
+
+# Courses whose full prerequisite sets are kept by the closure cache
+CLOSURE_CACHE_SIZE = 10000
+
+# Courses returned by a fuzzy (typo-tolerant) search, and the most courses read from any one
+# term's posting list when gathering fuzzy candidates (see FuzzyIndex.search)
+FUZZY_RESULTS = 10
+FUZZY_POSTING_LIMIT = 1000
+
+# Default course load per term for degree plans
+COURSES_PER_TERM = 4
+
+# Rows shown per page of the GUI output pane
+RESULT_PAGE_SIZE = 100
+
+# Opt-in timers, counters and profiling for the slow paths (CSV parsing, tree inserts and
+# searches, traversal, MongoDB round trips). Disabled by default; instrumented code only checks
+# metrics.enabled before doing any measuring, so the cost when disabled is one attribute read.
+class Metrics:
+    def __init__(self):
+        self.enabled = False
+        self.timings = {}       # stage -> [calls, total seconds, slowest call in seconds]
+        self.observations = {}  # name -> [count, total, largest] (e.g. search depth)
+        self.counters = {}      # name -> running total
+        self._profiler = None
+
+    # Call with the time.perf_counter() value taken when the stage started
+    def record(self, stage, start):
+        elapsed = time.perf_counter() - start
+        timing = self.timings.get(stage)
+        if timing is None:
+            self.timings[stage] = [1, elapsed, elapsed]
+        else:
+            timing[0] += 1
+            timing[1] += elapsed
+            timing[2] = max(timing[2], elapsed)
+
+    def observe(self, name, value):
+        observation = self.observations.get(name)
+        if observation is None:
+            self.observations[name] = [1, value, value]
+        else:
+            observation[0] += 1
+            observation[1] += value
+            observation[2] = max(observation[2], value)
+
+    def count(self, name, amount=1):
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def reset(self):
+        self.timings.clear()
+        self.observations.clear()
+        self.counters.clear()
+
+    @property
+    def profiling(self):
+        return self._profiler is not None
+
+    # Start cProfile (CPU) and tracemalloc (memory) capture until stop_profiling()
+    def start_profiling(self):
+        if self._profiler is None:
+            self._profiler = cProfile.Profile()
+            tracemalloc.start()
+            self._profiler.enable()
+
+    # Stop the capture and return its report: the slowest functions by cumulative time, then
+    # the source lines holding the most memory allocated during the capture
+    def stop_profiling(self, limit=20):
+        if self._profiler is None:
+            return "Profiling is not running."
+        self._profiler.disable()
+        snapshot = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        output = io.StringIO()
+        pstats.Stats(self._profiler, stream=output).sort_stats("cumulative").print_stats(limit)
+        self._profiler = None
+        lines = [output.getvalue().strip(), "", f"Memory: {current / 1024:.1f} KiB still allocated, {peak / 1024:.1f} KiB peak", ""]
+        lines.extend(str(stat) for stat in snapshot.statistics("lineno")[:limit])
+        return "\n".join(lines)
+
+    def report(self):
+        lines = [f"Metrics are {'on' if self.enabled else 'off'}."]
+        if self.timings:
+            lines.append(f"{'Stage':<24}{'Calls':>8}{'Total ms':>12}{'Avg ms':>10}{'Max ms':>10}")
+            for stage, (calls, total, slowest) in sorted(self.timings.items()):
+                lines.append(f"{stage:<24}{calls:>8}{total * 1000:>12.2f}{total / calls * 1000:>10.3f}{slowest * 1000:>10.3f}")
+        if self.observations:
+            lines.append(f"{'Measure':<24}{'Count':>8}{'Average':>12}{'Largest':>10}")
+            for name, (count, total, largest) in sorted(self.observations.items()):
+                lines.append(f"{name:<24}{count:>8}{total / count:>12.2f}{largest:>10}")
+        for name, value in sorted(self.counters.items()):
+            lines.append(f"{name}: {value}")
+        return "\n".join(lines)
+
+metrics = Metrics()
+
+# Time every call of the decorated function under stage while metrics are enabled
+def timed(stage):
+    def decorate(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not metrics.enabled:
+                return function(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                metrics.record(stage, start)
+        return wrapper
+    return decorate
+
+# Inverted trigram index over course IDs and names for keyword search.
+# Every course is posted under each 3-character slice of its lowercased ID and name,
+# so a query only touches the postings of its own trigrams instead of every course.
+class NGramIndex:
+    def __init__(self, n=3):
+        self.n = n
+        self.postings = {}
+
+    def _grams(self, text):
+        if len(text) < self.n:
+            return {text} if text else set()  # Short fields are posted whole
+        return {text[i:i + self.n] for i in range(len(text) - self.n + 1)}
+
+    def add(self, course):
+        postings = self.postings
+        for gram in self._grams(course.course_id.lower()) | self._grams(course.course_name.lower()):
+            posting = postings.get(gram)
+            if posting is None:
+                postings[gram] = {course}
+            else:
+                posting.add(course)
+
+    def remove(self, course):
+        for gram in self._grams(course.course_id.lower()) | self._grams(course.course_name.lower()):
+            posting = self.postings.get(gram)
+            if posting is not None:
+                posting.discard(course)
+                if not posting:
+                    del self.postings[gram]
+
+    # Return the courses whose ID or name contains keyword (case-insensitive), sorted by ID
+    def search(self, keyword):
+        keyword = keyword.lower()
+        if len(keyword) >= self.n:
+            postings = sorted((self.postings.get(gram, set()) for gram in self._grams(keyword)), key=len)
+            candidates = postings[0].intersection(*postings[1:])
+        else:
+            # Too short to have a trigram of its own: union the postings of every gram containing it
+            candidates = set()
+            for gram, posting in self.postings.items():
+                if keyword in gram:
+                    candidates.update(posting)
+        results = [course for course in candidates if keyword in course.course_id.lower() or keyword in course.course_name.lower()]
+        results.sort(key=lambda course: course.course_id)
+        return results
+
+# Words of a course ID or name, lowercased, with letters and digits split apart
+# ("CSCI300: Data Structures" -> csci, 300, data, structures)
+WORD_PATTERN = re.compile(r"[a-z]+|[0-9]+")
+
+# Optimal string alignment distance (edits, with adjacent transpositions counting as one),
+# giving up early and returning limit + 1 once the distance must exceed limit. Characters
+# both words share at the start and end are skipped first; for course numbers such as
+# 0012300 and 0012301 that leaves almost nothing to compare.
+def edit_distance(a, b, limit):
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    start = 0
+    while start < len(a) and start < len(b) and a[start] == b[start]:
+        start += 1
+    end_a, end_b = len(a), len(b)
+    while end_a > start and end_b > start and a[end_a - 1] == b[end_b - 1]:
+        end_a -= 1
+        end_b -= 1
+    a, b = a[start:end_a], b[start:end_b]
+    if len(a) <= 1 or len(b) <= 1:
+        return max(len(a), len(b)) - (bool(a) and bool(b) and (a in b or b in a))
+    before = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if before and i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], before[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        before, previous = previous, current
+    return previous[-1]
+
+# Typo-tolerant search over course IDs and name words (a SymSpell-style deletion index).
+# Each distinct term is filed under every string left after deleting up to max_distance
+# characters from its first prefix_length characters. A query word is looked up the same
+# way, so only the few terms sharing a deletion with it are compared by edit distance and
+# lookups do not slow down as the catalog grows. Posting lists are kept in course ID order
+# and read only up to posting_limit courses each, so a term shared by a whole department
+# (the "csci" of an ID) does not make every course in it a candidate.
+class FuzzyIndex:
+    def __init__(self, max_distance=2, prefix_length=7, posting_limit=FUZZY_POSTING_LIMIT):
+        self.max_distance = max_distance
+        self.prefix_length = prefix_length
+        self.posting_limit = posting_limit
+        self.postings = {}  # term -> courses whose ID or name contains it, in course ID order
+        self.deletes = {}   # deletion -> terms it was made from
+
+    def _deletions(self, term, distance):
+        found = edge = {term[:self.prefix_length]}
+        for _ in range(distance):
+            edge = {word[:i] + word[i + 1:] for word in edge for i in range(len(word))} - found
+            found = found | edge
+        return found
+
+    @staticmethod
+    def _terms(course):
+        terms = set(WORD_PATTERN.findall(course.course_id.lower()))
+        terms.update(WORD_PATTERN.findall(course.course_name.lower()))
+        return terms
+
+    def add(self, course):
+        for term in self._terms(course):
+            posting = self.postings.get(term)
+            if posting is not None:
+                insort(posting, course, key=course_id_of)
+                continue
+            self.postings[term] = [course]
+            for deletion in self._deletions(term, self.max_distance):
+                bucket = self.deletes.get(deletion)
+                if bucket is None:
+                    self.deletes[deletion] = [term]
+                else:
+                    bucket.append(term)
+
+    def remove(self, course):
+        for term in self._terms(course):
+            posting = self.postings.get(term)
+            if posting is None or course not in posting:
+                continue
+            posting.remove(course)
+            if posting:
+                continue
+            del self.postings[term]
+            for deletion in self._deletions(term, self.max_distance):
+                bucket = self.deletes[deletion]
+                bucket.remove(term)
+                if not bucket:
+                    del self.deletes[deletion]
+
+    # Short words must match exactly, so "to" or "of" do not match half the catalog
+    def allowed_distance(self, word):
+        return min(self.max_distance, max(0, (len(word) - 1) // 2))
+
+    # Indexed terms within the allowed edit distance of word, as (term, distance) pairs
+    def matches(self, word):
+        limit = self.allowed_distance(word)
+        candidates = set()
+        for deletion in self._deletions(word, limit):
+            candidates.update(self.deletes.get(deletion, ()))
+        for term in candidates:
+            distance = edit_distance(word, term, limit)
+            if distance <= limit:
+                yield term, distance
+
+    # The k best courses for query: most query words matched first, then the smallest total
+    # edit distance, then course ID. Each query word counts once per course, at its best match.
+    # Candidates are the courses in the matched terms' postings, reading at most
+    # posting_limit (the lowest course IDs) from each. A word with a longer posting is then
+    # scored on every candidate from its terms, so "CSCI0012300" only ranks the courses near
+    # 0012300 plus the first few CSCI courses instead of the whole department. The ranking
+    # is exact unless every word a course matches has more than posting_limit courses.
+    def search(self, query, k):
+        per_word = []  # (matched terms -> distance, course -> best distance, posting cut short)
+        for word in dict.fromkeys(WORD_PATTERN.findall(query.lower())):
+            matched = dict(self.matches(word))
+            best = {}
+            for term, distance in matched.items():
+                for course in islice(self.postings[term], self.posting_limit):
+                    if distance < best.get(course, distance + 1):
+                        best[course] = distance
+            per_word.append((matched, best, any(len(self.postings[term]) > self.posting_limit for term in matched)))
+        candidates = {course for _, best, _ in per_word for course in best}
+        for matched, best, truncated in per_word:
+            if not truncated:
+                continue
+            best.clear()
+            for course in candidates:
+                distances = [matched[term] for term in self._terms(course) if term in matched]
+                if distances:
+                    best[course] = min(distances)
+        scores = {}  # course -> [words matched, total distance]
+        for _, best, _ in per_word:
+            for course, distance in best.items():
+                score = scores.get(course)
+                if score is None:
+                    scores[course] = [1, distance]
+                else:
+                    score[0] += 1
+                    score[1] += distance
+        ranked = heapq.nsmallest(k, scores.items(), key=lambda item: (-item[1][0], item[1][1], item[0].course_id))
+        return [course for course, _ in ranked]
+
+# Compiled prerequisite graph. Every course ID gets an integer node ID and the edges
+# (course -> prerequisite) are stored as flat offset/target arrays, so closure, ordering
+# and validation queries run in time linear in the number of courses and edges.
+# IDs that are only ever referenced as prerequisites get node IDs after the catalog courses.
+class PrerequisiteGraph:
+    def __init__(self, courses):
+        self.ids = []     # node ID -> course ID
+        self.index = {}   # course ID -> node ID
+        catalog = []
+        for course in courses:
+            if course.course_id not in self.index:  # First copy of a duplicated ID wins
+                self.index[course.course_id] = len(self.ids)
+                self.ids.append(course.course_id)
+                catalog.append(course)
+        self.catalog_size = len(catalog)
+        self.courses = catalog  # node ID -> course, for catalog nodes
+        self._depths = None
+        self._depth_levels = None
+
+        self.prereq_offsets = array('i', [0])
+        self.prereq_targets = array('i')
+        for course in catalog:
+            for prereq in course.prerequisites:
+                target = self.index.get(prereq)
+                if target is None:
+                    target = self.index[prereq] = len(self.ids)
+                    self.ids.append(prereq)
+                self.prereq_targets.append(target)
+            self.prereq_offsets.append(len(self.prereq_targets))
+        # Missing prerequisites have no edges of their own
+        self.prereq_offsets.extend([len(self.prereq_targets)] * (len(self.ids) - self.catalog_size))
+
+        # Reverse edges (prerequisite -> courses that require it), built by counting sort
+        node_count = len(self.ids)
+        counts = [0] * (node_count + 1)
+        for target in self.prereq_targets:
+            counts[target + 1] += 1
+        for node in range(node_count):
+            counts[node + 1] += counts[node]
+        self.dependent_offsets = array('i', counts)
+        self.dependent_targets = array('i', bytes(4 * len(self.prereq_targets)))
+        fill = counts[:-1]
+        for node in range(self.catalog_size):
+            for edge in range(self.prereq_offsets[node], self.prereq_offsets[node + 1]):
+                target = self.prereq_targets[edge]
+                self.dependent_targets[fill[target]] = node
+                fill[target] += 1
+
+    def is_in_catalog(self, course_id):
+        node = self.index.get(course_id)
+        return node is not None and node < self.catalog_size
+
+    # Every course that must be taken before course_id, in a valid study order
+    # (each course appears after its own prerequisites). Returns None for unknown IDs.
+    def all_prerequisites(self, course_id):
+        start = self.index.get(course_id)
+        if start is None:
+            return None
+        offsets, targets = self.prereq_offsets, self.prereq_targets
+        visited = {start}
+        order = []
+        work = [(start, offsets[start])]
+        while work:
+            node, edge = work[-1]
+            if edge < offsets[node + 1]:
+                work[-1] = (node, edge + 1)
+                target = targets[edge]
+                if target not in visited:
+                    visited.add(target)
+                    work.append((target, offsets[target]))
+            else:
+                work.pop()
+                if node != start:
+                    order.append(self.ids[node])
+        return order
+
+    # Catalog courses ordered so every course follows its prerequisites (Kahn's algorithm).
+    # Courses on or behind a prerequisite cycle can never be scheduled and are left out.
+    def topological_order(self):
+        node_count = len(self.ids)
+        remaining = [self.prereq_offsets[node + 1] - self.prereq_offsets[node] for node in range(node_count)]
+        ready = [node for node in range(node_count) if remaining[node] == 0]
+        order = []
+        for node in ready:  # ready grows while we iterate over it
+            if node < self.catalog_size:
+                order.append(self.ids[node])
+            for edge in range(self.dependent_offsets[node], self.dependent_offsets[node + 1]):
+                dependent = self.dependent_targets[edge]
+                remaining[dependent] -= 1
+                if remaining[dependent] == 0:
+                    ready.append(dependent)
+        return order
+
+    # Prerequisite cycles as lists of course IDs (Tarjan's strongly connected components)
+    def find_cycles(self):
+        node_count = len(self.ids)
+        offsets, targets = self.prereq_offsets, self.prereq_targets
+        order = [-1] * node_count
+        low = [0] * node_count
+        on_stack = [False] * node_count
+        stack = []
+        cycles = []
+        counter = 0
+        for start in range(self.catalog_size):
+            if order[start] != -1:
+                continue
+            order[start] = low[start] = counter
+            counter += 1
+            stack.append(start)
+            on_stack[start] = True
+            work = [(start, offsets[start])]
+            while work:
+                node, edge = work[-1]
+                if edge < offsets[node + 1]:
+                    work[-1] = (node, edge + 1)
+                    target = targets[edge]
+                    if order[target] == -1:
+                        order[target] = low[target] = counter
+                        counter += 1
+                        stack.append(target)
+                        on_stack[target] = True
+                        work.append((target, offsets[target]))
+                    elif on_stack[target]:
+                        low[node] = min(low[node], order[target])
+                    continue
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[node])
+                if low[node] == order[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack[member] = False
+                        component.append(member)
+                        if member == node:
+                            break
+                    if len(component) > 1 or node in targets[offsets[node]:offsets[node + 1]]:
+                        cycles.append(sorted(self.ids[member] for member in component))
+        return cycles
+
+    # Prerequisite IDs that are not in the catalog, mapped to the courses that reference them
+    def missing_prerequisites(self):
+        missing = {}
+        for node in range(self.catalog_size, len(self.ids)):
+            dependents = self.dependent_targets[self.dependent_offsets[node]:self.dependent_offsets[node + 1]]
+            missing[self.ids[node]] = [self.ids[dependent] for dependent in dependents]
+        return missing
+
+    # Length of the longest prerequisite chain under each node (0 when a course has no
+    # prerequisites), found in topological order. Courses on or behind a cycle get -1.
+    def depths(self):
+        if self._depths is None:
+            node_count = len(self.ids)
+            remaining = [self.prereq_offsets[node + 1] - self.prereq_offsets[node] for node in range(node_count)]
+            depth = [0] * node_count
+            ready = [node for node in range(node_count) if remaining[node] == 0]
+            for node in ready:  # ready grows while we iterate over it
+                for edge in range(self.dependent_offsets[node], self.dependent_offsets[node + 1]):
+                    dependent = self.dependent_targets[edge]
+                    depth[dependent] = max(depth[dependent], depth[node] + 1)
+                    remaining[dependent] -= 1
+                    if remaining[dependent] == 0:
+                        ready.append(dependent)
+            self._depths = array('i', (-1 if remaining[node] else depth[node] for node in range(node_count)))
+        return self._depths
+
+    # Catalog courses grouped by prerequisite depth, shallowest level first (or deepest first),
+    # in course_id order within a level. Courses on or behind a cycle are left out.
+    def courses_by_depth(self, deepest_first=False):
+        if self._depth_levels is None:
+            depths = self.depths()
+            levels = {}
+            for node, course in enumerate(self.courses):
+                if depths[node] >= 0:
+                    levels.setdefault(depths[node], []).append(course)
+            self._depth_levels = [levels[depth] for depth in sorted(levels)]
+        for level in (reversed(self._depth_levels) if deepest_first else self._depth_levels):
+            yield from level
+
+# Read-through cache of every course's full (transitive) prerequisite set, on top of the
+# compiled PrerequisiteGraph. Each set is an int bitset indexed by a course ordinal the cache
+# assigns on first sight, so cached sets stay valid when the graph is recompiled after an
+# edit. Sets are kept in LRU order up to maxsize entries, and a walk reuses any set already
+# cached for a prerequisite. Changing a course (insert, delete or new prerequisites) drops
+# only its own set and the cached sets that contain it; the cache is never rebuilt.
+class PrerequisiteClosureCache:
+    def __init__(self, catalog, maxsize=CLOSURE_CACHE_SIZE):
+        self.catalog = catalog  # Anything with prerequisite_graph()
+        self.maxsize = maxsize
+        self.ordinals = {}  # course ID -> bit position
+        self.ids = []       # bit position -> course ID
+        self.entries = OrderedDict()  # course ID -> ancestor bitset
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def _ordinal(self, course_id):
+        ordinal = self.ordinals.get(course_id)
+        if ordinal is None:
+            ordinal = self.ordinals[course_id] = len(self.ids)
+            self.ids.append(course_id)
+        return ordinal
+
+    # Bitset of everything reachable from node's prerequisite edges. A course on a
+    # prerequisite cycle reaches itself, so its own bit may be set.
+    def _closure(self, graph, node):
+        offsets, targets = graph.prereq_offsets, graph.prereq_targets
+        bits = 0
+        seen = set()
+        pending = list(targets[offsets[node]:offsets[node + 1]])
+        while pending:
+            prereq = pending.pop()
+            if prereq in seen:
+                continue
+            seen.add(prereq)
+            course_id = graph.ids[prereq]
+            bits |= 1 << self._ordinal(course_id)
+            cached = self.entries.get(course_id)
+            if cached is not None:
+                bits |= cached
+                continue
+            pending.extend(targets[offsets[prereq]:offsets[prereq + 1]])
+        return bits
+
+    # Ancestor bitset of a catalog course (None if it is not in the catalog); lock held
+    def _lookup(self, course_id):
+        bits = self.entries.get(course_id)
+        if bits is not None:
+            self.hits += 1
+            self.entries.move_to_end(course_id)
+            return bits
+        self.misses += 1
+        graph = self.catalog.prerequisite_graph()
+        if not graph.is_in_catalog(course_id):
+            return None
+        bits = self.entries[course_id] = self._closure(graph, graph.index[course_id])
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+        return bits
+
+    def ancestor_bits(self, course_id):
+        with self.lock:
+            return self._lookup(course_id)
+
+    # IDs of every course that must be taken before course_id, in no particular order
+    # (None if it is not in the catalog)
+    def ancestors(self, course_id):
+        with self.lock:
+            bits = self._lookup(course_id)
+            if bits is None:
+                return None
+            own = self.ordinals.get(course_id)
+            if own is not None:
+                bits &= ~(1 << own)
+            found = []
+            while bits:
+                lowest = bits & -bits
+                found.append(self.ids[lowest.bit_length() - 1])
+                bits ^= lowest
+            return found
+
+    def is_prerequisite(self, prereq_id, course_id):
+        with self.lock:
+            bits = self._lookup(course_id)
+            ordinal = self.ordinals.get(prereq_id)
+            return bool(bits and ordinal is not None and prereq_id != course_id and bits >> ordinal & 1)
+
+    # The given courses were inserted, deleted or given new prerequisites: drop their sets
+    # and every cached set that reaches them
+    def invalidate(self, course_ids):
+        with self.lock:
+            mask = 0
+            stale = []
+            for course_id in course_ids:
+                if course_id in self.entries:
+                    stale.append(course_id)
+                ordinal = self.ordinals.get(course_id)
+                if ordinal is not None:
+                    mask |= 1 << ordinal
+            if mask:
+                stale.extend(cached_id for cached_id, bits in self.entries.items() if bits & mask)
+            for cached_id in stale:
+                if self.entries.pop(cached_id, None) is not None:
+                    self.invalidations += 1
+
+    def clear(self):
+        with self.lock:
+            self.invalidations += len(self.entries)
+            self.entries.clear()
+            self.ordinals.clear()
+            self.ids.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self.entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+# Term-by-term degree plans over a compiled prerequisite graph. Only the graph's integer
+# arrays are kept, so a planner is cheap to send to worker processes for batch planning.
+# A plan covers the targets and every prerequisite of theirs not yet completed. Terms are
+# filled by layered list scheduling: a course becomes ready the term after its last
+# prerequisite, and each term takes up to max_per_term ready courses, longest remaining
+# prerequisite chain (critical path) first and then by course ID.
+class DegreePlanner:
+    def __init__(self, graph, max_per_term=COURSES_PER_TERM):
+        if max_per_term < 1:
+            raise ValueError("max_per_term must be at least 1")
+        self.max_per_term = max_per_term
+        self.ids = graph.ids
+        self.index = graph.index
+        self.catalog_size = graph.catalog_size
+        self.prereq_offsets = graph.prereq_offsets
+        self.prereq_targets = graph.prereq_targets
+
+    # Returns {"terms": [[course IDs], ...], "unknown": targets not in the catalog,
+    # "missing": needed prerequisites not in the catalog, "blocked": needed courses that can
+    # never be taken because of a missing prerequisite or a prerequisite cycle}
+    def plan(self, targets, completed=()):
+        index, offsets, edges = self.index, self.prereq_offsets, self.prereq_targets
+        done = {index[course_id] for course_id in completed if course_id in index}
+        unknown = [course_id for course_id in targets if index.get(course_id, self.catalog_size) >= self.catalog_size]
+
+        # Walk down from the targets to every prerequisite that is still needed
+        needed = set()
+        remaining = {}   # needed course -> prerequisite edges not yet scheduled
+        dependents = {}  # needed course -> needed courses that list it as a prerequisite
+        stack = [index[course_id] for course_id in targets if course_id not in unknown and index[course_id] not in done]
+        while stack:
+            node = stack.pop()
+            if node in needed:
+                continue
+            needed.add(node)
+            remaining[node] = 0
+            for edge in range(offsets[node], offsets[node + 1]):
+                prereq = edges[edge]
+                if prereq not in done:
+                    remaining[node] += 1
+                    dependents.setdefault(prereq, []).append(node)
+                    stack.append(prereq)
+
+        # Topological order of the courses that can actually be scheduled (Kahn's algorithm)
+        left = dict(remaining)
+        order = [node for node in needed if left[node] == 0 and node < self.catalog_size]
+        for node in order:  # order grows while we iterate over it
+            for dependent in dependents.get(node, ()):
+                left[dependent] -= 1
+                if left[dependent] == 0:
+                    order.append(dependent)
+
+        # Critical path: the longest chain of needed courses starting at each course
+        chain = dict.fromkeys(order, 1)
+        for node in reversed(order):
+            for edge in range(offsets[node], offsets[node + 1]):
+                prereq = edges[edge]
+                if prereq in chain and chain[prereq] < chain[node] + 1:
+                    chain[prereq] = chain[node] + 1
+
+        terms = []
+        ready = [(-chain[node], self.ids[node], node) for node in order if remaining[node] == 0]
+        heapq.heapify(ready)
+        while ready:
+            term = [heapq.heappop(ready) for _ in range(min(self.max_per_term, len(ready)))]
+            terms.append([course_id for _, course_id, _ in term])
+            for _, _, node in term:
+                for dependent in dependents.get(node, ()):
+                    remaining[dependent] -= 1
+                    if remaining[dependent] == 0:
+                        heapq.heappush(ready, (-chain[dependent], self.ids[dependent], dependent))
+
+        unscheduled = needed.difference(chain)
+        return {
+            "terms": terms,
+            "unknown": unknown,
+            "missing": sorted(self.ids[node] for node in unscheduled if node >= self.catalog_size),
+            "blocked": sorted(self.ids[node] for node in unscheduled if node < self.catalog_size),
+        }
+
+# Readable lines for a degree plan
+def format_degree_plan(plan):
+    lines = [f"Term {number}: {', '.join(term)}" for number, term in enumerate(plan["terms"], 1)]
+    if plan["unknown"]:
+        lines.append(f"Not in the catalog: {', '.join(plan['unknown'])}")
+    if plan["missing"]:
+        lines.append(f"Prerequisites missing from the catalog: {', '.join(plan['missing'])}")
+    if plan["blocked"]:
+        lines.append(f"Cannot be scheduled (missing prerequisite or prerequisite cycle): {', '.join(plan['blocked'])}")
+    return lines
+
+# Sort key for lists of courses kept in course_id order
+course_id_of = attrgetter("course_id")
+
+# Secondary index of the catalog by number of prerequisites: one bucket per count, each in
+# course_id order. It is updated on every insert and prerequisite change, so views sorted by
+# prerequisite count stream straight out of the buckets instead of re-sorting the tree.
+class PrerequisiteCountIndex:
+    def __init__(self):
+        self.buckets = {}  # prerequisite count -> courses in course_id order
+
+    def __len__(self):
+        return sum(len(bucket) for bucket in self.buckets.values())
+
+    # Replace the index with courses already in course_id order (a bulk load)
+    def rebuild(self, courses):
+        self.buckets = {}
+        for course in courses:
+            bucket = self.buckets.get(len(course.prerequisites))
+            if bucket is None:
+                bucket = self.buckets[len(course.prerequisites)] = []
+            bucket.append(course)
+
+    # Equal IDs go after the ones already indexed, matching the tree's insertion order
+    def add(self, course):
+        insort(self.buckets.setdefault(len(course.prerequisites), []), course, key=course_id_of)
+
+    # count is the number of prerequisites the course was indexed under
+    def remove(self, course, count):
+        bucket = self.buckets.get(count, [])
+        position = bisect_left(bucket, course.course_id, key=course_id_of)
+        while position < len(bucket) and bucket[position] is not course:
+            position += 1
+        if position < len(bucket):
+            del bucket[position]
+            if not bucket:
+                del self.buckets[count]
+
+    # ((count, position), course) pairs from start onward, fewest prerequisites first
+    # (most first with most_first); a pair's position can be passed back as start to resume
+    def entries(self, start=None, most_first=False):
+        for count in sorted(self.buckets, reverse=most_first):
+            if start is not None and (count > start[0] if most_first else count < start[0]):
+                continue
+            bucket = self.buckets[count]
+            first = start[1] if start is not None and count == start[0] else 0
+            for position in range(first, len(bucket)):
+                yield (count, position), bucket[position]
+
+    def courses(self, most_first=False):
+        return (course for _, course in self.entries(most_first=most_first))
+
+# Reverse prerequisite index: for every prerequisite ID, the courses that list it, in
+# course_id order. It is updated on every load, insert, reload and prerequisite change, so
+# "what does this course unlock?" reads one list instead of scanning the catalog. IDs that
+# are not in the catalog are indexed too, so courses waiting on a missing course are found.
+class DependentIndex:
+    def __init__(self):
+        self.dependents = {}  # prerequisite ID -> courses requiring it, in course_id order
+
+    # Replace the index with courses already in course_id order (a bulk load)
+    def rebuild(self, courses):
+        self.dependents = {}
+        for course in courses:
+            for prereq in dict.fromkeys(course.prerequisites):
+                dependents = self.dependents.get(prereq)
+                if dependents is None:
+                    dependents = self.dependents[prereq] = []
+                dependents.append(course)
+
+    def add(self, course):
+        for prereq in dict.fromkeys(course.prerequisites):
+            insort(self.dependents.setdefault(prereq, []), course, key=course_id_of)
+
+    # prerequisites are the ones the course was indexed with
+    def remove(self, course, prerequisites):
+        for prereq in dict.fromkeys(prerequisites):
+            dependents = self.dependents.get(prereq, [])
+            position = bisect_left(dependents, course.course_id, key=course_id_of)
+            while position < len(dependents) and dependents[position] is not course:
+                position += 1
+            if position < len(dependents):
+                del dependents[position]
+                if not dependents:
+                    del self.dependents[prereq]
+
+    def direct(self, course_id):
+        return list(self.dependents.get(course_id, ()))
+
+# Lines describing a removal_impact() report
+def format_removal_impact(impact):
+    lines = []
+    for course_id in impact["removed"]:
+        direct, downstream = impact["direct"][course_id], impact["downstream"][course_id]
+        if not downstream:
+            lines.append(f"{course_id} is not a prerequisite of any course.")
+            continue
+        lines.append(f"{course_id} is needed by {len(downstream)} course(s), {len(direct)} directly: "
+                     f"{', '.join(course.course_id for course in direct)}")
+    if impact["blocked"]:
+        lines.append(f"Removing {', '.join(impact['removed'])} would block {len(impact['blocked'])} course(s):")
+        lines.extend(f"{course.course_id}: {course.course_name}" for course in impact["blocked"])
+    return lines
+
+# Differences between the loaded catalog and a fresh copy of it, matched by course_id and
+# compared by name and prerequisites. Built by BinarySearchTree.diff, applied by apply_changes.
+class CatalogChanges:
+    def __init__(self):
+        self.inserted = []    # Courses in the fresh copy that are not loaded yet
+        self.updated = []     # (loaded course, new name, new prerequisites)
+        self.deleted = []     # Loaded courses missing from the fresh copy, and repeated copies of an ID
+        self.loaded = 0       # Courses in the tree when the diff was taken
+        self.duplicates = False
+
+    def __bool__(self):
+        return bool(self.inserted or self.updated or self.deleted)
+
+    def summary(self):
+        return f"{len(self.inserted)} added, {len(self.updated)} updated, {len(self.deleted)} removed"
 
 # Binary Search Tree (BST) Implementation
+# About 290 bytes per course (tracemalloc, 200,000 courses); the keyword, prerequisite count
+# and dependent indexes bring it to about 2.2 KB
 class TreeNode:
+    __slots__ = ("course_id", "course_name", "prerequisites", "left", "right", "height")
+
     def __init__(self, course_id, course_name, prerequisites):
         self.course_id = course_id
         self.course_name = course_name
         self.prerequisites = prerequisites
         self.left = None
         self.right = None
+        self.height = 1  # Only maintained when the tree is in balanced mode
+
+# Height of a (possibly empty) subtree
+def node_height(node):
+    return node.height if node else 0
+
+# Bounds [prefix, upper) of the ID range holding every ID that starts with prefix
+# (upper is None when no bound is needed)
+def prefix_bounds(prefix):
+    upper = prefix
+    while upper and upper[-1] == chr(sys.maxunicode):
+        upper = upper[:-1]
+    return prefix, (upper[:-1] + chr(ord(upper[-1]) + 1) if upper else None)
 
+# With balanced=True the tree rebalances itself (AVL) after every insert, so a catalog
+# exported in sorted order still gives O(log n) lookups instead of a linked list.
 class BinarySearchTree:
-    def __init__(self):
+    def __init__(self, balanced=False):
         self.root = None
+        self.balanced = balanced
+        self.keyword_index = NGramIndex()
+        self._fuzzy_index = None  # Built by build_fuzzy_index() or the first fuzzy search, then kept up to date
+        self._prerequisite_graph = None
+        self.prerequisite_index = PrerequisiteCountIndex()
+        self.dependent_index = DependentIndex()
+        self.closure_cache = PrerequisiteClosureCache(self)
+        self._snapshot = None  # Answers search() while load_snapshot() builds the tree
+        self._loaded = threading.Event()
+        self._loaded.set()
+        self._load_error = None
+        # Held by apply_changes(), and by readers on other threads while a reload may be
+        # editing the tree in place
+        self.lock = threading.RLock()
 
-    def insert(self, course_id, course_name, prerequisites):
-        new_node = TreeNode(course_id, course_name, prerequisites)
+    # Build a balanced tree straight from CSV rows (header already skipped)
+    @classmethod
+    def from_rows(cls, rows, balanced=True):
+        bst = cls(balanced=balanced)
+        bst.bulk_load(parse_course_row(row) for row in rows if row)
+        return bst
+
+    @classmethod
+    def from_csv(cls, file_path, balanced=True, chunk_size=DEFAULT_CHUNK_SIZE):
+        bst = cls(balanced=balanced)
+        bst.bulk_load(course for chunk in CourseCsvStream(file_path, chunk_size) for course in chunk)
+        return bst
+
+    # Add many (course_id, course_name, prerequisites) entries at once: sort by course_id
+    # a single time and rebuild the tree from the median outward, so load time no longer
+    # depends on the file's row order. Existing nodes are kept and ties keep insertion order.
+    @timed("bulk_load")
+    def bulk_load(self, courses):
+        new_nodes = [TreeNode(course_id, course_name, prerequisites) for course_id, course_name, prerequisites in courses]
+        for node in new_nodes:
+            self.keyword_index.add(node)
+            if self._fuzzy_index is not None:
+                self._fuzzy_index.add(node)
+        self._prerequisite_graph = None
         if self.root is None:
-            self.root = new_node
+            self.closure_cache.clear()
         else:
-            self._insert_recursive(self.root, new_node)
+            self.closure_cache.invalidate(node.course_id for node in new_nodes)
+        nodes = list(self._in_order_nodes(self.root))
+        nodes.extend(new_nodes)
+        nodes.sort(key=lambda node: node.course_id)
+        self.prerequisite_index.rebuild(nodes)
+        self.dependent_index.rebuild(nodes)
+        self.root = self._build_balanced(nodes, 0, len(nodes) - 1)
+
+    # Fill an empty tree from a mapped CatalogSnapshot on a background thread. Until the tree
+    # and its indexes are built, search() is a binary search straight over the mapped file,
+    # so course lookups work as soon as the snapshot is opened. Everything else must wait
+    # for loaded (or call wait_until_loaded()).
+    def load_snapshot(self, snapshot):
+        self._snapshot = snapshot
+        self._loaded.clear()
+        threading.Thread(target=self._load_snapshot_rows, args=(snapshot,), daemon=True).start()
+
+    def _load_snapshot_rows(self, snapshot):
+        try:
+            self.bulk_load(snapshot.rows())
+            self.build_fuzzy_index()
+        except Exception as e:
+            self._load_error = e
+        finally:
+            # Not closed here, as a search() may still be reading it; the file is unmapped
+            # when the last reference goes away
+            self._snapshot = None
+            self._loaded.set()
+
+    # False while load_snapshot() is still building the tree
+    @property
+    def loaded(self):
+        return self._loaded.is_set()
+
+    # Block until load_snapshot() has finished, re-raising any error it hit
+    def wait_until_loaded(self):
+        self._loaded.wait()
+        if self._load_error is not None:
+            raise self._load_error
+
+    def _build_balanced(self, nodes, low, high):
+        if low > high:
+            return None
+        mid = (low + high) // 2
+        node = nodes[mid]
+        node.left = self._build_balanced(nodes, low, mid - 1)
+        node.right = self._build_balanced(nodes, mid + 1, high)
+        node.height = 1 + max(node_height(node.left), node_height(node.right))
+        return node
 
-    def _insert_recursive(self, current, new_node):
-        if new_node.course_id < current.course_id:
-            if current.left is None:
-                current.left = new_node
+    def insert(self, course_id, course_name, prerequisites):
+        new_node = TreeNode(course_id, course_name, prerequisites)
+        self._link(new_node)
+        self._index(new_node)
+        self._prerequisite_graph = None
+        self.closure_cache.invalidate([course_id])
+
+    # Add a course to the keyword, fuzzy, prerequisite count and dependent indexes
+    def _index(self, course):
+        self.keyword_index.add(course)
+        if self._fuzzy_index is not None:
+            self._fuzzy_index.add(course)
+        self.prerequisite_index.add(course)
+        self.dependent_index.add(course)
+
+    def _unindex(self, course):
+        self.keyword_index.remove(course)
+        if self._fuzzy_index is not None:
+            self._fuzzy_index.remove(course)
+        self.prerequisite_index.remove(course, len(course.prerequisites))
+        self.dependent_index.remove(course, course.prerequisites)
+
+    # Compare the tree with a fresh copy of the catalog without changing anything, so it can
+    # run while others read the tree. The first copy of a repeated course ID wins.
+    def diff(self, courses):
+        incoming = {}
+        for course in courses:
+            incoming.setdefault(course[0], course)
+        changes = CatalogChanges()
+        previous_id = None
+        for node in self._in_order_nodes(self.root):
+            course = node
+            changes.loaded += 1
+            if course.course_id == previous_id:
+                changes.deleted.append(course)  # Extra copy left by loading the same file twice
+                changes.duplicates = True
+                continue
+            previous_id = course.course_id
+            new = incoming.pop(course.course_id, None)
+            if new is None:
+                changes.deleted.append(course)
+            elif new[1] != course.course_name or new[2] != course.prerequisites:
+                changes.updated.append((course, new[1], new[2]))
+        changes.inserted = list(incoming.values())
+        return changes
+
+    # Apply a diff(): only changed courses are re-indexed and, unless a large share of the
+    # catalog was added or removed (or repeated IDs must be cleaned up), the tree is edited
+    # with single AVL inserts and deletes instead of being rebuilt
+    def apply_changes(self, changes):
+        with self.lock:
+            changed = [course.course_id for course in changes.deleted]  # Courses whose prerequisite sets change
+            for course in changes.deleted:
+                self._unindex(course)
+            for course, course_name, prerequisites in changes.updated:
+                if prerequisites != course.prerequisites:
+                    changed.append(course.course_id)
+                self._unindex(course)
+                course.course_name = course_name
+                course.prerequisites = prerequisites
+                self._index(course)
+            inserted = [TreeNode(*course) for course in changes.inserted]
+            for course in inserted:
+                self._index(course)
+                changed.append(course.course_id)
+
+            # The indexes are already current; only the tree shape is rebuilt or patched
+            if changes.duplicates or len(changes.inserted) + len(changes.deleted) > changes.loaded // 4:
+                removed = set(changes.deleted)
+                courses = [course for course in self._in_order_nodes(self.root) if course not in removed]
+                courses.extend(inserted)
+                courses.sort(key=course_id_of)
+                self.root = self._build_balanced(courses, 0, len(courses) - 1)
             else:
-                self._insert_recursive(current.left, new_node)
+                for course in changes.deleted:
+                    self._unlink(course.course_id)
+                for course in inserted:
+                    self._link(course)
+
+            self._prerequisite_graph = None
+            self.closure_cache.invalidate(changed)
+            return changes
+
+    # Bring the tree in line with a fresh copy of the catalog; returns the CatalogChanges
+    def reload(self, courses):
+        return self.apply_changes(self.diff(courses))
+
+    # Remove the node for course_id (IDs must be unique), rebalancing in balanced mode
+    def _unlink(self, course_id):
+        path = []
+        node = self.root
+        while node and node.course_id != course_id:
+            path.append(node)
+            node = node.left if course_id < node.course_id else node.right
+        if node is None:
+            return None
+        parent = path[-1] if path else None
+        if node.left and node.right:
+            # Move the in-order successor up into the node's place
+            below = []
+            successor = node.right
+            while successor.left:
+                below.append(successor)
+                successor = successor.left
+            if below:
+                below[-1].left = successor.right
+                successor.right = node.right
+            successor.left = node.left
+            successor.height = node.height
+            replacement = successor
+            path.append(successor)
+            path.extend(below)
         else:
-            if current.right is None:
-                current.right = new_node
+            replacement = node.left or node.right
+        if parent is None:
+            self.root = replacement
+        elif parent.left is node:
+            parent.left = replacement
+        else:
+            parent.right = replacement
+        node.left = node.right = None
+        if self.balanced:
+            self._rebalance_all(path)
+        return node
+
+    # Like _rebalance_path, but a deletion can need rotations at several levels
+    def _rebalance_all(self, path):
+        for i in range(len(path) - 1, -1, -1):
+            node = path[i]
+            node.height = 1 + max(node_height(node.left), node_height(node.right))
+            subtree = self._rebalance(node)
+            if subtree is not node:
+                if i == 0:
+                    self.root = subtree
+                elif path[i - 1].left is node:
+                    path[i - 1].left = subtree
+                else:
+                    path[i - 1].right = subtree
+
+    # Attach a new node at its BST position, rebalancing in balanced mode
+    def _link(self, new_node):
+        if self.root is None:
+            self.root = new_node
+            return
+        path = []  # Nodes visited on the way down, used to rebalance on the way back up
+        current = self.root
+        while True:
+            path.append(current)
+            if new_node.course_id < current.course_id:
+                if current.left is None:
+                    current.left = new_node
+                    break
+                current = current.left
             else:
-                self._insert_recursive(current.right, new_node)
+                if current.right is None:
+                    current.right = new_node
+                    break
+                current = current.right
+        if metrics.enabled:
+            metrics.observe("insert_depth", len(path) + 1)
+        if self.balanced:
+            self._rebalance_path(path)
+
+    # Walk back up the insert path fixing heights, rotating at the first unbalanced node
+    def _rebalance_path(self, path):
+        for i in range(len(path) - 1, -1, -1):
+            node = path[i]
+            old_height = node.height
+            node.height = 1 + max(node_height(node.left), node_height(node.right))
+            subtree = self._rebalance(node)
+            if subtree is not node:
+                if i == 0:
+                    self.root = subtree
+                elif path[i - 1].left is node:
+                    path[i - 1].left = subtree
+                else:
+                    path[i - 1].right = subtree
+                break  # A rotation restores the subtree's previous height
+            if node.height == old_height:
+                break  # Nothing above this node can have changed
+
+    def _rebalance(self, node):
+        balance = node_height(node.left) - node_height(node.right)
+        if balance > 1:
+            if node_height(node.left.left) < node_height(node.left.right):
+                node.left = self._rotate_left(node.left)
+            return self._rotate_right(node)
+        if balance < -1:
+            if node_height(node.right.right) < node_height(node.right.left):
+                node.right = self._rotate_right(node.right)
+            return self._rotate_left(node)
+        return node
+
+    def _rotate_left(self, node):
+        pivot = node.right
+        node.right = pivot.left
+        pivot.left = node
+        node.height = 1 + max(node_height(node.left), node_height(node.right))
+        pivot.height = 1 + max(node_height(pivot.left), node_height(pivot.right))
+        return pivot
+
+    def _rotate_right(self, node):
+        pivot = node.left
+        node.left = pivot.right
+        pivot.right = node
+        node.height = 1 + max(node_height(node.left), node_height(node.right))
+        pivot.height = 1 + max(node_height(pivot.left), node_height(pivot.right))
+        return pivot
 
     def search(self, course_id):
-        return self._search_recursive(self.root, course_id)
+        snapshot = self._snapshot
+        if snapshot is not None:
+            row = snapshot.search(course_id)
+            return TreeNode(*row) if row else None
+        if metrics.enabled:
+            return self._measured_search(course_id)
+        current = self.root
+        while current:
+            if current.course_id == course_id:
+                return current
+            elif course_id < current.course_id:
+                current = current.left
+            else:
+                current = current.right
+        return None
+
+    # search() recording its path length and key comparisons in metrics
+    def _measured_search(self, course_id):
+        start = time.perf_counter()
+        depth = comparisons = 0
+        found = None
+        current = self.root
+        while current:
+            depth += 1
+            comparisons += 1
+            if current.course_id == course_id:
+                found = current
+                break
+            comparisons += 1
+            current = current.left if course_id < current.course_id else current.right
+        metrics.record("search", start)
+        metrics.observe("search_depth", depth)
+        metrics.observe("search_comparisons", comparisons)
+        return found
+
+    # In-order walk using an explicit stack so deep trees never hit the recursion limit
+    def _in_order_nodes(self, node):
+        stack = []
+        while stack or node:
+            while node:
+                stack.append(node)
+                node = node.left
+            node = stack.pop()
+            yield node
+            node = node.right
+
+    # Courses in course_id order, produced one at a time
+    def __iter__(self):
+        return self.courses_from()
+
+    # In-order walk starting at the first course whose ID is >= course_id (the whole tree
+    # for None). Only the path down to the start is visited before the first course is yielded.
+    def courses_from(self, course_id=None):
+        stack = []
+        node = self.root
+        while node:
+            if course_id is None or course_id <= node.course_id:
+                stack.append(node)
+                node = node.left
+            else:
+                node = node.right
+        while stack:
+            node = stack.pop()
+            yield node
+            node = node.right
+            while node:
+                stack.append(node)
+                node = node.left
+
+    # Courses with lo <= course_id < hi, in order (either bound may be None). The walk
+    # descends straight to lo and stops at hi, so k courses cost O(log n + k).
+    def range(self, lo=None, hi=None):
+        for course in self.courses_from(lo):
+            if hi is not None and course.course_id >= hi:
+                return
+            yield course
+
+    # Courses whose ID starts with prefix, e.g. prefix("CSCI3") for the CSCI 300 level
+    def prefix(self, prefix):
+        return self.range(*prefix_bounds(prefix))
+
+    # Replace a course's prerequisites, keeping the derived prerequisite data in step
+    def update_prerequisites(self, course_id, prerequisites):
+        course = self.search(course_id)
+        if course is None:
+            return False
+        self.prerequisite_index.remove(course, len(course.prerequisites))
+        self.dependent_index.remove(course, course.prerequisites)
+        course.prerequisites = prerequisites
+        self.prerequisite_index.add(course)
+        self.dependent_index.add(course)
+        self._prerequisite_graph = None
+        self.closure_cache.invalidate([course_id])
+        return True
+
+    # Compiled once per load and reused until the next insert
+    def prerequisite_graph(self):
+        if self._prerequisite_graph is None:
+            self._prerequisite_graph = PrerequisiteGraph(self._in_order_nodes(self.root))
+        return self._prerequisite_graph
 
-    def _search_recursive(self, current, course_id):
-        if current is None:
+    # Every course that must be taken before course_id, from the closure cache, in a valid
+    # study order: shallowest prerequisite chain first (see PrerequisiteGraph.depths), then by
+    # course ID. Courses on or behind a prerequisite cycle come last. None for unknown IDs.
+    def all_prerequisites(self, course_id):
+        ancestors = self.closure_cache.ancestors(course_id)
+        if ancestors is None:
             return None
-        if current.course_id == course_id:
-            return current
-        elif course_id < current.course_id:
-            return self._search_recursive(current.left, course_id)
-        else:
-            return self._search_recursive(current.right, course_id)
+        graph = self.prerequisite_graph()
+        depths, index = graph.depths(), graph.index
+        return sorted(ancestors, key=lambda prereq: (depths[index[prereq]] < 0, depths[index[prereq]], prereq))
+
+    # Courses ordered by number of prerequisites, ties in course_id order. Streamed from
+    # the prerequisite count index, so the first k courses cost O(k).
+    def courses_by_prerequisites(self, most_first=False):
+        return self.prerequisite_index.courses(most_first)
+
+    # Courses that list course_id as a prerequisite, in course_id order
+    def dependents(self, course_id):
+        return self.dependent_index.direct(course_id)
+
+    # Every course that needs course_id, directly or further down a prerequisite chain, in
+    # course_id order. Only the courses reached and their index entries are visited.
+    def downstream(self, course_id):
+        seen = {course_id}
+        found = []
+        pending = [course_id]
+        while pending:
+            for course in self.dependents(pending.pop()):
+                if course.course_id not in seen:
+                    seen.add(course.course_id)
+                    found.append(course)
+                    pending.append(course.course_id)
+        found.sort(key=course_id_of)
+        return found
+
+    # What removing course_ids (e.g. cancelled this term) would block: each removed course's
+    # direct and downstream dependents, and every blocked course once, in course_id order.
+    # Removed courses are not counted as blocked. The cost follows the downstream subgraphs.
+    def removal_impact(self, course_ids):
+        removed = dict.fromkeys(course_ids)
+        impact = {"removed": list(removed), "direct": {}, "downstream": {}, "blocked": []}
+        blocked = {}
+        for course_id in removed:
+            impact["direct"][course_id] = self.dependents(course_id)
+            impact["downstream"][course_id] = self.downstream(course_id)
+            for course in impact["downstream"][course_id]:
+                blocked.setdefault(course.course_id, course)
+        impact["blocked"] = sorted((course for course_id, course in blocked.items() if course_id not in removed), key=course_id_of)
+        return impact
+
+    # Courses ordered by the length of their longest prerequisite chain (see PrerequisiteGraph)
+    def courses_by_depth(self, deepest_first=False):
+        return self.prerequisite_graph().courses_by_depth(deepest_first)
+
+    # Planner for term-by-term degree plans over the current catalog
+    def degree_planner(self, max_per_term=COURSES_PER_TERM):
+        return DegreePlanner(self.prerequisite_graph(), max_per_term)
+
+    @timed("keyword_search")
+    def keyword_search(self, keyword):
+        return self.keyword_index.search(keyword)
+
+    # Best matches for a possibly misspelled query ("algoritms", "CSC300"), best first
+    @timed("fuzzy_search")
+    def fuzzy_search(self, query, k=FUZZY_RESULTS):
+        self.build_fuzzy_index()
+        return self._fuzzy_index.search(query, k)
+
+    # Build the fuzzy index now rather than on the first fuzzy search. The GUI calls this on
+    # the loading thread, before the tree is handed over, so no search waits for it.
+    @timed("build_fuzzy_index")
+    def build_fuzzy_index(self):
+        if self._fuzzy_index is None:
+            fuzzy_index = FuzzyIndex()
+            for course in self:
+                fuzzy_index.add(course)
+            self._fuzzy_index = fuzzy_index
+
+    @timed("collect_courses")
+    def collect_courses(self, node, courses):
+        courses.extend(self._in_order_nodes(node))
+        return courses
 
     def print_courses(self, node, output_list):
-        if node:
-            self.print_courses(node.left, output_list)
-            output_list.append(f"{node.course_id}: {node.course_name} - Prerequisites: {', '.join(node.prerequisites) if node.prerequisites else 'None'}")
-            self.print_courses(node.right, output_list)
+        output_list.extend(format_course(current) for current in self._in_order_nodes(node))
+
+# One line of course output, as used by the course lists
+def format_course(course):
+    return f"{course.course_id}: {course.course_name} - Prerequisites: {', '.join(course.prerequisites) if course.prerequisites else 'None'}"
+
+# Split one CSV row into (course_id, course_name, prerequisites). IDs are interned so a
+# course and every prerequisite list naming it share one string.
+def parse_course_row(row):
+    course_id, course_name, *prerequisites = row
+    prerequisites = [sys.intern(p.strip()) for p in prerequisites if p.strip()]
+    return sys.intern(course_id), course_name, prerequisites
+
+# Streams a course CSV as chunks of validated, parsed rows so only one chunk of raw rows
+# is in memory at a time. Rows without a course ID or name are skipped and counted.
+# The counters are kept up to date as the file is read, for progress reporting.
+class CourseCsvStream:
+    def __init__(self, file_path, chunk_size=DEFAULT_CHUNK_SIZE):
+        self.file_path = file_path
+        self.chunk_size = chunk_size
+        self.total_bytes = os.path.getsize(file_path)  # Raises FileNotFoundError up front
+        self.bytes_read = 0
+        self.rows_loaded = 0
+        self.rows_skipped = 0
+
+    def __iter__(self):
+        with open(self.file_path, 'r', newline='') as file:
+            reader = csv.reader(iter(file.readline, ''))  # readline keeps file.tell() usable
+            next(reader, None)  # Skip header row
+            chunk = []
+            start = time.perf_counter()
+            for row in reader:
+                if not row:
+                    continue  # Blank line
+                if len(row) < 2 or not row[0].strip() or not row[1].strip():
+                    self.rows_skipped += 1
+                    continue
+                chunk.append(parse_course_row(row))
+                if len(chunk) >= self.chunk_size:
+                    self.rows_loaded += len(chunk)
+                    self.bytes_read = file.tell()
+                    if metrics.enabled:
+                        metrics.record("csv_parse_chunk", start)
+                        metrics.count("csv_rows_parsed", len(chunk))
+                    yield chunk
+                    chunk = []
+                    start = time.perf_counter()
+            self.rows_loaded += len(chunk)
+            self.bytes_read = self.total_bytes
+            if metrics.enabled:
+                metrics.record("csv_parse_chunk", start)
+                metrics.count("csv_rows_parsed", len(chunk))
+                metrics.count("csv_rows_skipped", self.rows_skipped)
+            if chunk:
+                yield chunk
+
+    def percent_complete(self):
+        return 100 * self.bytes_read // self.total_bytes if self.total_bytes else 100
+
+# Binary catalog snapshots: magic, source CSV size / mtime / SHA-256, then the counts of
+# courses, strings, prerequisite edges and string-blob bytes. Arrays use native byte order,
+# since a snapshot is a local startup cache rather than an exchange format.
+SNAPSHOT_MAGIC = b"CPSNAP01"
+SNAPSHOT_HEADER = struct.Struct("=8sQq32sIIIQ")
+SNAPSHOT_SUFFIX = ".snapshot"
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for block in iter(lambda: file.read(1 << 20), b''):
+            digest.update(block)
+    return digest.digest()
+
+# Memory-mapped view of a catalog snapshot. Opening one only reads the header, and pages
+# are faulted in as courses are touched. After the header come the string offsets (uint64),
+# the course ID and name string numbers, the prerequisite offsets and targets (uint32) and
+# the UTF-8 string blob. Each distinct string is stored once and courses are sorted by
+# course_id, so search() is a binary search straight over the mapped file.
+class CatalogSnapshot:
+    def __init__(self, path):
+        with open(path, 'rb') as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._mmap) < SNAPSHOT_HEADER.size:
+            self._mmap.close()
+            raise ValueError(f"{path} is not a valid catalog snapshot")
+        (magic, self.source_size, self.source_mtime_ns, self.source_sha256,
+         self.course_count, string_count, edge_count, blob_size) = SNAPSHOT_HEADER.unpack_from(self._mmap, 0)
+        expected_size = (SNAPSHOT_HEADER.size + 8 * (string_count + 1) + 4 * (3 * self.course_count + 1)
+                         + 4 * edge_count + blob_size)
+        if magic != SNAPSHOT_MAGIC or len(self._mmap) != expected_size:
+            self._mmap.close()
+            raise ValueError(f"{path} is not a valid catalog snapshot")
+        self._view = memoryview(self._mmap)
+        self._position = SNAPSHOT_HEADER.size
+        self._string_offsets = self._section(string_count + 1, 'Q')
+        self._course_ids = self._section(self.course_count, 'I')
+        self._course_names = self._section(self.course_count, 'I')
+        self._prereq_offsets = self._section(self.course_count + 1, 'I')
+        self._prereq_targets = self._section(edge_count, 'I')
+        self._blob = self._section(blob_size, 'B')
+
+    def _section(self, count, fmt):
+        size = count * struct.calcsize(fmt)
+        section = self._view[self._position:self._position + size].cast(fmt)
+        self._position += size
+        return section
+
+    def __len__(self):
+        return self.course_count
+
+    def _string(self, number):
+        return str(self._blob[self._string_offsets[number]:self._string_offsets[number + 1]], 'utf-8')
+
+    def course_id(self, position):
+        return self._string(self._course_ids[position])
+
+    # (course_id, course_name, prerequisites) for the course at a sorted position. IDs are
+    # interned, as when parsing the CSV, so a tree loaded from here shares one string per ID.
+    def row(self, position):
+        first, last = self._prereq_offsets[position], self._prereq_offsets[position + 1]
+        prerequisites = [sys.intern(self._string(target)) for target in self._prereq_targets[first:last]]
+        return sys.intern(self.course_id(position)), self._string(self._course_names[position]), prerequisites
+
+    def rows(self):
+        for position in range(self.course_count):
+            yield self.row(position)
+
+    def search(self, course_id):
+        low, high = 0, self.course_count
+        while low < high:
+            mid = (low + high) // 2
+            if self.course_id(mid) < course_id:
+                low = mid + 1
+            else:
+                high = mid
+        if low < self.course_count and self.course_id(low) == course_id:
+            return self.row(low)
+        return None
+
+    # Still valid if the source CSV has the same size and mtime, or the same content hash
+    # when only its mtime moved (e.g. the file was touched or copied)
+    def is_current(self, source_path):
+        stat = os.stat(source_path)
+        if stat.st_size != self.source_size:
+            return False
+        if stat.st_mtime_ns == self.source_mtime_ns:
+            return True
+        return file_sha256(source_path) == self.source_sha256
+
+    def close(self):
+        for section in (self._string_offsets, self._course_ids, self._course_names,
+                        self._prereq_offsets, self._prereq_targets, self._blob, self._view):
+            section.release()
+        self._mmap.close()
+
+    # Write (course_id, course_name, prerequisites) rows loaded from source_path to path
+    @staticmethod
+    def write(path, rows, source_path):
+        rows = sorted(rows, key=lambda row: row[0])
+        strings = {}  # string -> string number, in first-seen order
+        course_ids = array('I', (strings.setdefault(row[0], len(strings)) for row in rows))
+        course_names = array('I', (strings.setdefault(row[1], len(strings)) for row in rows))
+        prereq_offsets = array('I', [0])
+        prereq_targets = array('I')
+        for _, _, prerequisites in rows:
+            prereq_targets.extend(strings.setdefault(prereq, len(strings)) for prereq in prerequisites)
+            prereq_offsets.append(len(prereq_targets))
+        encoded = [text.encode('utf-8') for text in strings]
+        string_offsets = array('Q', [0])
+        for text in encoded:
+            string_offsets.append(string_offsets[-1] + len(text))
+        blob = b''.join(encoded)
+
+        stat = os.stat(source_path)
+        header = SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, stat.st_size, stat.st_mtime_ns, file_sha256(source_path),
+                                      len(rows), len(strings), len(prereq_targets), len(blob))
+        temp_path = path + ".tmp"
+        with open(temp_path, 'wb') as file:
+            file.write(header)
+            for section in (string_offsets, course_ids, course_names, prereq_offsets, prereq_targets):
+                section.tofile(file)
+            file.write(blob)
+        os.replace(temp_path, path)  # Readers never see a half-written snapshot
+
+# Open the snapshot at snapshot_path if it still matches source_path, otherwise None
+def open_current_snapshot(snapshot_path, source_path):
+    try:
+        snapshot = CatalogSnapshot(snapshot_path)
+    except (OSError, ValueError):
+        return None
+    try:
+        if snapshot.is_current(source_path):
+            return snapshot
+    except OSError:
+        pass  # Source CSV is gone; let the normal load report it
+    snapshot.close()
+    return None
 
 # MongoDB connection setup
-client = MongoClient("mongodb://localhost:27017/")
-db = client["course_planner"]
-courses_collection = db["courses"]
+# COURSE_PLANNER_MONGO_URI points the planner at another server
+MONGO_URI = os.environ.get("COURSE_PLANNER_MONGO_URI", "mongodb://localhost:27017/")
+
+# Lazily created, pooled MongoDB connection. pymongo is imported and the MongoClient built
+# on first use rather than at import time, so CSV-only sessions never pay for connection
+# setup or server selection and do not need a running mongod (or pymongo) at all.
+class MongoConnectionManager:
+    def __init__(self, uri=MONGO_URI, database="course_planner", collection="courses",
+                 max_pool_size=10, min_pool_size=0, connect_timeout_ms=2000, server_selection_timeout_ms=2000):
+        self.uri = uri
+        self.database_name = database
+        self.collection_name = collection
+        self.max_pool_size = max_pool_size
+        self.min_pool_size = min_pool_size
+        self.connect_timeout_ms = connect_timeout_ms
+        self.server_selection_timeout_ms = server_selection_timeout_ms
+        self._client = None
+        self._lock = threading.Lock()
+
+    def client(self):
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    from pymongo import MongoClient
+                    self._client = MongoClient(self.uri, maxPoolSize=self.max_pool_size, minPoolSize=self.min_pool_size,
+                                               connectTimeoutMS=self.connect_timeout_ms,
+                                               serverSelectionTimeoutMS=self.server_selection_timeout_ms)
+        return self._client
+
+    def collection(self):
+        return self.client()[self.database_name][self.collection_name]
+
+    # True if the server answers a ping within the server selection timeout
+    def health_check(self):
+        try:
+            self.client().admin.command("ping")
+            return True
+        except Exception:
+            return False
+
+    def close(self):
+        with self._lock:
+            if self._client is not None:
+                self._client.close()
+                self._client = None
+
+mongo = MongoConnectionManager()
+
+def get_courses_collection():
+    return mongo.collection()
+
+# Prerequisite IDs stored on a MongoDB course document (prerequisite_1, prerequisite_2, ...)
+def prerequisites_from_document(document):
+    prerequisites = []
+    number = 1
+    while f"prerequisite_{number}" in document:
+        if document[f"prerequisite_{number}"]:
+            prerequisites.append(document[f"prerequisite_{number}"])
+        number += 1
+    return prerequisites
+
+# MongoDB document for a course, in the same shape mongoimport gives the CSV
+def course_to_document(course):
+    document = {"course_id": course.course_id, "course_name": course.course_name}
+    for number, prereq in enumerate(course.prerequisites, start=1):
+        document[f"prerequisite_{number}"] = prereq
+    return document
+
+# Read-through cache sitting between the MongoDB search functions and the courses collection.
+# Entries are evicted least-recently-used past maxsize and expire ttl seconds after they were
+# fetched. "Not found" results are cached as None so repeated bad IDs stay local too.
+class CourseLookupCache:
+    def __init__(self, maxsize=COURSE_CACHE_SIZE, ttl=COURSE_CACHE_TTL, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        self.entries = OrderedDict()  # course ID -> (expires at, document or None)
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    # Cached documents for course_ids, plus the IDs that have to be fetched
+    def _lookup(self, course_ids):
+        now = self.clock()
+        found = {}
+        missing = []
+        with self.lock:
+            for course_id in course_ids:
+                entry = self.entries.get(course_id)
+                if entry is not None and entry[0] > now:
+                    self.hits += 1
+                    self.entries.move_to_end(course_id)
+                    found[course_id] = entry[1]
+                    continue
+                if entry is not None:
+                    del self.entries[course_id]
+                    self.expirations += 1
+                self.misses += 1
+                missing.append(course_id)
+        return found, missing
+
+    def _store(self, documents):
+        expires_at = self.clock() + self.ttl
+        with self.lock:
+            for course_id, document in documents.items():
+                self.entries[course_id] = (expires_at, document)
+                self.entries.move_to_end(course_id)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    # Document for course_id (or None), calling load(course_id) only on a miss
+    def get(self, course_id, load):
+        found, missing = self._lookup([course_id])
+        if missing:
+            found[course_id] = load(course_id)
+            self._store(found)
+        return found[course_id]
+
+    # {course_id: document} for the IDs that exist, calling load_many(missing_ids) once for
+    # every ID that is not cached; load_many returns {course_id: document} for the IDs it found
+    def get_many(self, course_ids, load_many):
+        found, missing = self._lookup(course_ids)
+        if missing:
+            fetched = load_many(missing)
+            fetched = {course_id: fetched.get(course_id) for course_id in missing}
+            self._store(fetched)
+            found.update(fetched)
+        return {course_id: document for course_id, document in found.items() if document is not None}
+
+    # Drop the given IDs, or everything when course_ids is None
+    def invalidate(self, course_ids=None):
+        with self.lock:
+            if course_ids is None:
+                self.entries.clear()
+                return
+            for course_id in course_ids:
+                self.entries.pop(course_id, None)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self.entries),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+course_lookup_cache = CourseLookupCache()
+
+# One course document through the read-through cache (None if it is not in MongoDB)
+def find_course_in_mongodb(course_id):
+    return course_lookup_cache.get(course_id, fetch_course_from_mongodb)
+
+@timed("mongo_find_one")
+def fetch_course_from_mongodb(course_id):
+    return get_courses_collection().find_one({"course_id": course_id}, COURSE_PROJECTION)
+
+# Look up many course IDs with one $in query per batch instead of one find_one per ID.
+# Returns {course_id: document} for the IDs that were found.
+# Lookups against the default collection go through the read-through cache.
+def find_courses_in_mongodb(course_ids, collection=None, batch_size=MONGO_BATCH_SIZE):
+    course_ids = list(dict.fromkeys(course_ids))  # Drop repeats, keep order
+    if collection is None:
+        return course_lookup_cache.get_many(course_ids, lambda missing: fetch_courses_from_mongodb(get_courses_collection(), missing, batch_size))
+    return fetch_courses_from_mongodb(collection, course_ids, batch_size)
+
+def fetch_courses_from_mongodb(collection, course_ids, batch_size):
+    found = {}
+    for start in range(0, len(course_ids), batch_size):
+        batch = course_ids[start:start + batch_size]
+        round_trip = time.perf_counter()
+        for document in collection.find({"course_id": {"$in": batch}}, COURSE_PROJECTION):
+            found.setdefault(document["course_id"], document)
+        if metrics.enabled:
+            metrics.record("mongo_find_batch", round_trip)
+    return found
+
+# Upsert every course in the BST into MongoDB with unordered, chunked bulk writes.
+# Documents are replaced whole so removed prerequisites do not linger.
+def sync_courses_to_mongodb(bst, collection=None, batch_size=MONGO_BATCH_SIZE):
+    collection = get_courses_collection() if collection is None else collection
+    collection.create_index("course_id")
+    totals = {"matched": 0, "upserted": 0}
+    batch = []
+    for course in bst:
+        batch.append(course)
+        if len(batch) >= batch_size:
+            write_course_batch(collection, batch, totals)
+            batch = []
+    if batch:
+        write_course_batch(collection, batch, totals)
+    return totals
+
+@timed("mongo_bulk_write")
+def write_course_batch(collection, courses, totals):
+    from pymongo import ReplaceOne
+    result = collection.bulk_write([ReplaceOne({"course_id": course.course_id}, course_to_document(course), upsert=True) for course in courses], ordered=False)
+    course_lookup_cache.invalidate(course.course_id for course in courses)
+    totals["matched"] += result.matched_count
+    totals["upserted"] += result.upserted_count
+
+# Stream course documents out of MongoDB with a projected cursor that fetches batch_size
+# documents per round-trip, so callers can show rows before the whole collection arrives
+def iter_courses_from_mongodb(collection=None, batch_size=MONGO_BATCH_SIZE):
+    collection = get_courses_collection() if collection is None else collection
+    yield from collection.find({}, COURSE_PROJECTION, batch_size=batch_size)
+
+# One display line for a MongoDB course document
+def format_course_document(document):
+    prerequisites = prerequisites_from_document(document)
+    return f"{document['course_id']}: {document['course_name']} - Prerequisites: {', '.join(prerequisites) if prerequisites else 'None'}"
+
+# Prerequisite cycles and prerequisites missing from a loaded catalog
+def prerequisite_warnings(bst):
+    graph = bst.prerequisite_graph()
+    warnings = [f"{prereq} is listed as a prerequisite of {', '.join(courses)} but is not in the catalog." for prereq, courses in graph.missing_prerequisites().items()]
+    warnings.extend(f"Prerequisite cycle between {', '.join(cycle)}." for cycle in graph.find_cycles())
+    return warnings
+
+# Runs on a worker thread: build a tree holding the file's courses. A reload is diffed
+# against the current tree without locking it, then only the changes are applied under
+# bst.lock, so GUI reads wait for the edit rather than for the whole load. A first load
+# from a snapshot returns at once with the tree still loading (load_snapshot). Returns
+# (tree, status message); the GUI swaps it in.
+def build_catalog_from_csv(task, current_bst, file_path):
+    rows = []
+    messages = []
+    snapshot = open_current_snapshot(file_path + SNAPSHOT_SUFFIX, file_path)
+    if snapshot and current_bst.root is None:
+        # Searches work as soon as the GUI has the tree; the rest is indexed in the background
+        bst = BinarySearchTree(balanced=True)
+        bst.load_snapshot(snapshot)
+        return bst, "✅ Courses successfully loaded into BST from snapshot.\n⏳ Indexing the catalog in the background; Search Course works now.\n"
+    if snapshot:
+        rows.extend(snapshot.rows())
+        snapshot.close()
+        messages.append("✅ Courses successfully loaded into BST from snapshot.\n")
+    else:
+        stream = CourseCsvStream(file_path)
+        courses = []
+        for chunk in stream:
+            task.check_cancelled()
+            courses.extend(chunk)
+            task.report_progress(f"⏳ Loading courses... {stream.percent_complete()}% ({stream.rows_loaded} rows)")
+        messages.append("✅ Courses successfully loaded into BST from CSV.\n")
+        if stream.rows_skipped:
+            messages.append(f"\n⚠️ Skipped {stream.rows_skipped} row(s) missing a course ID or name.")
+        try:
+            CatalogSnapshot.write(file_path + SNAPSHOT_SUFFIX, courses, file_path)
+        except OSError as e:
+            messages.append(f"\n⚠️ Could not write snapshot: {e}")
+        rows.extend(courses)
+    task.check_cancelled()
+    if current_bst.root is not None:
+        task.report_progress("⏳ Comparing with the loaded catalog...")
+        changes = current_bst.diff(rows)
+        task.check_cancelled()
+        bst = current_bst
+        messages.append(f"\n🔄 Catalog reloaded: {bst.apply_changes(changes).summary()}.")
+    else:
+        task.report_progress("⏳ Building the course tree...")
+        bst = BinarySearchTree(balanced=True)
+        bst.bulk_load(rows)
+        task.check_cancelled()
+        task.report_progress("⏳ Building the search indexes...")
+        bst.build_fuzzy_index()
+    with bst.lock:
+        messages.extend(f"\n⚠️ {warning}" for warning in prerequisite_warnings(bst))
+    return bst, "".join(messages)
+
+# Runs on a worker thread: plan against the tree as it is now, even if a reload starts
+def plan_degree(bst, targets, completed, max_per_term):
+    with bst.lock:
+        planner = bst.degree_planner(max_per_term)
+    return planner.plan(targets, completed)
+
+# Runs on a worker thread: the prerequisite chain report for one course
+def prerequisite_chain_report(bst, course_id):
+    with bst.lock:
+        graph = bst.prerequisite_graph()
+        chain = bst.all_prerequisites(course_id)
+    if not graph.is_in_catalog(course_id):
+        return "❌ Course not found in BST."
+    if not chain:
+        return f"{course_id} has no prerequisites."
+    lines = [f"{prereq}" if graph.is_in_catalog(prereq) else f"{prereq} (not in catalog)" for prereq in chain]
+    return f"📌 Take these courses before {course_id}, in order:\n" + "\n".join(lines)
+
+# Runs on a worker thread: report lines for removing course_ids from the catalog
+def removal_impact_report(bst, course_ids):
+    with bst.lock:
+        impact = bst.removal_impact(course_ids)
+    return [f"🔓 Impact of removing {', '.join(course_ids)}:"] + format_removal_impact(impact)
+
+# Runs on a worker thread: closest courses to a keyword that matched nothing
+def fuzzy_suggestions_report(bst, keyword):
+    with bst.lock:
+        suggestions = bst.fuzzy_search(keyword)
+    lines = [format_course(course) for course in suggestions]
+    return "No exact matches. Closest courses:\n" + "\n".join(lines) if lines else "No matching courses found."
+
+# Runs on a worker thread: the tree's courses, listed under its lock so a reload cannot
+# change the tree's shape while it is being walked
+def courses_of(bst):
+    with bst.lock:
+        return list(bst)
+
+# Runs on a worker thread: wait for a tree being loaded from a snapshot, then check it
+def wait_and_check_catalog(bst):
+    bst.wait_until_loaded()
+    with bst.lock:
+        return prerequisite_warnings(bst)
+
+# Runs on a worker thread: hand each batch of formatted MongoDB courses to the GUI as it arrives
+def stream_mongodb_courses(task):
+    shown = 0
+    lines = []
+    for course in iter_courses_from_mongodb():
+        lines.append(format_course_document(course))
+        if len(lines) >= MONGO_BATCH_SIZE:
+            task.check_cancelled()
+            task.report_progress(("\n" if shown else "") + "\n".join(lines))
+            shown += len(lines)
+            lines = []
+    if lines:
+        task.report_progress(("\n" if shown else "") + "\n".join(lines))
+        shown += len(lines)
+    return shown
+
+# Runs on a worker thread: one display block for the requested MongoDB course IDs
+def search_mongodb_courses(course_ids):
+    if len(course_ids) > 1:
+        found = find_courses_in_mongodb(course_ids)
+        lines = []
+        for course_id in course_ids:
+            course = found.get(course_id)
+            if course:
+                prerequisites = prerequisites_from_document(course)
+                lines.append(f"🔍 {course['course_id']} - {course['course_name']} - Prerequisites: {', '.join(prerequisites) if prerequisites else 'None'}")
+            else:
+                lines.append(f"❌ {course_id} - not found in MongoDB")
+        return "\n".join(lines)
+    course = find_course_in_mongodb(course_ids[0] if course_ids else "")
+    if course:
+        prerequisites = prerequisites_from_document(course)
+        prerequisites = ", ".join(prerequisites) if prerequisites else "None"
+        return f"🔍 Course Found: {course['course_id']} - {course['course_name']}\n📌 Prerequisites: {prerequisites}"
+    return "❌ Course not found in MongoDB."
+
+# Raised inside a background task once it has been cancelled
+class TaskCancelled(Exception):
+    pass
+
+# Handle passed to background work so it can report progress and notice cancellation
+class BackgroundTask:
+    def __init__(self, key, events, on_done, on_progress, on_error, on_cancel):
+        self.key = key
+        self.events = events
+        self.on_done = on_done
+        self.on_progress = on_progress
+        self.on_error = on_error
+        self.on_cancel = on_cancel
+        self._cancelled = threading.Event()
+
+    def cancel(self):
+        self._cancelled.set()
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    # Called by the work between steps; unwinds the task if it was cancelled
+    def check_cancelled(self):
+        if self._cancelled.is_set():
+            raise TaskCancelled()
+
+    def report_progress(self, value):
+        self.events.put(("progress", self, value))
+
+# Runs slow loads and queries on a thread pool so the Tk window never freezes. Work never
+# touches Tk: results, errors and progress come back through a queue that the Tk thread
+# drains every poll_ms with after(), and the callbacks run there. Submitting a key that is
+# already in flight returns the running task instead of starting a duplicate.
+class BackgroundTaskRunner:
+    def __init__(self, root, max_workers=4, poll_ms=50):
+        self.root = root
+        self.poll_ms = poll_ms
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="course-planner")
+        self.events = queue.Queue()
+        self.tasks = {}  # key -> running BackgroundTask
+        self.root.after(self.poll_ms, self._poll)
+
+    def is_running(self, key):
+        return key in self.tasks
+
+    # work(task) runs on a worker thread; the callbacks run on the Tk thread
+    def submit(self, key, work, on_done, on_progress=None, on_error=None, on_cancel=None):
+        task = self.tasks.get(key)
+        if task is not None:
+            return task
+        task = BackgroundTask(key, self.events, on_done, on_progress, on_error, on_cancel)
+        self.tasks[key] = task
+        self.executor.submit(self._run, task, work)
+        return task
+
+    def _run(self, task, work):
+        try:
+            self.events.put(("done", task, work(task)))
+        except TaskCancelled:
+            self.events.put(("cancelled", task, None))
+        except Exception as e:
+            self.events.put(("error", task, e))
+
+    def _poll(self):
+        while True:
+            try:
+                kind, task, value = self.events.get_nowait()
+            except queue.Empty:
+                break
+            if kind == "progress":
+                if task.on_progress and not task.cancelled:
+                    task.on_progress(value)
+                continue
+            self.tasks.pop(task.key, None)
+            if kind == "done" and not task.cancelled:
+                task.on_done(value)
+            elif kind == "error" and task.on_error:
+                task.on_error(value)
+            elif kind in ("done", "cancelled") and task.on_cancel:
+                task.on_cancel()
+        self.root.after(self.poll_ms, self._poll)
+
+    def cancel_all(self):
+        for task in self.tasks.values():
+            task.cancel()
+        return len(self.tasks)
+
+    def shutdown(self):
+        self.cancel_all()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+# Result sources for ResultPager: source(start) yields (position, line) pairs beginning at
+# position start, or at the first row when start is None
+def tree_source(bst, lo=None, hi=None):
+    return lambda start: ((course.course_id, format_course(course)) for course in bst.range(lo if start is None else start, hi))
+
+def prerequisite_count_source(bst):
+    return lambda start: ((position, format_course(course)) for position, course in bst.prerequisite_index.entries(start))
+
+def list_source(items, format_row=format_course):
+    return lambda start: ((position, format_row(items[position])) for position in range(start or 0, len(items)))
+
+# Pages through a result source. Only the rows of the current page are pulled and formatted,
+# and pages are found again by their start position, so the cost of showing a page does not
+# depend on how many results there are. A source reading the tree is pulled under the
+# tree's lock, so a reload cannot edit it mid-page.
+class ResultPager:
+    def __init__(self, source, page_size=RESULT_PAGE_SIZE, total=None, lock=None):
+        self.source = source
+        self.lock = lock or nullcontext()
+        self.page_size = page_size
+        self.total = total
+        self.page_starts = [None]  # Start position of each page up to the current one
+        self.next_start = None
+        self.has_next = False
+        self.lines = []
+        self._load()
+
+    def _load(self):
+        with self.lock:
+            rows = list(islice(self.source(self.page_starts[-1]), self.page_size + 1))
+        self.has_next = len(rows) > self.page_size
+        self.next_start = rows[-1][0] if self.has_next else None
+        self.lines = [line for _, line in rows[:self.page_size]]
+
+    @property
+    def page_number(self):
+        return len(self.page_starts)
+
+    @property
+    def has_previous(self):
+        return len(self.page_starts) > 1
+
+    def next_page(self):
+        if not self.has_next:
+            return False
+        self.page_starts.append(self.next_start)
+        self._load()
+        return True
+
+    def previous_page(self):
+        if not self.has_previous:
+            return False
+        self.page_starts.pop()
+        self._load()
+        return True
+
+    def first_page(self):
+        del self.page_starts[1:]
+        self._load()
+
+    def status(self):
+        if not self.lines:
+            return ""
+        first = (self.page_number - 1) * self.page_size + 1
+        last = first + len(self.lines) - 1
+        return f"Page {self.page_number} - rows {first}-{last}" + (f" of {self.total}" if self.total is not None else "")
 
 # GUI Application
 class CoursePlannerApp:
@@ -89,7 +2141,22 @@ class CoursePlannerApp:
         self.root = root
         self.root.title("Course Planner GUI")
 
-        self.bst = BinarySearchTree()
+        self.bst = BinarySearchTree(balanced=True)
+        self.tasks = BackgroundTaskRunner(root)
+        self.root.protocol("WM_DELETE_WINDOW", self.close)
+
+        # Diagnostics menu: metrics and profiling for finding slow loads and searches
+        self.metrics_enabled = tk.BooleanVar(value=metrics.enabled)
+        menu_bar = tk.Menu(root)
+        diagnostics = tk.Menu(menu_bar, tearoff=0)
+        diagnostics.add_checkbutton(label="Collect Metrics", variable=self.metrics_enabled, command=self.toggle_metrics)
+        diagnostics.add_command(label="Show Metrics", command=self.show_metrics)
+        diagnostics.add_command(label="Reset Metrics", command=self.reset_metrics)
+        diagnostics.add_separator()
+        diagnostics.add_command(label="Start Profiling", command=self.start_profiling)
+        diagnostics.add_command(label="Stop Profiling and Show Report", command=self.stop_profiling)
+        menu_bar.add_cascade(label="Diagnostics", menu=diagnostics)
+        root.config(menu=menu_bar)
 
         # Buttons
         tk.Button(root, text="Load Courses from CSV", command=self.load_courses_from_csv).grid(row=0, column=0, padx=10, pady=5)
@@ -99,81 +2166,242 @@ class CoursePlannerApp:
         tk.Button(root, text="Interactive Search (BST)", command=self.interactive_search_bst).grid(row=2, column=0, padx=10, pady=5)
         tk.Button(root, text="Load Courses from MongoDB", command=self.load_courses_from_mongodb).grid(row=2, column=1, padx=10, pady=5)
         tk.Button(root, text="Search Course in MongoDB", command=self.search_course_mongodb).grid(row=3, column=0, padx=10, pady=5)
+        tk.Button(root, text="Prerequisite Chain (BST)", command=self.prerequisite_chain_bst).grid(row=3, column=1, padx=10, pady=5)
+        tk.Button(root, text="Sync BST to MongoDB", command=self.sync_bst_to_mongodb).grid(row=4, column=0, padx=10, pady=5)
+        tk.Button(root, text="Courses by ID Prefix (BST)", command=self.prefix_courses_bst).grid(row=4, column=1, padx=10, pady=5)
+        tk.Button(root, text="Plan Degree (BST)", command=self.plan_degree_bst).grid(row=7, column=0, padx=10, pady=5)
+        tk.Button(root, text="Cancel Running Tasks", command=self.cancel_tasks).grid(row=7, column=1, padx=10, pady=5)
+        tk.Button(root, text="What Courses Unlock (BST)", command=self.removal_impact_bst).grid(row=8, column=0, padx=10, pady=5)
 
         # Output Display
         self.text_output = tk.Text(root, height=20, width=80)
-        self.text_output.grid(row=4, column=0, columnspan=2, padx=10, pady=10)
+        self.text_output.grid(row=5, column=0, columnspan=2, padx=10, pady=10)
+
+        # Page navigation for long result lists
+        self.pager = None
+        pager_bar = tk.Frame(root)
+        pager_bar.grid(row=6, column=0, columnspan=2, pady=5)
+        self.first_button = tk.Button(pager_bar, text="⏮ First", command=self.first_page, state=tk.DISABLED)
+        self.first_button.pack(side=tk.LEFT, padx=5)
+        self.previous_button = tk.Button(pager_bar, text="◀ Previous", command=self.previous_page, state=tk.DISABLED)
+        self.previous_button.pack(side=tk.LEFT, padx=5)
+        self.page_label = tk.Label(pager_bar, text="")
+        self.page_label.pack(side=tk.LEFT, padx=10)
+        self.next_button = tk.Button(pager_bar, text="Next ▶", command=self.next_page, state=tk.DISABLED)
+        self.next_button.pack(side=tk.LEFT, padx=5)
 
+    @timed("display_output")
     def display_output(self, text):
+        self.set_pager(None)
+        self.text_output.delete(1.0, tk.END)
+        self.text_output.insert(tk.END, text)
+
+    # Show a result source a page at a time, or empty_message when it has no rows
+    def display_results(self, source, empty_message, total=None, lock=None):
+        pager = ResultPager(source, total=total, lock=lock)
+        if not pager.lines:
+            self.display_output(empty_message)
+            return
+        self.set_pager(pager)
+        self.render_page()
+
+    def set_pager(self, pager):
+        self.pager = pager
+        if pager is None:
+            self.page_label.config(text="")
+            for button in (self.first_button, self.previous_button, self.next_button):
+                button.config(state=tk.DISABLED)
+
+    @timed("render_page")
+    def render_page(self):
         self.text_output.delete(1.0, tk.END)
+        self.text_output.insert(tk.END, "\n".join(self.pager.lines))
+        self.page_label.config(text=self.pager.status())
+        self.first_button.config(state=tk.NORMAL if self.pager.has_previous else tk.DISABLED)
+        self.previous_button.config(state=tk.NORMAL if self.pager.has_previous else tk.DISABLED)
+        self.next_button.config(state=tk.NORMAL if self.pager.has_next else tk.DISABLED)
+
+    def next_page(self):
+        if self.pager and self.pager.next_page():
+            self.render_page()
+
+    def previous_page(self):
+        if self.pager and self.pager.previous_page():
+            self.render_page()
+
+    def first_page(self):
+        if self.pager:
+            self.pager.first_page()
+            self.render_page()
+
+    def append_output(self, text):
         self.text_output.insert(tk.END, text)
 
+    # Run work(task) in the background, reporting failures and cancellation in the output pane
+    def run_in_background(self, key, work, on_done, on_progress=None):
+        self.tasks.submit(key, work, on_done, on_progress=on_progress,
+                          on_error=lambda error: self.display_output(f"❌ {error}"),
+                          on_cancel=lambda: self.append_output("\n⏹️ Cancelled."))
+
+    def cancel_tasks(self):
+        if not self.tasks.cancel_all():
+            self.display_output("Nothing is running.")
+
+    def toggle_metrics(self):
+        metrics.enabled = self.metrics_enabled.get()
+
+    def show_metrics(self):
+        lines = [metrics.report()]
+        if self.bst.balanced:
+            lines.append(f"Tree height: {node_height(self.bst.root)}")
+        with self.bst.lock:
+            lines.append(f"Prerequisite closure cache: {self.bst.closure_cache.stats()}")
+        lines.append(f"MongoDB lookup cache: {course_lookup_cache.stats()}")
+        self.display_output("\n".join(lines))
+
+    def reset_metrics(self):
+        metrics.reset()
+        self.display_output("Metrics reset.")
+
+    # cProfile only sees the thread it was started on (the GUI thread); loads and MongoDB
+    # queries on the worker pool are covered by the metrics timers instead
+    def start_profiling(self):
+        metrics.start_profiling()
+        self.display_output("⏱️ Profiling started. Use Diagnostics > Stop Profiling to see the report.")
+
+    def stop_profiling(self):
+        self.display_output(metrics.stop_profiling())
+
+    def close(self):
+        self.tasks.shutdown()
+        self.root.destroy()
+
     def load_courses_from_csv(self):
+        if self.tasks.is_running("load-csv"):
+            return
         file_path = filedialog.askopenfilename(filetypes=[("CSV Files", "*.csv")])
         if not file_path:
             return
-
-        try:
-            with open(file_path, newline='') as csvfile:
-                reader = csv.reader(csvfile)
-                next(reader)  # Skip header row
-                for row in reader:
-                    course_id, course_name, *prerequisites = row
-                    prerequisites = [p.strip() for p in prerequisites if p.strip()]
-                    self.bst.insert(course_id, course_name, prerequisites)
-            self.display_output("✅ Courses successfully loaded into BST from CSV.\n")
-        except FileNotFoundError:
+        if not os.path.isfile(file_path):
             messagebox.showerror("Error", "File not found. Please check the filename and try again.")
+            return
+        current_bst = self.bst
+        self.run_in_background("load-csv", lambda task: build_catalog_from_csv(task, current_bst, file_path),
+                               self.finish_csv_load, on_progress=self.display_output)
+
+    # Tasks still running on a replaced tree keep their own reference to it and finish unaffected
+    def finish_csv_load(self, result):
+        self.bst, message = result
+        self.display_output(message)
+        if not self.bst.loaded:
+            bst = self.bst
+            self.run_in_background("index-catalog", lambda task: wait_and_check_catalog(bst), self.finish_indexing)
+
+    def finish_indexing(self, warnings):
+        self.append_output("\n✅ Catalog indexed." + "".join(f"\n⚠️ {warning}" for warning in warnings))
+
+    # A catalog opened from a snapshot is indexed in the background; until then only Search
+    # Course can use it
+    def catalog_ready(self):
+        if self.bst.loaded:
+            return True
+        self.display_output("⏳ Still indexing the catalog; only Search Course works until it finishes.")
+        return False
 
     def print_courses(self):
-        output_list = []
-        self.bst.print_courses(self.bst.root, output_list)
-        self.display_output("\n".join(output_list) if output_list else "No courses available in BST.")
+        if not self.catalog_ready():
+            return
+        self.display_results(tree_source(self.bst), "No courses available in BST.", lock=self.bst.lock)
+
+    def plan_degree_bst(self):
+        if not self.catalog_ready():
+            return
+        targets = [course_id.strip() for course_id in self.get_input("Enter the Course ID(s) to plan for (comma-separated):").upper().split(",") if course_id.strip()]
+        completed = [course_id.strip() for course_id in self.get_input("Enter the Course ID(s) already completed (comma-separated, or blank):").upper().split(",") if course_id.strip()]
+        max_per_term = self.get_input(f"Enter the most courses per term (default {COURSES_PER_TERM}):").strip()
+        max_per_term = int(max_per_term) if max_per_term.isdigit() and int(max_per_term) > 0 else COURSES_PER_TERM
+        bst = self.bst
+        self.run_in_background(("plan-degree", tuple(targets), tuple(completed), max_per_term),
+                               lambda task: plan_degree(bst, targets, completed, max_per_term), self.show_degree_plan)
+
+    def show_degree_plan(self, plan):
+        self.display_output("📅 Degree Plan:\n" + "\n".join(format_degree_plan(plan) or ["Nothing left to take."]))
+
+    def prefix_courses_bst(self):
+        if not self.catalog_ready():
+            return
+        prefix = self.get_input("Enter the start of the course IDs to list (e.g. CSCI3):").strip().upper()
+        self.display_results(tree_source(self.bst, *prefix_bounds(prefix)), f"No courses found starting with {prefix}.", lock=self.bst.lock)
 
     def search_course_bst(self):
         course_id = self.get_input("Enter Course ID to search (BST):").upper()
-        course = self.bst.search(course_id)
+        with self.bst.lock:
+            course = self.bst.search(course_id)
         if course:
             self.display_output(f"{course.course_id}: {course.course_name}\nPrerequisites: {', '.join(course.prerequisites) if course.prerequisites else 'None'}")
         else:
             self.display_output("❌ Course not found in BST.")
 
+    def prerequisite_chain_bst(self):
+        if not self.catalog_ready():
+            return
+        course_id = self.get_input("Enter Course ID to show its prerequisite chain (BST):").strip().upper()
+        bst = self.bst
+        self.run_in_background(("prerequisite-chain", course_id), lambda task: prerequisite_chain_report(bst, course_id), self.display_output)
+
+    def removal_impact_bst(self):
+        if not self.catalog_ready():
+            return
+        course_ids = [course_id.strip() for course_id in self.get_input("Enter the Course ID(s) to check (comma-separated):").upper().split(",") if course_id.strip()]
+        if not course_ids:
+            return
+        bst = self.bst
+        self.run_in_background(("removal-impact", tuple(course_ids)), lambda task: removal_impact_report(bst, course_ids), self.show_removal_impact)
+
+    def show_removal_impact(self, lines):
+        self.display_results(list_source(lines, str), "")
+
     def sort_courses_bst(self):
-        output_list = []
-        self.bst.print_courses(self.bst.root, output_list)
-        sorted_list = sorted(output_list, key=lambda x: x.count(","))
-        self.display_output("\n".join(sorted_list) if sorted_list else "No courses available in BST.")
+        if not self.catalog_ready():
+            return
+        with self.bst.lock:
+            total = len(self.bst.prerequisite_index)
+        self.display_results(prerequisite_count_source(self.bst), "No courses available in BST.", total=total, lock=self.bst.lock)
 
     def interactive_search_bst(self):
+        if not self.catalog_ready():
+            return
         keyword = self.get_input("Enter keyword to search (BST):").lower()
-        output_list = []
-        self.bst.print_courses(self.bst.root, output_list)
-        filtered_courses = [course for course in output_list if keyword in course.lower()]
-        self.display_output("\n".join(filtered_courses) if filtered_courses else "No matching courses found.")
+        with self.bst.lock:
+            filtered_courses = self.bst.keyword_search(keyword)
+        if filtered_courses:
+            self.display_results(list_source(filtered_courses), "No matching courses found.", total=len(filtered_courses))
+            return
+        bst = self.bst
+        self.run_in_background(("fuzzy-search", keyword), lambda task: fuzzy_suggestions_report(bst, keyword), self.display_output)
 
     def load_courses_from_mongodb(self):
-        courses = list(courses_collection.find())
-        if not courses:
-            self.display_output("⚠️ No courses found in MongoDB. Ensure the data is uploaded.")
+        if self.tasks.is_running("load-mongodb"):
             return
+        self.display_output("")
+        self.run_in_background("load-mongodb", stream_mongodb_courses, self.finish_mongodb_load, on_progress=self.append_output)
 
-        output_list = []
-        for course in courses:
-            prerequisites = [course.get(key, '') for key in ["prerequisite_1", "prerequisite_2", "prerequisite_3"] if course.get(key)]
-            prerequisites = ", ".join(prerequisites) if prerequisites else "None"
-            output_list.append(f"{course['course_id']}: {course['course_name']} - Prerequisites: {prerequisites}")
-
-        self.display_output("\n".join(output_list))
+    def finish_mongodb_load(self, shown):
+        if not shown:
+            self.display_output("⚠️ No courses found in MongoDB. Ensure the data is uploaded.")
 
     def search_course_mongodb(self):
-        course_id = self.get_input("Enter Course ID to search in MongoDB:").strip().upper()
-        course = courses_collection.find_one({"course_id": course_id})
-        if course:
-            prerequisites = [course.get(key, '') for key in ["prerequisite_1", "prerequisite_2", "prerequisite_3"] if course.get(key)]
-            prerequisites = ", ".join(prerequisites) if prerequisites else "None"
-            self.display_output(f"🔍 Course Found: {course['course_id']} - {course['course_name']}\n📌 Prerequisites: {prerequisites}")
-        else:
-            self.display_output("❌ Course not found in MongoDB.")
+        course_ids = [course_id.strip() for course_id in self.get_input("Enter Course ID(s) to search in MongoDB (comma-separated):").upper().split(",") if course_id.strip()]
+        self.run_in_background(("search-mongodb", tuple(course_ids)), lambda task: search_mongodb_courses(course_ids), self.display_output)
+
+    def sync_bst_to_mongodb(self):
+        if not self.catalog_ready():
+            return
+        bst = self.bst
+        self.run_in_background("sync-mongodb", lambda task: sync_courses_to_mongodb(courses_of(bst)), self.finish_mongodb_sync)
+
+    def finish_mongodb_sync(self, totals):
+        self.display_output(f"✅ Synced BST to MongoDB: {totals['upserted']} inserted, {totals['matched']} updated.")
 
     def get_input(self, prompt):
         return tk.simpledialog.askstring("Input", prompt)
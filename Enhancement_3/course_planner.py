@@ -1,7 +1,7 @@
 #============================================================================
 # Name        : course_planner.py
 # Author      : Bryan Pirrone
-# Version     : 7.0
+# Version     : 7.22
 # References  : SNHU CS-300 Project 2, source.cpp
 # Description : This program allows the user to load a list of courses from a CSV file into a binary search tree (BST). 
 #               The user can then print the entire course list, search for a specific course by its ID, 
@@ -18,54 +18,1355 @@
 # 5.0 - Added interactive search feature
 # 6.0 - Added MongoDB integration for course data storage (loading and searching only)
 # 7.0 - Resolved interactive search bug
+# 7.1 - Added balanced (AVL) BST mode and made all tree traversals iterative
+# 7.2 - Added bulk loading that builds a perfectly balanced BST from a sorted catalog
+# 7.3 - Added trigram index for fast keyword search
+# 7.4 - Added compiled prerequisite graph (full prerequisite chains, cycle and missing-course checks)
+# 7.5 - Added cached prerequisite closures with incremental invalidation
+# 7.6 - Added chunked, streaming CSV loading with progress reporting
+# 7.7 - Added memory-mapped binary catalog snapshots for fast startup
+# 7.8 - Added __slots__ course/node classes and interned course IDs
+# 7.9 - Added batched MongoDB lookups and bulk upsert of the BST into MongoDB
+# 7.10 - Stream MongoDB courses through a projected, batched cursor
+# 7.11 - Replaced the import-time MongoClient with a lazy, pooled connection manager
+# 7.12 - Added a read-through LRU/TTL cache in front of MongoDB course lookups
+# 7.13 - Added lazy in-order iteration plus course ID range and prefix queries
+# 7.14 - Added an index of courses by prerequisite count (and depth) for sorted views that never re-sort
+# 7.15 - Added typo-tolerant fuzzy search when a keyword search finds nothing
+# 7.16 - Added a degree-plan scheduler with batch planning over a process pool
+# 7.17 - Added a non-interactive batch query mode (--batch) with JSON/CSV output
+# 7.18 - Added opt-in timers, counters and cProfile/tracemalloc profiling (menu option 13, --metrics, --profile)
+# 7.19 - Reloading a CSV now applies only the added, changed and removed courses (no more duplicate nodes)
+# 7.20 - Added sharded loading of a folder of campus catalogs over a process pool (menu option 14)
+# 7.21 - Added an asyncio HTTP/JSON service mode (--serve) with hot reload
+# 7.22 - Added a reverse-prerequisite index: what a course unlocks and the impact of removing courses (menu option 15)
 #============================================================================
 
+import argparse
+import asyncio
+import cProfile
 import csv
-from pymongo import MongoClient
+import functools
+import gc
+import hashlib
+import heapq
+import io
+import json
+import mmap
+import multiprocessing
+import os
+import pickle
+import pstats
+import re
+import struct
+import sys
+import threading
+import time
+import tracemalloc
+import weakref
+from bisect import bisect_left, bisect_right, insort
+from array import array
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from operator import attrgetter, itemgetter
+from urllib.parse import parse_qs, unquote, urlsplit
+
+# Rows parsed per chunk when streaming a CSV
+DEFAULT_CHUNK_SIZE = 5000
+
+# Course IDs per $in lookup and documents per bulk_write when talking to MongoDB
+MONGO_BATCH_SIZE = 1000
+
+# Course documents are fetched without their _id. An exclusion projection keeps every
+# prerequisite_N field, however many prerequisites a course has.
+COURSE_PROJECTION = {"_id": 0}
+
+# Size and time-to-live (seconds) of the cache in front of MongoDB course lookups
+COURSE_CACHE_SIZE = 1024
+COURSE_CACHE_TTL = 300
+
+# Courses whose full prerequisite sets are kept by the closure cache
+CLOSURE_CACHE_SIZE = 10000
+
+# Courses returned by a fuzzy (typo-tolerant) search, and the most courses read from any one
+# term's posting list when gathering fuzzy candidates (see FuzzyIndex.ranked)
+FUZZY_RESULTS = 10
+FUZZY_POSTING_LIMIT = 1000
+
+# Courses fetched from a shard worker at a time when walking a sharded catalog in order
+SHARD_CHUNK_SIZE = 1000
+
+# Default course load per term for degree plans, and the batch size at which planning many
+# students switches to a process pool
+COURSES_PER_TERM = 4
+PARALLEL_PLAN_THRESHOLD = 200
+
+# Queries handed to a batch-mode worker process at a time
+BATCH_QUERY_CHUNK = 256
+
+# Service mode address, and the default and largest number of courses in one response
+SERVICE_HOST = "127.0.0.1"
+SERVICE_PORT = 8300
+SERVICE_PAGE_SIZE = 100
+SERVICE_MAX_PAGE = 1000
+
+# Shortest /search query the service answers. A shorter keyword has no trigram of its own,
+# so the keyword index would have to scan every posting on the event loop.
+SERVICE_MIN_QUERY = 3
 
 # MongoDB Connection Setup
-client = MongoClient("mongodb://localhost:27017/")
-db = client["course_planner"]
-courses_collection = db["courses"]
+# COURSE_PLANNER_MONGO_URI points the planner at another server
+MONGO_URI = os.environ.get("COURSE_PLANNER_MONGO_URI", "mongodb://localhost:27017/")
+
+# Lazily created, pooled MongoDB connection. pymongo is imported and the MongoClient built
+# on first use rather than at import time, so CSV-only sessions never pay for connection
+# setup or server selection and do not need a running mongod (or pymongo) at all.
+class MongoConnectionManager:
+    def __init__(self, uri=MONGO_URI, database="course_planner", collection="courses",
+                 max_pool_size=10, min_pool_size=0, connect_timeout_ms=2000, server_selection_timeout_ms=2000):
+        self.uri = uri
+        self.database_name = database
+        self.collection_name = collection
+        self.max_pool_size = max_pool_size
+        self.min_pool_size = min_pool_size
+        self.connect_timeout_ms = connect_timeout_ms
+        self.server_selection_timeout_ms = server_selection_timeout_ms
+        self._client = None
+        self._lock = threading.Lock()
+
+    def client(self):
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    from pymongo import MongoClient
+                    self._client = MongoClient(self.uri, maxPoolSize=self.max_pool_size, minPoolSize=self.min_pool_size,
+                                               connectTimeoutMS=self.connect_timeout_ms,
+                                               serverSelectionTimeoutMS=self.server_selection_timeout_ms)
+        return self._client
+
+    def collection(self):
+        return self.client()[self.database_name][self.collection_name]
+
+    # True if the server answers a ping within the server selection timeout
+    def health_check(self):
+        try:
+            self.client().admin.command("ping")
+            return True
+        except Exception:
+            return False
+
+    def close(self):
+        with self._lock:
+            if self._client is not None:
+                self._client.close()
+                self._client = None
+
+mongo = MongoConnectionManager()
+
+def get_courses_collection():
+    return mongo.collection()
 
 # Class to represent a Course
+# About 330 bytes per course together with its tree Node (tracemalloc, 200,000 courses);
+# the keyword, prerequisite count and dependent indexes bring it to about 2.2 KB
 class Course:
+    __slots__ = ("course_id", "course_name", "prerequisites")
+
     def __init__(self, course_id, course_name, prerequisites):
         self.course_id = course_id
         self.course_name = course_name
         self.prerequisites = prerequisites
 
+# Opt-in timers, counters and profiling for the slow paths (CSV parsing, tree inserts and
+# searches, traversal, MongoDB round trips). Disabled by default; instrumented code only checks
+# metrics.enabled before doing any measuring, so the cost when disabled is one attribute read.
+class Metrics:
+    def __init__(self):
+        self.enabled = False
+        self.timings = {}       # stage -> [calls, total seconds, slowest call in seconds]
+        self.observations = {}  # name -> [count, total, largest] (e.g. search depth)
+        self.counters = {}      # name -> running total
+        self._profiler = None
+
+    # Call with the time.perf_counter() value taken when the stage started
+    def record(self, stage, start):
+        elapsed = time.perf_counter() - start
+        timing = self.timings.get(stage)
+        if timing is None:
+            self.timings[stage] = [1, elapsed, elapsed]
+        else:
+            timing[0] += 1
+            timing[1] += elapsed
+            timing[2] = max(timing[2], elapsed)
+
+    def observe(self, name, value):
+        observation = self.observations.get(name)
+        if observation is None:
+            self.observations[name] = [1, value, value]
+        else:
+            observation[0] += 1
+            observation[1] += value
+            observation[2] = max(observation[2], value)
+
+    def count(self, name, amount=1):
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def reset(self):
+        self.timings.clear()
+        self.observations.clear()
+        self.counters.clear()
+
+    @property
+    def profiling(self):
+        return self._profiler is not None
+
+    # Start cProfile (CPU) and tracemalloc (memory) capture until stop_profiling()
+    def start_profiling(self):
+        if self._profiler is None:
+            self._profiler = cProfile.Profile()
+            tracemalloc.start()
+            self._profiler.enable()
+
+    # Stop the capture and return its report: the slowest functions by cumulative time, then
+    # the source lines holding the most memory allocated during the capture
+    def stop_profiling(self, limit=20):
+        if self._profiler is None:
+            return "Profiling is not running."
+        self._profiler.disable()
+        snapshot = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        output = io.StringIO()
+        pstats.Stats(self._profiler, stream=output).sort_stats("cumulative").print_stats(limit)
+        self._profiler = None
+        lines = [output.getvalue().strip(), "", f"Memory: {current / 1024:.1f} KiB still allocated, {peak / 1024:.1f} KiB peak", ""]
+        lines.extend(str(stat) for stat in snapshot.statistics("lineno")[:limit])
+        return "\n".join(lines)
+
+    def report(self):
+        lines = [f"Metrics are {'on' if self.enabled else 'off'}."]
+        if self.timings:
+            lines.append(f"{'Stage':<24}{'Calls':>8}{'Total ms':>12}{'Avg ms':>10}{'Max ms':>10}")
+            for stage, (calls, total, slowest) in sorted(self.timings.items()):
+                lines.append(f"{stage:<24}{calls:>8}{total * 1000:>12.2f}{total / calls * 1000:>10.3f}{slowest * 1000:>10.3f}")
+        if self.observations:
+            lines.append(f"{'Measure':<24}{'Count':>8}{'Average':>12}{'Largest':>10}")
+            for name, (count, total, largest) in sorted(self.observations.items()):
+                lines.append(f"{name:<24}{count:>8}{total / count:>12.2f}{largest:>10}")
+        for name, value in sorted(self.counters.items()):
+            lines.append(f"{name}: {value}")
+        return "\n".join(lines)
+
+metrics = Metrics()
+
+# Time every call of the decorated function under stage while metrics are enabled
+def timed(stage):
+    def decorate(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not metrics.enabled:
+                return function(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                metrics.record(stage, start)
+        return wrapper
+    return decorate
+
+# Inverted trigram index over course IDs and names for keyword search.
+# Every course is posted under each 3-character slice of its lowercased ID and name,
+# so a query only touches the postings of its own trigrams instead of every course.
+class NGramIndex:
+    def __init__(self, n=3):
+        self.n = n
+        self.postings = {}
+
+    def _grams(self, text):
+        if len(text) < self.n:
+            return {text} if text else set()  # Short fields are posted whole
+        return {text[i:i + self.n] for i in range(len(text) - self.n + 1)}
+
+    def add(self, course):
+        postings = self.postings
+        for gram in self._grams(course.course_id.lower()) | self._grams(course.course_name.lower()):
+            posting = postings.get(gram)
+            if posting is None:
+                postings[gram] = {course}
+            else:
+                posting.add(course)
+
+    def remove(self, course):
+        for gram in self._grams(course.course_id.lower()) | self._grams(course.course_name.lower()):
+            posting = self.postings.get(gram)
+            if posting is not None:
+                posting.discard(course)
+                if not posting:
+                    del self.postings[gram]
+
+    # Return the courses whose ID or name contains keyword (case-insensitive), sorted by ID.
+    # With a limit only the first limit courses are kept, which skips sorting every match.
+    def search(self, keyword, limit=None):
+        keyword = keyword.lower()
+        if len(keyword) >= self.n:
+            postings = sorted((self.postings.get(gram, set()) for gram in self._grams(keyword)), key=len)
+            candidates = postings[0].intersection(*postings[1:])
+        else:
+            # Too short to have a trigram of its own: union the postings of every gram containing it
+            candidates = set()
+            for gram, posting in self.postings.items():
+                if keyword in gram:
+                    candidates.update(posting)
+        results = (course for course in candidates if keyword in course.course_id.lower() or keyword in course.course_name.lower())
+        if limit is not None:
+            return heapq.nsmallest(limit, results, key=course_id_of)
+        return sorted(results, key=course_id_of)
+
+# Words of a course ID or name, lowercased, with letters and digits split apart
+# ("CSCI300: Data Structures" -> csci, 300, data, structures)
+WORD_PATTERN = re.compile(r"[a-z]+|[0-9]+")
+
+# Optimal string alignment distance (edits, with adjacent transpositions counting as one),
+# giving up early and returning limit + 1 once the distance must exceed limit. Characters
+# both words share at the start and end are skipped first; for course numbers such as
+# 0012300 and 0012301 that leaves almost nothing to compare.
+def edit_distance(a, b, limit):
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    start = 0
+    while start < len(a) and start < len(b) and a[start] == b[start]:
+        start += 1
+    end_a, end_b = len(a), len(b)
+    while end_a > start and end_b > start and a[end_a - 1] == b[end_b - 1]:
+        end_a -= 1
+        end_b -= 1
+    a, b = a[start:end_a], b[start:end_b]
+    if len(a) <= 1 or len(b) <= 1:
+        return max(len(a), len(b)) - (bool(a) and bool(b) and (a in b or b in a))
+    before = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if before and i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], before[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        before, previous = previous, current
+    return previous[-1]
+
+# Typo-tolerant search over course IDs and name words (a SymSpell-style deletion index).
+# Each distinct term is filed under every string left after deleting up to max_distance
+# characters from its first prefix_length characters. A query word is looked up the same
+# way, so only the few terms sharing a deletion with it are compared by edit distance and
+# lookups do not slow down as the catalog grows. Posting lists are kept in course ID order
+# and read only up to posting_limit courses each, so a term shared by a whole department
+# (the "csci" of an ID) does not make every course in it a candidate.
+class FuzzyIndex:
+    def __init__(self, max_distance=2, prefix_length=7, posting_limit=FUZZY_POSTING_LIMIT):
+        self.max_distance = max_distance
+        self.prefix_length = prefix_length
+        self.posting_limit = posting_limit
+        self.postings = {}  # term -> courses whose ID or name contains it, in course ID order
+        self.deletes = {}   # deletion -> terms it was made from
+
+    def _deletions(self, term, distance):
+        found = edge = {term[:self.prefix_length]}
+        for _ in range(distance):
+            edge = {word[:i] + word[i + 1:] for word in edge for i in range(len(word))} - found
+            found = found | edge
+        return found
+
+    @staticmethod
+    def _terms(course):
+        terms = set(WORD_PATTERN.findall(course.course_id.lower()))
+        terms.update(WORD_PATTERN.findall(course.course_name.lower()))
+        return terms
+
+    def add(self, course):
+        for term in self._terms(course):
+            posting = self.postings.get(term)
+            if posting is not None:
+                insort(posting, course, key=course_id_of)
+                continue
+            self.postings[term] = [course]
+            for deletion in self._deletions(term, self.max_distance):
+                bucket = self.deletes.get(deletion)
+                if bucket is None:
+                    self.deletes[deletion] = [term]
+                else:
+                    bucket.append(term)
+
+    def remove(self, course):
+        for term in self._terms(course):
+            posting = self.postings.get(term)
+            if posting is None or course not in posting:
+                continue
+            posting.remove(course)
+            if posting:
+                continue
+            del self.postings[term]
+            for deletion in self._deletions(term, self.max_distance):
+                bucket = self.deletes[deletion]
+                bucket.remove(term)
+                if not bucket:
+                    del self.deletes[deletion]
+
+    # Short words must match exactly, so "to" or "of" do not match half the catalog
+    def allowed_distance(self, word):
+        return min(self.max_distance, max(0, (len(word) - 1) // 2))
+
+    # Indexed terms within the allowed edit distance of word, as (term, distance) pairs
+    def matches(self, word):
+        limit = self.allowed_distance(word)
+        candidates = set()
+        for deletion in self._deletions(word, limit):
+            candidates.update(self.deletes.get(deletion, ()))
+        for term in candidates:
+            distance = edit_distance(word, term, limit)
+            if distance <= limit:
+                yield term, distance
+
+    def search(self, query, k):
+        return [course for _, course in self.ranked(query, k)]
+
+    # (key, course) for the k best courses for query, best (smallest key) first: most query
+    # words matched, then the smallest total edit distance, then course ID. Each query word
+    # counts once per course, at its best match.
+    # Candidates are the courses in the matched terms' postings, reading at most
+    # posting_limit (the lowest course IDs) from each. A word with a longer posting is then
+    # scored on every candidate from its terms, so "CSCI0012300" only ranks the courses near
+    # 0012300 plus the first few CSCI courses instead of the whole department. The ranking
+    # is exact unless every word a course matches has more than posting_limit courses.
+    def ranked(self, query, k):
+        per_word = []  # (matched terms -> distance, course -> best distance, posting cut short)
+        for word in dict.fromkeys(WORD_PATTERN.findall(query.lower())):
+            matched = dict(self.matches(word))
+            best = {}
+            for term, distance in matched.items():
+                for course in islice(self.postings[term], self.posting_limit):
+                    if distance < best.get(course, distance + 1):
+                        best[course] = distance
+            per_word.append((matched, best, any(len(self.postings[term]) > self.posting_limit for term in matched)))
+        candidates = {course for _, best, _ in per_word for course in best}
+        for matched, best, truncated in per_word:
+            if not truncated:
+                continue
+            best.clear()
+            for course in candidates:
+                distances = [matched[term] for term in self._terms(course) if term in matched]
+                if distances:
+                    best[course] = min(distances)
+        scores = {}  # course -> [words matched, total distance]
+        for _, best, _ in per_word:
+            for course, distance in best.items():
+                score = scores.get(course)
+                if score is None:
+                    scores[course] = [1, distance]
+                else:
+                    score[0] += 1
+                    score[1] += distance
+        return heapq.nsmallest(k, (((-words, distance, course.course_id), course) for course, (words, distance) in scores.items()), key=itemgetter(0))
+
+# Compiled prerequisite graph. Every course ID gets an integer node ID and the edges
+# (course -> prerequisite) are stored as flat offset/target arrays, so closure, ordering
+# and validation queries run in time linear in the number of courses and edges.
+# IDs that are only ever referenced as prerequisites get node IDs after the catalog courses.
+class PrerequisiteGraph:
+    def __init__(self, courses):
+        self.ids = []     # node ID -> course ID
+        self.index = {}   # course ID -> node ID
+        catalog = []
+        for course in courses:
+            if course.course_id not in self.index:  # First copy of a duplicated ID wins
+                self.index[course.course_id] = len(self.ids)
+                self.ids.append(course.course_id)
+                catalog.append(course)
+        self.catalog_size = len(catalog)
+        self.courses = catalog  # node ID -> course, for catalog nodes
+        self._depths = None
+        self._depth_levels = None
+
+        self.prereq_offsets = array('i', [0])
+        self.prereq_targets = array('i')
+        for course in catalog:
+            for prereq in course.prerequisites:
+                target = self.index.get(prereq)
+                if target is None:
+                    target = self.index[prereq] = len(self.ids)
+                    self.ids.append(prereq)
+                self.prereq_targets.append(target)
+            self.prereq_offsets.append(len(self.prereq_targets))
+        # Missing prerequisites have no edges of their own
+        self.prereq_offsets.extend([len(self.prereq_targets)] * (len(self.ids) - self.catalog_size))
+
+        # Reverse edges (prerequisite -> courses that require it), built by counting sort
+        node_count = len(self.ids)
+        counts = [0] * (node_count + 1)
+        for target in self.prereq_targets:
+            counts[target + 1] += 1
+        for node in range(node_count):
+            counts[node + 1] += counts[node]
+        self.dependent_offsets = array('i', counts)
+        self.dependent_targets = array('i', bytes(4 * len(self.prereq_targets)))
+        fill = counts[:-1]
+        for node in range(self.catalog_size):
+            for edge in range(self.prereq_offsets[node], self.prereq_offsets[node + 1]):
+                target = self.prereq_targets[edge]
+                self.dependent_targets[fill[target]] = node
+                fill[target] += 1
+
+    def is_in_catalog(self, course_id):
+        node = self.index.get(course_id)
+        return node is not None and node < self.catalog_size
+
+    # Every course that must be taken before course_id, in a valid study order
+    # (each course appears after its own prerequisites). Returns None for unknown IDs.
+    def all_prerequisites(self, course_id):
+        start = self.index.get(course_id)
+        if start is None:
+            return None
+        offsets, targets = self.prereq_offsets, self.prereq_targets
+        visited = {start}
+        order = []
+        work = [(start, offsets[start])]
+        while work:
+            node, edge = work[-1]
+            if edge < offsets[node + 1]:
+                work[-1] = (node, edge + 1)
+                target = targets[edge]
+                if target not in visited:
+                    visited.add(target)
+                    work.append((target, offsets[target]))
+            else:
+                work.pop()
+                if node != start:
+                    order.append(self.ids[node])
+        return order
+
+    # Catalog courses ordered so every course follows its prerequisites (Kahn's algorithm).
+    # Courses on or behind a prerequisite cycle can never be scheduled and are left out.
+    def topological_order(self):
+        node_count = len(self.ids)
+        remaining = [self.prereq_offsets[node + 1] - self.prereq_offsets[node] for node in range(node_count)]
+        ready = [node for node in range(node_count) if remaining[node] == 0]
+        order = []
+        for node in ready:  # ready grows while we iterate over it
+            if node < self.catalog_size:
+                order.append(self.ids[node])
+            for edge in range(self.dependent_offsets[node], self.dependent_offsets[node + 1]):
+                dependent = self.dependent_targets[edge]
+                remaining[dependent] -= 1
+                if remaining[dependent] == 0:
+                    ready.append(dependent)
+        return order
+
+    # Prerequisite cycles as lists of course IDs (Tarjan's strongly connected components)
+    def find_cycles(self):
+        node_count = len(self.ids)
+        offsets, targets = self.prereq_offsets, self.prereq_targets
+        order = [-1] * node_count
+        low = [0] * node_count
+        on_stack = [False] * node_count
+        stack = []
+        cycles = []
+        counter = 0
+        for start in range(self.catalog_size):
+            if order[start] != -1:
+                continue
+            order[start] = low[start] = counter
+            counter += 1
+            stack.append(start)
+            on_stack[start] = True
+            work = [(start, offsets[start])]
+            while work:
+                node, edge = work[-1]
+                if edge < offsets[node + 1]:
+                    work[-1] = (node, edge + 1)
+                    target = targets[edge]
+                    if order[target] == -1:
+                        order[target] = low[target] = counter
+                        counter += 1
+                        stack.append(target)
+                        on_stack[target] = True
+                        work.append((target, offsets[target]))
+                    elif on_stack[target]:
+                        low[node] = min(low[node], order[target])
+                    continue
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[node])
+                if low[node] == order[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack[member] = False
+                        component.append(member)
+                        if member == node:
+                            break
+                    if len(component) > 1 or node in targets[offsets[node]:offsets[node + 1]]:
+                        cycles.append(sorted(self.ids[member] for member in component))
+        return cycles
+
+    # The courses a prerequisite cycle running through other graphs could pass: those
+    # reachable from entries (course IDs other graphs list as prerequisites) that can also
+    # reach a prerequisite outside this graph. Returned as (course_id, prerequisites) rows
+    # keeping only the edges to those courses and to prerequisites outside the graph.
+    def boundary(self, entries):
+        forward = {self.index[course_id] for course_id in entries if self.is_in_catalog(course_id)}
+        work = list(forward)
+        while work:
+            node = work.pop()
+            for target in self.prereq_targets[self.prereq_offsets[node]:self.prereq_offsets[node + 1]]:
+                if target < self.catalog_size and target not in forward:
+                    forward.add(target)
+                    work.append(target)
+        backward = set()
+        work = list(range(self.catalog_size, len(self.ids)))
+        while work:
+            node = work.pop()
+            for dependent in self.dependent_targets[self.dependent_offsets[node]:self.dependent_offsets[node + 1]]:
+                if dependent not in backward:
+                    backward.add(dependent)
+                    work.append(dependent)
+        keep = forward & backward
+        return [(self.ids[node], [self.ids[target] for target in self.prereq_targets[self.prereq_offsets[node]:self.prereq_offsets[node + 1]]
+                                  if target in keep or target >= self.catalog_size])
+                for node in sorted(keep)]
+
+    # Prerequisite IDs that are not in the catalog, mapped to the courses that reference them
+    def missing_prerequisites(self):
+        missing = {}
+        for node in range(self.catalog_size, len(self.ids)):
+            dependents = self.dependent_targets[self.dependent_offsets[node]:self.dependent_offsets[node + 1]]
+            missing[self.ids[node]] = [self.ids[dependent] for dependent in dependents]
+        return missing
+
+    # Length of the longest prerequisite chain under each node (0 when a course has no
+    # prerequisites), found in topological order. Courses on or behind a cycle get -1.
+    def depths(self):
+        if self._depths is None:
+            node_count = len(self.ids)
+            remaining = [self.prereq_offsets[node + 1] - self.prereq_offsets[node] for node in range(node_count)]
+            depth = [0] * node_count
+            ready = [node for node in range(node_count) if remaining[node] == 0]
+            for node in ready:  # ready grows while we iterate over it
+                for edge in range(self.dependent_offsets[node], self.dependent_offsets[node + 1]):
+                    dependent = self.dependent_targets[edge]
+                    depth[dependent] = max(depth[dependent], depth[node] + 1)
+                    remaining[dependent] -= 1
+                    if remaining[dependent] == 0:
+                        ready.append(dependent)
+            self._depths = array('i', (-1 if remaining[node] else depth[node] for node in range(node_count)))
+        return self._depths
+
+    # Catalog courses grouped by prerequisite depth, shallowest level first (or deepest first),
+    # in course_id order within a level. Courses on or behind a cycle are left out.
+    def courses_by_depth(self, deepest_first=False):
+        if self._depth_levels is None:
+            depths = self.depths()
+            levels = {}
+            for node, course in enumerate(self.courses):
+                if depths[node] >= 0:
+                    levels.setdefault(depths[node], []).append(course)
+            self._depth_levels = [levels[depth] for depth in sorted(levels)]
+        for level in (reversed(self._depth_levels) if deepest_first else self._depth_levels):
+            yield from level
+
+# Read-through cache of every course's full (transitive) prerequisite set, on top of the
+# compiled PrerequisiteGraph. Each set is an int bitset indexed by a course ordinal the cache
+# assigns on first sight, so cached sets stay valid when the graph is recompiled after an
+# edit. Sets are kept in LRU order up to maxsize entries, and a walk reuses any set already
+# cached for a prerequisite. Changing a course (insert, delete or new prerequisites) drops
+# only its own set and the cached sets that contain it; the cache is never rebuilt.
+class PrerequisiteClosureCache:
+    def __init__(self, catalog, maxsize=CLOSURE_CACHE_SIZE):
+        self.catalog = catalog  # Anything with prerequisite_graph()
+        self.maxsize = maxsize
+        self.ordinals = {}  # course ID -> bit position
+        self.ids = []       # bit position -> course ID
+        self.entries = OrderedDict()  # course ID -> ancestor bitset
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def _ordinal(self, course_id):
+        ordinal = self.ordinals.get(course_id)
+        if ordinal is None:
+            ordinal = self.ordinals[course_id] = len(self.ids)
+            self.ids.append(course_id)
+        return ordinal
+
+    # Bitset of everything reachable from node's prerequisite edges. A course on a
+    # prerequisite cycle reaches itself, so its own bit may be set.
+    def _closure(self, graph, node):
+        offsets, targets = graph.prereq_offsets, graph.prereq_targets
+        bits = 0
+        seen = set()
+        pending = list(targets[offsets[node]:offsets[node + 1]])
+        while pending:
+            prereq = pending.pop()
+            if prereq in seen:
+                continue
+            seen.add(prereq)
+            course_id = graph.ids[prereq]
+            bits |= 1 << self._ordinal(course_id)
+            cached = self.entries.get(course_id)
+            if cached is not None:
+                bits |= cached
+                continue
+            pending.extend(targets[offsets[prereq]:offsets[prereq + 1]])
+        return bits
+
+    # Ancestor bitset of a catalog course (None if it is not in the catalog); lock held
+    def _lookup(self, course_id):
+        bits = self.entries.get(course_id)
+        if bits is not None:
+            self.hits += 1
+            self.entries.move_to_end(course_id)
+            return bits
+        self.misses += 1
+        graph = self.catalog.prerequisite_graph()
+        if not graph.is_in_catalog(course_id):
+            return None
+        bits = self.entries[course_id] = self._closure(graph, graph.index[course_id])
+        if len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+        return bits
+
+    def ancestor_bits(self, course_id):
+        with self.lock:
+            return self._lookup(course_id)
+
+    # IDs of every course that must be taken before course_id, in no particular order
+    # (None if it is not in the catalog)
+    def ancestors(self, course_id):
+        with self.lock:
+            bits = self._lookup(course_id)
+            if bits is None:
+                return None
+            own = self.ordinals.get(course_id)
+            if own is not None:
+                bits &= ~(1 << own)
+            found = []
+            while bits:
+                lowest = bits & -bits
+                found.append(self.ids[lowest.bit_length() - 1])
+                bits ^= lowest
+            return found
+
+    def is_prerequisite(self, prereq_id, course_id):
+        with self.lock:
+            bits = self._lookup(course_id)
+            ordinal = self.ordinals.get(prereq_id)
+            return bool(bits and ordinal is not None and prereq_id != course_id and bits >> ordinal & 1)
+
+    # The given courses were inserted, deleted or given new prerequisites: drop their sets
+    # and every cached set that reaches them
+    def invalidate(self, course_ids):
+        with self.lock:
+            mask = 0
+            stale = []
+            for course_id in course_ids:
+                if course_id in self.entries:
+                    stale.append(course_id)
+                ordinal = self.ordinals.get(course_id)
+                if ordinal is not None:
+                    mask |= 1 << ordinal
+            if mask:
+                stale.extend(cached_id for cached_id, bits in self.entries.items() if bits & mask)
+            for cached_id in stale:
+                if self.entries.pop(cached_id, None) is not None:
+                    self.invalidations += 1
+
+    def clear(self):
+        with self.lock:
+            self.invalidations += len(self.entries)
+            self.entries.clear()
+            self.ordinals.clear()
+            self.ids.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self.entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+# Term-by-term degree plans over a compiled prerequisite graph. Only the graph's integer
+# arrays are kept, so a planner is cheap to send to worker processes for batch planning.
+# A plan covers the targets and every prerequisite of theirs not yet completed. Terms are
+# filled by layered list scheduling: a course becomes ready the term after its last
+# prerequisite, and each term takes up to max_per_term ready courses, longest remaining
+# prerequisite chain (critical path) first and then by course ID.
+class DegreePlanner:
+    def __init__(self, graph, max_per_term=COURSES_PER_TERM):
+        if max_per_term < 1:
+            raise ValueError("max_per_term must be at least 1")
+        self.max_per_term = max_per_term
+        self.ids = graph.ids
+        self.index = graph.index
+        self.catalog_size = graph.catalog_size
+        self.prereq_offsets = graph.prereq_offsets
+        self.prereq_targets = graph.prereq_targets
+
+    # Returns {"terms": [[course IDs], ...], "unknown": targets not in the catalog,
+    # "missing": needed prerequisites not in the catalog, "blocked": needed courses that can
+    # never be taken because of a missing prerequisite or a prerequisite cycle}
+    def plan(self, targets, completed=()):
+        index, offsets, edges = self.index, self.prereq_offsets, self.prereq_targets
+        done = {index[course_id] for course_id in completed if course_id in index}
+        unknown = [course_id for course_id in targets if index.get(course_id, self.catalog_size) >= self.catalog_size]
+
+        # Walk down from the targets to every prerequisite that is still needed
+        needed = set()
+        remaining = {}   # needed course -> prerequisite edges not yet scheduled
+        dependents = {}  # needed course -> needed courses that list it as a prerequisite
+        stack = [index[course_id] for course_id in targets if course_id not in unknown and index[course_id] not in done]
+        while stack:
+            node = stack.pop()
+            if node in needed:
+                continue
+            needed.add(node)
+            remaining[node] = 0
+            for edge in range(offsets[node], offsets[node + 1]):
+                prereq = edges[edge]
+                if prereq not in done:
+                    remaining[node] += 1
+                    dependents.setdefault(prereq, []).append(node)
+                    stack.append(prereq)
+
+        # Topological order of the courses that can actually be scheduled (Kahn's algorithm)
+        left = dict(remaining)
+        order = [node for node in needed if left[node] == 0 and node < self.catalog_size]
+        for node in order:  # order grows while we iterate over it
+            for dependent in dependents.get(node, ()):
+                left[dependent] -= 1
+                if left[dependent] == 0:
+                    order.append(dependent)
+
+        # Critical path: the longest chain of needed courses starting at each course
+        chain = dict.fromkeys(order, 1)
+        for node in reversed(order):
+            for edge in range(offsets[node], offsets[node + 1]):
+                prereq = edges[edge]
+                if prereq in chain and chain[prereq] < chain[node] + 1:
+                    chain[prereq] = chain[node] + 1
+
+        terms = []
+        ready = [(-chain[node], self.ids[node], node) for node in order if remaining[node] == 0]
+        heapq.heapify(ready)
+        while ready:
+            term = [heapq.heappop(ready) for _ in range(min(self.max_per_term, len(ready)))]
+            terms.append([course_id for _, course_id, _ in term])
+            for _, _, node in term:
+                for dependent in dependents.get(node, ()):
+                    remaining[dependent] -= 1
+                    if remaining[dependent] == 0:
+                        heapq.heappush(ready, (-chain[dependent], self.ids[dependent], dependent))
+
+        unscheduled = needed.difference(chain)
+        return {
+            "terms": terms,
+            "unknown": unknown,
+            "missing": sorted(self.ids[node] for node in unscheduled if node >= self.catalog_size),
+            "blocked": sorted(self.ids[node] for node in unscheduled if node < self.catalog_size),
+        }
+
+# Planner used by each batch-planning worker process, set once when the worker starts
+_worker_planner = None
+
+def _start_plan_worker(planner):
+    global _worker_planner
+    _worker_planner = planner
+
+def _plan_in_worker(request):
+    targets, completed = request
+    return _worker_planner.plan(targets, completed)
+
+# Plan many students at once. requests are (targets, completed) pairs and the plans come
+# back in the same order. Large batches are spread over a process pool; each worker gets
+# the planner once when it starts, then requests in chunks.
+def plan_degrees(planner, requests, workers=None):
+    requests = list(requests)
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(requests) < PARALLEL_PLAN_THRESHOLD:
+        return [planner.plan(targets, completed) for targets, completed in requests]
+    chunksize = max(1, len(requests) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_start_plan_worker, initargs=(planner,)) as pool:
+        return list(pool.map(_plan_in_worker, requests, chunksize=chunksize))
+
+# Readable lines for a degree plan
+def format_degree_plan(plan):
+    lines = [f"Term {number}: {', '.join(term)}" for number, term in enumerate(plan["terms"], 1)]
+    if plan["unknown"]:
+        lines.append(f"Not in the catalog: {', '.join(plan['unknown'])}")
+    if plan["missing"]:
+        lines.append(f"Prerequisites missing from the catalog: {', '.join(plan['missing'])}")
+    if plan["blocked"]:
+        lines.append(f"Cannot be scheduled (missing prerequisite or prerequisite cycle): {', '.join(plan['blocked'])}")
+    return lines
+
+# Sort key for lists of courses kept in course_id order
+course_id_of = attrgetter("course_id")
+
+# Secondary index of the catalog by number of prerequisites: one bucket per count, each in
+# course_id order. It is updated on every insert and prerequisite change, so views sorted by
+# prerequisite count stream straight out of the buckets instead of re-sorting the tree.
+class PrerequisiteCountIndex:
+    def __init__(self):
+        self.buckets = {}  # prerequisite count -> courses in course_id order
+
+    def __len__(self):
+        return sum(len(bucket) for bucket in self.buckets.values())
+
+    # Replace the index with courses already in course_id order (a bulk load)
+    def rebuild(self, courses):
+        self.buckets = {}
+        for course in courses:
+            bucket = self.buckets.get(len(course.prerequisites))
+            if bucket is None:
+                bucket = self.buckets[len(course.prerequisites)] = []
+            bucket.append(course)
+
+    # Equal IDs go after the ones already indexed, matching the tree's insertion order
+    def add(self, course):
+        insort(self.buckets.setdefault(len(course.prerequisites), []), course, key=course_id_of)
+
+    # count is the number of prerequisites the course was indexed under
+    def remove(self, course, count):
+        bucket = self.buckets.get(count, [])
+        position = bisect_left(bucket, course.course_id, key=course_id_of)
+        while position < len(bucket) and bucket[position] is not course:
+            position += 1
+        if position < len(bucket):
+            del bucket[position]
+            if not bucket:
+                del self.buckets[count]
+
+    # ((count, position), course) pairs from start onward, fewest prerequisites first
+    # (most first with most_first); a pair's position can be passed back as start to resume
+    def entries(self, start=None, most_first=False):
+        for count in sorted(self.buckets, reverse=most_first):
+            if start is not None and (count > start[0] if most_first else count < start[0]):
+                continue
+            bucket = self.buckets[count]
+            first = start[1] if start is not None and count == start[0] else 0
+            for position in range(first, len(bucket)):
+                yield (count, position), bucket[position]
+
+    def courses(self, most_first=False):
+        return (course for _, course in self.entries(most_first=most_first))
+
+# Reverse prerequisite index: for every prerequisite ID, the courses that list it, in
+# course_id order. It is updated on every load, insert, reload and prerequisite change, so
+# "what does this course unlock?" reads one list instead of scanning the catalog. IDs that
+# are not in the catalog are indexed too, so courses waiting on a missing course are found.
+class DependentIndex:
+    def __init__(self):
+        self.dependents = {}  # prerequisite ID -> courses requiring it, in course_id order
+
+    # Replace the index with courses already in course_id order (a bulk load)
+    def rebuild(self, courses):
+        self.dependents = {}
+        for course in courses:
+            for prereq in dict.fromkeys(course.prerequisites):
+                dependents = self.dependents.get(prereq)
+                if dependents is None:
+                    dependents = self.dependents[prereq] = []
+                dependents.append(course)
+
+    def add(self, course):
+        for prereq in dict.fromkeys(course.prerequisites):
+            insort(self.dependents.setdefault(prereq, []), course, key=course_id_of)
+
+    # prerequisites are the ones the course was indexed with
+    def remove(self, course, prerequisites):
+        for prereq in dict.fromkeys(prerequisites):
+            dependents = self.dependents.get(prereq, [])
+            position = bisect_left(dependents, course.course_id, key=course_id_of)
+            while position < len(dependents) and dependents[position] is not course:
+                position += 1
+            if position < len(dependents):
+                del dependents[position]
+                if not dependents:
+                    del self.dependents[prereq]
+
+    def direct(self, course_id):
+        return list(self.dependents.get(course_id, ()))
+
+# Lines describing a removal_impact() report
+def format_removal_impact(impact):
+    lines = []
+    for course_id in impact["removed"]:
+        direct, downstream = impact["direct"][course_id], impact["downstream"][course_id]
+        if not downstream:
+            lines.append(f"{course_id} is not a prerequisite of any course.")
+            continue
+        lines.append(f"{course_id} is needed by {len(downstream)} course(s), {len(direct)} directly: "
+                     f"{', '.join(course.course_id for course in direct)}")
+    if impact["blocked"]:
+        lines.append(f"Removing {', '.join(impact['removed'])} would block {len(impact['blocked'])} course(s):")
+        lines.extend(f"{course.course_id}: {course.course_name}" for course in impact["blocked"])
+    return lines
+
+# Differences between the loaded catalog and a fresh copy of it, matched by course_id and
+# compared by name and prerequisites. Built by BinarySearchTree.diff, applied by apply_changes.
+class CatalogChanges:
+    def __init__(self):
+        self.inserted = []    # Courses in the fresh copy that are not loaded yet
+        self.updated = []     # (loaded course, new name, new prerequisites)
+        self.deleted = []     # Loaded courses missing from the fresh copy, and repeated copies of an ID
+        self.loaded = 0       # Courses in the tree when the diff was taken
+        self.duplicates = False
+
+    def __bool__(self):
+        return bool(self.inserted or self.updated or self.deleted)
+
+    def summary(self):
+        return f"{len(self.inserted)} added, {len(self.updated)} updated, {len(self.deleted)} removed"
+
 # Node structure for Binary Search Tree
 class Node:
+    __slots__ = ("course", "left", "right", "height")
+
     def __init__(self, course):
         self.course = course
         self.left = None
         self.right = None
+        self.height = 1  # Only maintained when the tree is in balanced mode
+
+# Height of a (possibly empty) subtree
+def node_height(node):
+    return node.height if node else 0
+
+# Bounds [prefix, upper) of the ID range holding every ID that starts with prefix
+# (upper is None when no bound is needed)
+def prefix_bounds(prefix):
+    upper = prefix
+    while upper and upper[-1] == chr(sys.maxunicode):
+        upper = upper[:-1]
+    return prefix, (upper[:-1] + chr(ord(upper[-1]) + 1) if upper else None)
 
 # Binary Search Tree Implementation
+# With balanced=True the tree rebalances itself (AVL) after every insert, so a catalog
+# exported in sorted order still gives O(log n) lookups instead of a linked list.
 class BinarySearchTree:
-    def __init__(self):
+    def __init__(self, balanced=False):
         self.root = None
+        self.balanced = balanced
+        self.keyword_index = NGramIndex()
+        self._fuzzy_index = None  # Built on the first fuzzy search, then kept up to date
+        self._prerequisite_graph = None
+        self.prerequisite_index = PrerequisiteCountIndex()
+        self.dependent_index = DependentIndex()
+        self.closure_cache = PrerequisiteClosureCache(self)
+        self._snapshot = None  # Answers search() while load_snapshot() builds the tree
+        self._loaded = threading.Event()
+        self._loaded.set()
+        self._load_error = None
+
+    # Build a balanced tree straight from CSV rows (header already skipped)
+    @classmethod
+    def from_rows(cls, rows, balanced=True):
+        bst = cls(balanced=balanced)
+        bst.bulk_load(course_from_row(row) for row in rows if row)
+        return bst
+
+    @classmethod
+    def from_csv(cls, file_path, balanced=True, chunk_size=DEFAULT_CHUNK_SIZE):
+        bst = cls(balanced=balanced)
+        bst.bulk_load(course for chunk in CourseCsvStream(file_path, chunk_size) for course in chunk)
+        return bst
+
+    # Add many courses at once: sort by course_id a single time and rebuild the tree
+    # from the median outward, so load time no longer depends on the file's row order.
+    # Courses already in the tree are kept, and ties keep their insertion order.
+    @timed("bulk_load")
+    def bulk_load(self, courses):
+        courses = list(courses)
+        for course in courses:
+            self.keyword_index.add(course)
+            if self._fuzzy_index is not None:
+                self._fuzzy_index.add(course)
+        self._prerequisite_graph = None
+        if self.root is None:
+            self.closure_cache.clear()
+        else:
+            self.closure_cache.invalidate(course.course_id for course in courses)
+        ordered = self.collect_courses(self.root, [])
+        ordered.extend(courses)
+        ordered.sort(key=lambda course: course.course_id)
+        self.prerequisite_index.rebuild(ordered)
+        self.dependent_index.rebuild(ordered)
+        self.root = self._build_balanced(ordered, 0, len(ordered) - 1)
+
+    # Fill an empty tree from a mapped CatalogSnapshot on a background thread. Until the tree
+    # and its indexes are built, search() is a binary search straight over the mapped file,
+    # so course lookups work as soon as the snapshot is opened. Everything else must call
+    # wait_until_loaded() first.
+    def load_snapshot(self, snapshot):
+        self._snapshot = snapshot
+        self._loaded.clear()
+        threading.Thread(target=self._load_snapshot_rows, args=(snapshot,), daemon=True).start()
+
+    def _load_snapshot_rows(self, snapshot):
+        try:
+            self.bulk_load([Course(*row) for row in snapshot.rows()])
+        except Exception as e:
+            self._load_error = e
+        finally:
+            # Not closed here, as a search() may still be reading it; the file is unmapped
+            # when the last reference goes away
+            self._snapshot = None
+            self._loaded.set()
+
+    # False while load_snapshot() is still building the tree
+    @property
+    def loaded(self):
+        return self._loaded.is_set()
+
+    # Block until load_snapshot() has finished, re-raising any error it hit
+    def wait_until_loaded(self):
+        self._loaded.wait()
+        if self._load_error is not None:
+            raise self._load_error
+
+    def _build_balanced(self, courses, low, high):
+        if low > high:
+            return None
+        mid = (low + high) // 2
+        node = Node(courses[mid])
+        node.left = self._build_balanced(courses, low, mid - 1)
+        node.right = self._build_balanced(courses, mid + 1, high)
+        node.height = 1 + max(node_height(node.left), node_height(node.right))
+        return node
 
     def insert(self, course):
-        new_node = Node(course)
+        self._link(Node(course))
+        self._index(course)
+        self._prerequisite_graph = None
+        self.closure_cache.invalidate([course.course_id])
+
+    # Add a course to the keyword, fuzzy, prerequisite count and dependent indexes
+    def _index(self, course):
+        self.keyword_index.add(course)
+        if self._fuzzy_index is not None:
+            self._fuzzy_index.add(course)
+        self.prerequisite_index.add(course)
+        self.dependent_index.add(course)
+
+    def _unindex(self, course):
+        self.keyword_index.remove(course)
+        if self._fuzzy_index is not None:
+            self._fuzzy_index.remove(course)
+        self.prerequisite_index.remove(course, len(course.prerequisites))
+        self.dependent_index.remove(course, course.prerequisites)
+
+    # Compare the tree with a fresh copy of the catalog without changing anything, so it can
+    # run while others read the tree. The first copy of a repeated course ID wins.
+    def diff(self, courses):
+        incoming = {}
+        for course in courses:
+            incoming.setdefault(course.course_id, course)
+        changes = CatalogChanges()
+        previous_id = None
+        for node in self._in_order_nodes(self.root):
+            course = node.course
+            changes.loaded += 1
+            if course.course_id == previous_id:
+                changes.deleted.append(course)  # Extra copy left by loading the same file twice
+                changes.duplicates = True
+                continue
+            previous_id = course.course_id
+            new = incoming.pop(course.course_id, None)
+            if new is None:
+                changes.deleted.append(course)
+            elif new.course_name != course.course_name or new.prerequisites != course.prerequisites:
+                changes.updated.append((course, new.course_name, new.prerequisites))
+        changes.inserted = list(incoming.values())
+        return changes
+
+    # Apply a diff(): only changed courses are re-indexed and, unless a large share of the
+    # catalog was added or removed (or repeated IDs must be cleaned up), the tree is edited
+    # with single AVL inserts and deletes instead of being rebuilt
+    def apply_changes(self, changes):
+        changed = [course.course_id for course in changes.deleted]  # Courses whose prerequisite sets change
+        for course in changes.deleted:
+            self._unindex(course)
+        for course, course_name, prerequisites in changes.updated:
+            if prerequisites != course.prerequisites:
+                changed.append(course.course_id)
+            self._unindex(course)
+            course.course_name = course_name
+            course.prerequisites = prerequisites
+            self._index(course)
+        for course in changes.inserted:
+            self._index(course)
+            changed.append(course.course_id)
+
+        # The indexes are already current; only the tree shape is rebuilt or patched
+        if changes.duplicates or len(changes.inserted) + len(changes.deleted) > changes.loaded // 4:
+            removed = set(changes.deleted)
+            courses = [course for course in self if course not in removed]
+            courses.extend(changes.inserted)
+            courses.sort(key=course_id_of)
+            self.root = self._build_balanced(courses, 0, len(courses) - 1)
+        else:
+            for course in changes.deleted:
+                self._unlink(course.course_id)
+            for course in changes.inserted:
+                self._link(Node(course))
+
+        self._prerequisite_graph = None
+        self.closure_cache.invalidate(changed)
+        return changes
+
+    # Bring the tree in line with a fresh copy of the catalog; returns the CatalogChanges
+    def reload(self, courses):
+        return self.apply_changes(self.diff(courses))
+
+    # Remove the node for course_id (IDs must be unique), rebalancing in balanced mode
+    def _unlink(self, course_id):
+        path = []
+        node = self.root
+        while node and node.course.course_id != course_id:
+            path.append(node)
+            node = node.left if course_id < node.course.course_id else node.right
+        if node is None:
+            return None
+        parent = path[-1] if path else None
+        if node.left and node.right:
+            # Move the in-order successor up into the node's place
+            below = []
+            successor = node.right
+            while successor.left:
+                below.append(successor)
+                successor = successor.left
+            if below:
+                below[-1].left = successor.right
+                successor.right = node.right
+            successor.left = node.left
+            successor.height = node.height
+            replacement = successor
+            path.append(successor)
+            path.extend(below)
+        else:
+            replacement = node.left or node.right
+        if parent is None:
+            self.root = replacement
+        elif parent.left is node:
+            parent.left = replacement
+        else:
+            parent.right = replacement
+        node.left = node.right = None
+        if self.balanced:
+            self._rebalance_all(path)
+        return node
+
+    # Like _rebalance_path, but a deletion can need rotations at several levels
+    def _rebalance_all(self, path):
+        for i in range(len(path) - 1, -1, -1):
+            node = path[i]
+            node.height = 1 + max(node_height(node.left), node_height(node.right))
+            subtree = self._rebalance(node)
+            if subtree is not node:
+                if i == 0:
+                    self.root = subtree
+                elif path[i - 1].left is node:
+                    path[i - 1].left = subtree
+                else:
+                    path[i - 1].right = subtree
+
+    # Attach a new node at its BST position, rebalancing in balanced mode
+    def _link(self, new_node):
         if not self.root:
             self.root = new_node
-        else:
-            current = self.root
-            while True:
-                if course.course_id < current.course.course_id:
-                    if current.left is None:
-                        current.left = new_node
-                        break
-                    current = current.left
+            return
+        path = []  # Nodes visited on the way down, used to rebalance on the way back up
+        current = self.root
+        while True:
+            path.append(current)
+            if new_node.course.course_id < current.course.course_id:
+                if current.left is None:
+                    current.left = new_node
+                    break
+                current = current.left
+            else:
+                if current.right is None:
+                    current.right = new_node
+                    break
+                current = current.right
+        if metrics.enabled:
+            metrics.observe("insert_depth", len(path) + 1)
+        if self.balanced:
+            self._rebalance_path(path)
+
+    # Walk back up the insert path fixing heights, rotating at the first unbalanced node
+    def _rebalance_path(self, path):
+        for i in range(len(path) - 1, -1, -1):
+            node = path[i]
+            old_height = node.height
+            node.height = 1 + max(node_height(node.left), node_height(node.right))
+            subtree = self._rebalance(node)
+            if subtree is not node:
+                if i == 0:
+                    self.root = subtree
+                elif path[i - 1].left is node:
+                    path[i - 1].left = subtree
                 else:
-                    if current.right is None:
-                        current.right = new_node
-                        break
-                    current = current.right
+                    path[i - 1].right = subtree
+                break  # A rotation restores the subtree's previous height
+            if node.height == old_height:
+                break  # Nothing above this node can have changed
+
+    def _rebalance(self, node):
+        balance = node_height(node.left) - node_height(node.right)
+        if balance > 1:
+            if node_height(node.left.left) < node_height(node.left.right):
+                node.left = self._rotate_left(node.left)
+            return self._rotate_right(node)
+        if balance < -1:
+            if node_height(node.right.right) < node_height(node.right.left):
+                node.right = self._rotate_right(node.right)
+            return self._rotate_left(node)
+        return node
+
+    def _rotate_left(self, node):
+        pivot = node.right
+        node.right = pivot.left
+        pivot.left = node
+        node.height = 1 + max(node_height(node.left), node_height(node.right))
+        pivot.height = 1 + max(node_height(pivot.left), node_height(pivot.right))
+        return pivot
+
+    def _rotate_right(self, node):
+        pivot = node.left
+        node.left = pivot.right
+        pivot.right = node
+        node.height = 1 + max(node_height(node.left), node_height(node.right))
+        pivot.height = 1 + max(node_height(pivot.left), node_height(pivot.right))
+        return pivot
 
     def search(self, course_id):
+        snapshot = self._snapshot
+        if snapshot is not None:
+            row = snapshot.search(course_id)
+            return Course(*row) if row else None
+        if metrics.enabled:
+            return self._measured_search(course_id)
         current = self.root
         while current:
             if current.course.course_id == course_id:
@@ -76,71 +1377,1199 @@ class BinarySearchTree:
                 current = current.right
         return None
 
+    # search() recording its path length and key comparisons in metrics
+    def _measured_search(self, course_id):
+        start = time.perf_counter()
+        depth = comparisons = 0
+        found = None
+        current = self.root
+        while current:
+            depth += 1
+            comparisons += 1
+            if current.course.course_id == course_id:
+                found = current.course
+                break
+            comparisons += 1
+            current = current.left if course_id < current.course.course_id else current.right
+        metrics.record("search", start)
+        metrics.observe("search_depth", depth)
+        metrics.observe("search_comparisons", comparisons)
+        return found
+
+    # In-order walk using an explicit stack so deep trees never hit the recursion limit
+    def _in_order_nodes(self, node):
+        stack = []
+        while stack or node:
+            while node:
+                stack.append(node)
+                node = node.left
+            node = stack.pop()
+            yield node
+            node = node.right
+
+    # Courses in course_id order, produced one at a time
+    def __iter__(self):
+        return self.courses_from()
+
+    # In-order walk starting at the first course whose ID is >= course_id (the whole tree
+    # for None). Only the path down to the start is visited before the first course is yielded.
+    def courses_from(self, course_id=None):
+        stack = []
+        node = self.root
+        while node:
+            if course_id is None or course_id <= node.course.course_id:
+                stack.append(node)
+                node = node.left
+            else:
+                node = node.right
+        while stack:
+            node = stack.pop()
+            yield node.course
+            node = node.right
+            while node:
+                stack.append(node)
+                node = node.left
+
+    # Courses with lo <= course_id < hi, in order (either bound may be None). The walk
+    # descends straight to lo and stops at hi, so k courses cost O(log n + k).
+    def range(self, lo=None, hi=None):
+        for course in self.courses_from(lo):
+            if hi is not None and course.course_id >= hi:
+                return
+            yield course
+
+    # Courses whose ID starts with prefix, e.g. prefix("CSCI3") for the CSCI 300 level
+    def prefix(self, prefix):
+        return self.range(*prefix_bounds(prefix))
+
+    # Replace a course's prerequisites, keeping the derived prerequisite data in step
+    def update_prerequisites(self, course_id, prerequisites):
+        course = self.search(course_id)
+        if course is None:
+            return False
+        self.prerequisite_index.remove(course, len(course.prerequisites))
+        self.dependent_index.remove(course, course.prerequisites)
+        course.prerequisites = prerequisites
+        self.prerequisite_index.add(course)
+        self.dependent_index.add(course)
+        self._prerequisite_graph = None
+        self.closure_cache.invalidate([course_id])
+        return True
+
+    # Compiled once per load and reused until the next insert
+    def prerequisite_graph(self):
+        if self._prerequisite_graph is None:
+            self._prerequisite_graph = PrerequisiteGraph(self)
+        return self._prerequisite_graph
+
+    # (prerequisite ID not in the catalog -> courses listing it, prerequisite cycles)
+    def prerequisite_problems(self):
+        graph = self.prerequisite_graph()
+        return graph.missing_prerequisites(), graph.find_cycles()
+
+    # Every course that must be taken before course_id, from the closure cache, in a valid
+    # study order: shallowest prerequisite chain first (see PrerequisiteGraph.depths), then by
+    # course ID. Courses on or behind a prerequisite cycle come last. None for unknown IDs.
+    def all_prerequisites(self, course_id):
+        ancestors = self.closure_cache.ancestors(course_id)
+        if ancestors is None:
+            return None
+        graph = self.prerequisite_graph()
+        depths, index = graph.depths(), graph.index
+        return sorted(ancestors, key=lambda prereq: (depths[index[prereq]] < 0, depths[index[prereq]], prereq))
+
+    # Courses ordered by number of prerequisites, ties in course_id order. Streamed from
+    # the prerequisite count index, so the first k courses cost O(k).
+    # With after, the (prerequisite count, course_id) of a course already seen, the listing
+    # resumes just past it by binary search instead of skipping the courses before it
+    def courses_by_prerequisites(self, most_first=False, after=None):
+        start = None
+        if after is not None:
+            bucket = self.prerequisite_index.buckets.get(after[0], [])
+            start = (after[0], bisect_right(bucket, after[1], key=course_id_of))
+        return (course for _, course in self.prerequisite_index.entries(start, most_first))
+
+    # Courses that list course_id as a prerequisite, in course_id order
+    def dependents(self, course_id):
+        return self.dependent_index.direct(course_id)
+
+    # Every course that needs course_id, directly or further down a prerequisite chain, in
+    # course_id order. Only the courses reached and their index entries are visited.
+    def downstream(self, course_id):
+        seen = {course_id}
+        found = []
+        pending = [course_id]
+        while pending:
+            for course in self.dependents(pending.pop()):
+                if course.course_id not in seen:
+                    seen.add(course.course_id)
+                    found.append(course)
+                    pending.append(course.course_id)
+        found.sort(key=course_id_of)
+        return found
+
+    # What removing course_ids (e.g. cancelled this term) would block: each removed course's
+    # direct and downstream dependents, and every blocked course once, in course_id order.
+    # Removed courses are not counted as blocked. The cost follows the downstream subgraphs.
+    def removal_impact(self, course_ids):
+        removed = dict.fromkeys(course_ids)
+        impact = {"removed": list(removed), "direct": {}, "downstream": {}, "blocked": []}
+        blocked = {}
+        for course_id in removed:
+            impact["direct"][course_id] = self.dependents(course_id)
+            impact["downstream"][course_id] = self.downstream(course_id)
+            for course in impact["downstream"][course_id]:
+                blocked.setdefault(course.course_id, course)
+        impact["blocked"] = sorted((course for course_id, course in blocked.items() if course_id not in removed), key=course_id_of)
+        return impact
+
+    # Courses ordered by the length of their longest prerequisite chain (see PrerequisiteGraph)
+    def courses_by_depth(self, deepest_first=False):
+        return self.prerequisite_graph().courses_by_depth(deepest_first)
+
+    # Planner for term-by-term degree plans over the current catalog
+    def degree_planner(self, max_per_term=COURSES_PER_TERM):
+        return DegreePlanner(self.prerequisite_graph(), max_per_term)
+
+    @timed("keyword_search")
+    def keyword_search(self, keyword, limit=None):
+        return self.keyword_index.search(keyword, limit)
+
+    # Best matches for a possibly misspelled query ("algoritms", "CSC300"), best first
+    @timed("fuzzy_search")
+    def fuzzy_search(self, query, k=FUZZY_RESULTS):
+        return [course for _, course in self.fuzzy_ranked(query, k)]
+
+    # fuzzy_search with each course's ranking key, for merging results across shards
+    def fuzzy_ranked(self, query, k=FUZZY_RESULTS):
+        if self._fuzzy_index is None:
+            self._fuzzy_index = FuzzyIndex()
+            for course in self:
+                self._fuzzy_index.add(course)
+        return self._fuzzy_index.ranked(query, k)
+
     def print_courses(self, node):
-        if node:
-            self.print_courses(node.left)
-            print(f"{node.course.course_id}, {node.course.course_name}")
-            self.print_courses(node.right)
+        for current in self._in_order_nodes(node):
+            print(f"{current.course.course_id}, {current.course.course_name}")
 
+    @timed("collect_courses")
     def collect_courses(self, node, courses):
-        if node:
-            self.collect_courses(node.left, courses)
-            courses.append(node.course)
-            self.collect_courses(node.right, courses)
+        for current in self._in_order_nodes(node):
+            courses.append(current.course)
         return courses
 
     def sort_by_prerequisites(self):
-        courses = self.collect_courses(self.root, [])
-        courses.sort(key=lambda c: len(c.prerequisites), reverse=True)
         print("\n Courses Sorted by Number of Prerequisites:\n")
-        for course in courses:
+        for course in self.courses_by_prerequisites(most_first=True):
             print(f"{course.course_id}: {course.course_name} - Prerequisites: {', '.join(course.prerequisites) if course.prerequisites else 'None'}")
         print()
 
-# Load courses from a CSV file into a BST
-def load_courses(file_path, bst):
-    try:
-        with open(file_path, 'r') as file:
-            reader = csv.reader(file)
-            next(reader)  # Skip header row
+# Build a Course from one CSV row: ID, name, then any number of prerequisite columns.
+# IDs are interned so a course and every prerequisite list naming it share one string.
+def course_from_row(row):
+    prerequisites = [sys.intern(prereq) for prereq in row[2:] if prereq]
+    return Course(sys.intern(row[0]), row[1], prerequisites)
+
+# Build a Course from a (course_id, course_name, prerequisites) row sent between processes,
+# interning the IDs as course_from_row does (unpickled strings are always new objects)
+def course_from_tuple(row):
+    course_id, course_name, prerequisites = row
+    return Course(sys.intern(course_id), course_name, [sys.intern(prereq) for prereq in prerequisites])
+
+# Streams a course CSV as chunks of validated, parsed rows so only one chunk of raw rows
+# is in memory at a time. Rows without a course ID or name are skipped and counted.
+# The counters are kept up to date as the file is read, for progress reporting.
+class CourseCsvStream:
+    def __init__(self, file_path, chunk_size=DEFAULT_CHUNK_SIZE):
+        self.file_path = file_path
+        self.chunk_size = chunk_size
+        self.total_bytes = os.path.getsize(file_path)  # Raises FileNotFoundError up front
+        self.bytes_read = 0
+        self.rows_loaded = 0
+        self.rows_skipped = 0
+
+    def __iter__(self):
+        with open(self.file_path, 'r', newline='') as file:
+            reader = csv.reader(iter(file.readline, ''))  # readline keeps file.tell() usable
+            next(reader, None)  # Skip header row
+            chunk = []
+            start = time.perf_counter()
             for row in reader:
-                course_id = row[0]
-                course_name = row[1]
-                prerequisites = [prereq for prereq in row[2:] if prereq]
-                course = Course(course_id, course_name, prerequisites)
-                bst.insert(course)
+                if not row:
+                    continue  # Blank line
+                if len(row) < 2 or not row[0].strip() or not row[1].strip():
+                    self.rows_skipped += 1
+                    continue
+                chunk.append(course_from_row(row))
+                if len(chunk) >= self.chunk_size:
+                    self.rows_loaded += len(chunk)
+                    self.bytes_read = file.tell()
+                    if metrics.enabled:
+                        metrics.record("csv_parse_chunk", start)
+                        metrics.count("csv_rows_parsed", len(chunk))
+                    yield chunk
+                    chunk = []
+                    start = time.perf_counter()
+            self.rows_loaded += len(chunk)
+            self.bytes_read = self.total_bytes
+            if metrics.enabled:
+                metrics.record("csv_parse_chunk", start)
+                metrics.count("csv_rows_parsed", len(chunk))
+                metrics.count("csv_rows_skipped", self.rows_skipped)
+            if chunk:
+                yield chunk
+
+    def percent_complete(self):
+        return 100 * self.bytes_read // self.total_bytes if self.total_bytes else 100
+
+# Binary catalog snapshots: magic, source CSV size / mtime / SHA-256, then the counts of
+# courses, strings, prerequisite edges and string-blob bytes. Arrays use native byte order,
+# since a snapshot is a local startup cache rather than an exchange format.
+SNAPSHOT_MAGIC = b"CPSNAP01"
+SNAPSHOT_HEADER = struct.Struct("=8sQq32sIIIQ")
+SNAPSHOT_SUFFIX = ".snapshot"
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for block in iter(lambda: file.read(1 << 20), b''):
+            digest.update(block)
+    return digest.digest()
+
+# Memory-mapped view of a catalog snapshot. Opening one only reads the header, and pages
+# are faulted in as courses are touched. After the header come the string offsets (uint64),
+# the course ID and name string numbers, the prerequisite offsets and targets (uint32) and
+# the UTF-8 string blob. Each distinct string is stored once and courses are sorted by
+# course_id, so search() is a binary search straight over the mapped file.
+class CatalogSnapshot:
+    def __init__(self, path):
+        with open(path, 'rb') as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._mmap) < SNAPSHOT_HEADER.size:
+            self._mmap.close()
+            raise ValueError(f"{path} is not a valid catalog snapshot")
+        (magic, self.source_size, self.source_mtime_ns, self.source_sha256,
+         self.course_count, string_count, edge_count, blob_size) = SNAPSHOT_HEADER.unpack_from(self._mmap, 0)
+        expected_size = (SNAPSHOT_HEADER.size + 8 * (string_count + 1) + 4 * (3 * self.course_count + 1)
+                         + 4 * edge_count + blob_size)
+        if magic != SNAPSHOT_MAGIC or len(self._mmap) != expected_size:
+            self._mmap.close()
+            raise ValueError(f"{path} is not a valid catalog snapshot")
+        self._view = memoryview(self._mmap)
+        self._position = SNAPSHOT_HEADER.size
+        self._string_offsets = self._section(string_count + 1, 'Q')
+        self._course_ids = self._section(self.course_count, 'I')
+        self._course_names = self._section(self.course_count, 'I')
+        self._prereq_offsets = self._section(self.course_count + 1, 'I')
+        self._prereq_targets = self._section(edge_count, 'I')
+        self._blob = self._section(blob_size, 'B')
+
+    def _section(self, count, fmt):
+        size = count * struct.calcsize(fmt)
+        section = self._view[self._position:self._position + size].cast(fmt)
+        self._position += size
+        return section
+
+    def __len__(self):
+        return self.course_count
+
+    def _string(self, number):
+        return str(self._blob[self._string_offsets[number]:self._string_offsets[number + 1]], 'utf-8')
+
+    def course_id(self, position):
+        return self._string(self._course_ids[position])
+
+    # (course_id, course_name, prerequisites) for the course at a sorted position. IDs are
+    # interned, as when parsing the CSV, so a tree loaded from here shares one string per ID.
+    def row(self, position):
+        first, last = self._prereq_offsets[position], self._prereq_offsets[position + 1]
+        prerequisites = [sys.intern(self._string(target)) for target in self._prereq_targets[first:last]]
+        return sys.intern(self.course_id(position)), self._string(self._course_names[position]), prerequisites
+
+    def rows(self):
+        for position in range(self.course_count):
+            yield self.row(position)
+
+    def search(self, course_id):
+        low, high = 0, self.course_count
+        while low < high:
+            mid = (low + high) // 2
+            if self.course_id(mid) < course_id:
+                low = mid + 1
+            else:
+                high = mid
+        if low < self.course_count and self.course_id(low) == course_id:
+            return self.row(low)
+        return None
+
+    # Still valid if the source CSV has the same size and mtime, or the same content hash
+    # when only its mtime moved (e.g. the file was touched or copied)
+    def is_current(self, source_path):
+        stat = os.stat(source_path)
+        if stat.st_size != self.source_size:
+            return False
+        if stat.st_mtime_ns == self.source_mtime_ns:
+            return True
+        return file_sha256(source_path) == self.source_sha256
+
+    def close(self):
+        for section in (self._string_offsets, self._course_ids, self._course_names,
+                        self._prereq_offsets, self._prereq_targets, self._blob, self._view):
+            section.release()
+        self._mmap.close()
+
+    # Write (course_id, course_name, prerequisites) rows loaded from source_path to path
+    @staticmethod
+    def write(path, rows, source_path):
+        rows = sorted(rows, key=lambda row: row[0])
+        strings = {}  # string -> string number, in first-seen order
+        course_ids = array('I', (strings.setdefault(row[0], len(strings)) for row in rows))
+        course_names = array('I', (strings.setdefault(row[1], len(strings)) for row in rows))
+        prereq_offsets = array('I', [0])
+        prereq_targets = array('I')
+        for _, _, prerequisites in rows:
+            prereq_targets.extend(strings.setdefault(prereq, len(strings)) for prereq in prerequisites)
+            prereq_offsets.append(len(prereq_targets))
+        encoded = [text.encode('utf-8') for text in strings]
+        string_offsets = array('Q', [0])
+        for text in encoded:
+            string_offsets.append(string_offsets[-1] + len(text))
+        blob = b''.join(encoded)
+
+        stat = os.stat(source_path)
+        header = SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, stat.st_size, stat.st_mtime_ns, file_sha256(source_path),
+                                      len(rows), len(strings), len(prereq_targets), len(blob))
+        temp_path = path + ".tmp"
+        with open(temp_path, 'wb') as file:
+            file.write(header)
+            for section in (string_offsets, course_ids, course_names, prereq_offsets, prereq_targets):
+                section.tofile(file)
+            file.write(blob)
+        os.replace(temp_path, path)  # Readers never see a half-written snapshot
+
+# Open the snapshot at snapshot_path if it still matches source_path, otherwise None
+def open_current_snapshot(snapshot_path, source_path):
+    try:
+        snapshot = CatalogSnapshot(snapshot_path)
+    except (OSError, ValueError):
+        return None
+    try:
+        if snapshot.is_current(source_path):
+            return snapshot
+    except OSError:
+        pass  # Source CSV is gone; let the normal load report it
+    snapshot.close()
+    return None
+
+# Department prefix of a course ID (its leading letters, upper-cased): "CSCI300" -> "CSCI".
+# Courses are sharded by it, so every course of a department lives in the same shard.
+DEPARTMENT_PATTERN = re.compile(r"[A-Za-z]*")
+
+def department_of(course_id):
+    return DEPARTMENT_PATTERN.match(course_id).group().upper()
+
+# The course CSVs in a folder of campus catalogs, in name order
+def campus_catalog_files(folder):
+    return sorted(os.path.join(folder, name) for name in os.listdir(folder) if name.lower().endswith(".csv"))
+
+# Read for ShardedCatalog.load by the shard workers: one campus catalog (from its snapshot when current,
+# otherwise parsing the CSV and writing a fresh snapshot) and return its rows grouped by
+# department, each group in course_id order. Rows are plain tuples, which are much cheaper
+# to pickle than Course objects when they are sent to another worker.
+def read_campus_catalog(file_path, use_snapshot=True):
+    snapshot_path = file_path + SNAPSHOT_SUFFIX
+    snapshot = open_current_snapshot(snapshot_path, file_path) if use_snapshot else None
+    if snapshot:
+        rows = list(snapshot.rows())
+        snapshot.close()
+    else:
+        rows = [(course.course_id, course.course_name, course.prerequisites) for chunk in CourseCsvStream(file_path) for course in chunk]
+        if use_snapshot:
+            try:
+                CatalogSnapshot.write(snapshot_path, rows, file_path)
+            except OSError:
+                pass  # The next load just parses the CSV again
+    shards = {}
+    for row in rows:
+        shards.setdefault(department_of(row[0]), []).append(row)
+    for shard_rows in shards.values():
+        shard_rows.sort(key=itemgetter(0))
+    return shards
+
+# (course_id, course_name, prerequisites) of a course, the form courses cross processes in
+course_row = attrgetter("course_id", "course_name", "prerequisites")
+
+# Rows in course_id order, keeping only the first row of each repeated ID
+def first_rows(rows):
+    previous_id = None
+    for row in rows:
+        if row[0] != previous_id:
+            previous_id = row[0]
+            yield row
+
+# The department shards held by one worker process (or by the main process for a single
+# worker), each a balanced BinarySearchTree. Every query is answered over all of the
+# group's shards at once and returns plain rows, so a ShardedCatalog needs one round
+# trip per group rather than per shard. send() and receive() mirror ShardWorker's pipe.
+class ShardGroup:
+    def __init__(self):
+        self.shards = {}  # department prefix -> BinarySearchTree
+        self.pending = {}  # department prefix -> [(file number, sorted rows)] read but not yet loaded
+        self.entries = {}  # department prefix -> its course IDs listed as prerequisites by other shards
+        self.replies = deque()
+
+    def send(self, method, *args):
+        try:
+            self.replies.append((True, getattr(self, method)(*args)))
+        except Exception as e:
+            self.replies.append((False, e))
+
+    def receive(self):
+        ok, result = self.replies.popleft()
+        if not ok:
+            raise result
+        return result
+
+    def call(self, method, *args):
+        self.send(method, *args)
+        return self.receive()
+
+    def close(self):
+        self.shards.clear()
+
+    # Read (file number, path) campus catalogs and keep their rows here until load(). Only
+    # the number of rows read for each department goes back to ShardedCatalog.load, which
+    # decides where each department's shard lives.
+    def read_catalogs(self, files, use_snapshot):
+        self.pending = {}
+        for number, file_path in files:
+            for department, rows in read_campus_catalog(file_path, use_snapshot).items():
+                self.pending.setdefault(department, []).append((number, rows))
+        return {department: sum(len(rows) for _, rows in runs) for department, runs in self.pending.items()}
+
+    # Hand over the pending rows of departments whose shard another group holds (owners maps
+    # department -> group number, this group being number). Each group's rows are pickled
+    # once, here, and passed on as bytes that only the receiving group unpickles.
+    def route(self, owners, number):
+        outgoing = {}
+        for department in list(self.pending):
+            owner = owners[department]
+            if owner != number:
+                outgoing.setdefault(owner, {})[department] = self.pending.pop(department)
+        return {owner: pickle.dumps(departments, pickle.HIGHEST_PROTOCOL) for owner, departments in outgoing.items()}
+
+    # Load or reload departments (every department this group holds) from the pending rows
+    # and those routed here by other groups, with earlier files first. A new shard is built
+    # in one bulk load; an existing one is reloaded, applying only what changed, and emptied
+    # when no file lists the department any more.
+    # Returns department -> (added, updated, removed, courses now in the shard).
+    def load(self, departments, routed):
+        pending, self.pending = self.pending, {}
+        for payload in routed:
+            for department, runs in pickle.loads(payload).items():
+                pending.setdefault(department, []).extend(runs)
+        results = {}
+        for department in departments:
+            runs = [rows for _, rows in sorted(pending.get(department, []), key=itemgetter(0))]
+            rows = runs[0] if len(runs) == 1 else heapq.merge(*runs, key=itemgetter(0))  # Stable: earlier files first
+            shard = self.shards.get(department)
+            if shard is None:
+                shard = self.shards[department] = BinarySearchTree(balanced=True)
+                shard.bulk_load([course_from_tuple(row) for row in first_rows(rows)])
+                results[department] = (len(shard.prerequisite_index), 0, 0, len(shard.prerequisite_index))
+            else:
+                changes = shard.reload(course_from_tuple(row) for row in rows)
+                results[department] = (len(changes.inserted), len(changes.updated), len(changes.deleted), len(shard.prerequisite_index))
+            if shard.root is None:
+                del self.shards[department]
+        return results
+
+    def search(self, course_id):
+        shard = self.shards.get(department_of(course_id))
+        course = shard.search(course_id) if shard else None
+        return course_row(course) if course else None
+
+    # Up to count rows with lo <= course_id < hi (hi None for no bound), resuming after the
+    # course_id `after` when it is given
+    def range_chunk(self, lo, hi, after, count):
+        courses = heapq.merge(*(shard.range(lo if after is None else after, hi) for shard in self.shards.values()), key=course_id_of)
+        if after is not None:
+            courses = (course for course in courses if course.course_id != after)
+        return [course_row(course) for course in islice(courses, count)]
+
+    # Up to count rows in prerequisite-count order, resuming after `after`, the
+    # (prerequisite count, course_id) of the last row already returned
+    def prerequisite_chunk(self, most_first, after, count):
+        streams = [shard.courses_by_prerequisites(most_first, after) for shard in self.shards.values()]
+        sign = -1 if most_first else 1
+        courses = heapq.merge(*streams, key=lambda course: (sign * len(course.prerequisites), course.course_id))
+        return [course_row(course) for course in islice(courses, count)]
+
+    def keyword_search(self, keyword, limit):
+        courses = heapq.merge(*(shard.keyword_search(keyword, limit) for shard in self.shards.values()), key=course_id_of)
+        return [course_row(course) for course in islice(courses, limit)]
+
+    def fuzzy_ranked(self, query, k):
+        ranked = heapq.nsmallest(k, (match for shard in self.shards.values() for match in shard.fuzzy_ranked(query, k)), key=itemgetter(0))
+        return [(key, course_row(course)) for key, course in ranked]
+
+    # Rows of the courses listing any of course_ids as a prerequisite
+    def dependents_of(self, course_ids):
+        return [course_row(course) for shard in self.shards.values() for course_id in course_ids for course in shard.dependents(course_id)]
+
+    # First half of ShardedCatalog.prerequisite_problems: check each shard's prerequisites
+    # against this group's shards. Returns (prerequisite -> dependents for prerequisites
+    # missing from a department held here, the same for departments held elsewhere, cycles
+    # inside one shard).
+    def prerequisite_problems(self):
+        missing, foreign, cycles = {}, {}, []
+        self.entries = {department: set() for department in self.shards}
+        graphs = {department: shard.prerequisite_graph() for department, shard in self.shards.items()}
+        for graph in graphs.values():
+            cycles.extend(graph.find_cycles())
+            for prereq, dependents in graph.missing_prerequisites().items():
+                department = department_of(prereq)
+                if department not in graphs:
+                    foreign.setdefault(prereq, []).extend(dependents)
+                elif not graphs[department].is_in_catalog(prereq):
+                    missing.setdefault(prereq, []).extend(dependents)
+                else:
+                    self.entries[department].add(prereq)
+        return missing, foreign, cycles
+
+    # Second half: referenced are this group's course IDs that other groups list as
+    # prerequisites. Returns (those not in the catalog, each shard's boundary rows for
+    # finding cycles that span shards).
+    def prerequisite_boundary(self, referenced):
+        absent = []
+        for prereq in referenced:
+            department = department_of(prereq)
+            if department in self.shards and self.shards[department].prerequisite_graph().is_in_catalog(prereq):
+                self.entries[department].add(prereq)
+            else:
+                absent.append(prereq)
+        rows = []
+        for department, shard in self.shards.items():
+            if self.entries[department]:
+                rows.extend(shard.prerequisite_graph().boundary(self.entries[department]))
+        return absent, rows
+
+# Worker process side of a ShardWorker: answer (method, args) requests with a ShardGroup
+# until the pipe closes or None arrives
+def serve_shard_group(connection):
+    group = ShardGroup()
+    while True:
+        try:
+            request = connection.recv()
+        except EOFError:
+            return
+        if request is None:
+            return
+        method, args = request
+        group.send(method, *args)
+        connection.send(group.replies.popleft())
+
+# A ShardGroup kept in its own process, so its shards are built and queried in parallel
+# with the other groups' and never have to be copied back to the main process
+class ShardWorker:
+    def __init__(self):
+        self.connection, child = multiprocessing.Pipe()
+        self.process = multiprocessing.Process(target=serve_shard_group, args=(child,), daemon=True)
+        self.process.start()
+        child.close()
+
+    def send(self, method, *args):
+        self.connection.send((method, args))
+
+    def receive(self):
+        ok, result = self.connection.recv()
+        if not ok:
+            raise result
+        return result
+
+    def call(self, method, *args):
+        self.send(method, *args)
+        return self.receive()
+
+    def close(self):
+        try:
+            self.connection.send(None)
+        except OSError:
+            pass  # Worker already gone
+        self.process.join(timeout=5)
+        self.connection.close()
+
+def close_shard_groups(groups):
+    for group in groups:
+        group.close()
+
+# A catalog split into one balanced BinarySearchTree per department, loaded from many
+# campus CSVs at once. The department shards live in worker processes (ShardWorker), one
+# group of departments per worker: the workers read the files in parallel and keep what
+# they read, only the rows of departments owned by another worker are passed on to it, and
+# every worker builds its shards in parallel.
+# Queries are federated: a lookup goes to the course's worker, searches are sent to every
+# worker at once and the results merged, and ordered views merge the workers' sorted
+# streams a chunk at a time. Prerequisites are resolved across the whole federation, so a
+# CSCI course requiring MATH201 is satisfied by the MATH shard. With one worker the shards
+# stay in this process. The read methods match BinarySearchTree, so the menu, batch mode
+# and MongoDB sync work on either. Call close() (or drop the catalog) to stop the workers.
+class ShardedCatalog:
+    balanced = True
+    loaded = True  # Shards are always fully built by load()
+
+    def __init__(self):
+        self.groups = []  # ShardWorker, or a single in-process ShardGroup
+        self.owners = {}  # department prefix -> index of the group holding its shard
+        self.sizes = {}   # department prefix -> courses in its shard
+        self._prerequisite_graph = None
+        self.closure_cache = PrerequisiteClosureCache(self)
+        self._finalizer = weakref.finalize(self, close_shard_groups, self.groups)
+
+    def wait_until_loaded(self):
+        pass
+
+    def close(self):
+        self._finalizer()
+
+    @classmethod
+    def from_folder(cls, folder, workers=None, use_snapshot=True):
+        catalog = cls()
+        catalog.load(campus_catalog_files(folder), workers, use_snapshot)
+        return catalog
+
+    # Send one request per (group, args) pair, then read the replies in the same order, so
+    # the groups work in parallel. Every reply is read before the first error is raised.
+    def _gather(self, method, requests):
+        requests = list(requests)
+        for group, args in requests:
+            group.send(method, *args)
+        results, error = [], None
+        for group, _ in requests:
+            try:
+                results.append(group.receive())
+            except Exception as e:
+                results.append(None)
+                error = error or e
+        if error:
+            raise error
+        return results
+
+    def _broadcast(self, method, *args):
+        return self._gather(method, ((group, args) for group in self.groups))
+
+    # Load (or reload) the catalog from campus CSV files. A course ID listed by several
+    # campuses keeps the first file's copy; reloading applies only what changed in each
+    # shard (see BinarySearchTree.reload). The first load starts the workers (one per file
+    # up to workers, default one per CPU); later loads reuse them, and each department
+    # stays with its worker. Returns department -> (added, updated, removed).
+    @timed("sharded_load")
+    def load(self, file_paths, workers=None, use_snapshot=True):
+        file_paths = list(file_paths)
+        if not self.groups:
+            count = min(workers or os.cpu_count() or 1, len(file_paths))
+            self.groups.extend(ShardWorker() for _ in range(count)) if count > 1 else self.groups.append(ShardGroup())
+        count = len(self.groups)
+        files = list(enumerate(file_paths))
+        read = self._gather("read_catalogs", ((group, (files[index::count], use_snapshot)) for index, group in enumerate(self.groups)))
+
+        # New departments go, largest first, to the worker that read most of their rows so
+        # fewer rows move between workers, unless that worker already holds its share of the
+        # catalog; then to the least loaded worker
+        totals = {}
+        for counts in read:
+            for department, rows in counts.items():
+                totals[department] = totals.get(department, 0) + rows
+        loads = [0] * count
+        for department, owner in self.owners.items():
+            loads[owner] += self.sizes[department]
+        share = (sum(loads) + sum(totals[department] for department in totals.keys() - self.owners.keys())) / count
+        for department in sorted(totals.keys() - self.owners.keys(), key=lambda department: -totals[department]):
+            owner = max(range(count), key=lambda index: read[index].get(department, 0))
+            if loads[owner] + totals[department] > share:
+                owner = loads.index(min(loads))
+            self.owners[department] = owner
+            loads[owner] += totals[department]
+
+        # Only the rows of departments held by another worker are passed on, as bytes
+        routes = self._gather("route", ((group, (self.owners, index)) for index, group in enumerate(self.groups)))
+        requests = [(group, ([department for department, owner in self.owners.items() if owner == index],
+                             [outgoing[index] for outgoing in routes if index in outgoing]))
+                    for index, group in enumerate(self.groups)]
+        changes = {}
+        for results in self._gather("load", requests):
+            for department, (added, updated, removed, size) in results.items():
+                changes[department] = (added, updated, removed)
+                self.sizes[department] = size
+                if not size:
+                    del self.sizes[department], self.owners[department]
+        self._prerequisite_graph = None
+        self.closure_cache.clear()
+        return dict(sorted(changes.items()))
+
+    def __len__(self):
+        return sum(self.sizes.values())
+
+    # Truthy once any shard holds a course, like BinarySearchTree.root
+    @property
+    def root(self):
+        return bool(self.sizes) or None
+
+    def search(self, course_id):
+        owner = self.owners.get(department_of(course_id))
+        row = self.groups[owner].call("search", course_id) if owner is not None else None
+        return Course(*row) if row else None
+
+    def __iter__(self):
+        return self.courses_from()
+
+    def courses_from(self, course_id=None):
+        return self.range(course_id)
+
+    def _range_stream(self, group, lo, hi):
+        after = None
+        while True:
+            rows = group.call("range_chunk", lo, hi, after, SHARD_CHUNK_SIZE)
+            yield from (Course(*row) for row in rows)
+            if len(rows) < SHARD_CHUNK_SIZE:
+                return
+            after = rows[-1][0]
+
+    def range(self, lo=None, hi=None):
+        return heapq.merge(*(self._range_stream(group, lo, hi) for group in self.groups), key=course_id_of)
+
+    def prefix(self, prefix):
+        return self.range(*prefix_bounds(prefix))
+
+    # Compiled over every shard, so prerequisites in other departments are found
+    def prerequisite_graph(self):
+        if self._prerequisite_graph is None:
+            self._prerequisite_graph = PrerequisiteGraph(self)
+        return self._prerequisite_graph
+
+    # Same result as BinarySearchTree.prerequisite_problems, without pulling the catalog into
+    # this process: each shard checks its own prerequisites, then only the prerequisite IDs
+    # a worker cannot resolve and the courses that could lie on a cycle spanning shards
+    # (PrerequisiteGraph.boundary) are sent here.
+    def prerequisite_problems(self):
+        missing, foreign, cycles = {}, {}, []
+        referenced = [set() for _ in self.groups]
+        for group_missing, group_foreign, group_cycles in self._broadcast("prerequisite_problems"):
+            for prereq, dependents in group_missing.items():
+                missing.setdefault(prereq, []).extend(dependents)
+            for prereq, dependents in group_foreign.items():
+                owner = self.owners.get(department_of(prereq))
+                if owner is None:
+                    missing.setdefault(prereq, []).extend(dependents)
+                else:
+                    referenced[owner].add(prereq)
+                    foreign.setdefault(prereq, []).extend(dependents)
+            cycles.extend(group_cycles)
+        boundary = []
+        for absent, rows in self._gather("prerequisite_boundary", ((group, (sorted(referenced[index]),)) for index, group in enumerate(self.groups))):
+            for prereq in absent:
+                missing.setdefault(prereq, []).extend(foreign[prereq])
+            boundary.extend(rows)
+        # A cycle found in one shard may be part of a larger one through other shards
+        spanning = PrerequisiteGraph(Course(course_id, "", prerequisites) for course_id, prerequisites in boundary).find_cycles()
+        on_spanning = {course_id for cycle in spanning for course_id in cycle}
+        cycles = spanning + [cycle for cycle in cycles if on_spanning.isdisjoint(cycle)]
+        return {prereq: sorted(dependents) if len(dependents) > 1 else dependents for prereq, dependents in sorted(missing.items())}, sorted(cycles)
+
+    def _prerequisite_stream(self, group, most_first, after):
+        while True:
+            rows = group.call("prerequisite_chunk", most_first, after, SHARD_CHUNK_SIZE)
+            yield from (Course(*row) for row in rows)
+            if len(rows) < SHARD_CHUNK_SIZE:
+                return
+            after = (len(rows[-1][2]), rows[-1][0])
+
+    def courses_by_prerequisites(self, most_first=False, after=None):
+        sign = -1 if most_first else 1
+        streams = (self._prerequisite_stream(group, most_first, after) for group in self.groups)
+        return heapq.merge(*streams, key=lambda course: (sign * len(course.prerequisites), course.course_id))
+
+    def courses_by_depth(self, deepest_first=False):
+        return self.prerequisite_graph().courses_by_depth(deepest_first)
+
+    # Dependents can sit in any department's shard
+    def dependents(self, course_id):
+        return sorted((Course(*row) for rows in self._broadcast("dependents_of", [course_id]) for row in rows), key=course_id_of)
+
+    # Same result as BinarySearchTree.downstream, walked a level at a time so each level
+    # of the prerequisite chains is one round trip to every worker
+    def downstream(self, course_id):
+        seen = {course_id}
+        found = []
+        level = [course_id]
+        while level:
+            next_level = []
+            for rows in self._broadcast("dependents_of", level):
+                for row in rows:
+                    if row[0] not in seen:
+                        seen.add(row[0])
+                        found.append(Course(*row))
+                        next_level.append(row[0])
+            level = next_level
+        found.sort(key=course_id_of)
+        return found
+
+    def removal_impact(self, course_ids):
+        return BinarySearchTree.removal_impact(self, course_ids)
+
+    def all_prerequisites(self, course_id):
+        return BinarySearchTree.all_prerequisites(self, course_id)
+
+    def degree_planner(self, max_per_term=COURSES_PER_TERM):
+        return DegreePlanner(self.prerequisite_graph(), max_per_term)
+
+    @timed("keyword_search")
+    def keyword_search(self, keyword, limit=None):
+        rows = heapq.merge(*self._broadcast("keyword_search", keyword, limit), key=itemgetter(0))
+        return [Course(*row) for row in islice(rows, limit)]
+
+    # Each worker ranks its own best matches; the overall best k are merged by the same key
+    @timed("fuzzy_search")
+    def fuzzy_search(self, query, k=FUZZY_RESULTS):
+        ranked = heapq.merge(*self._broadcast("fuzzy_ranked", query, k), key=itemgetter(0))
+        return [Course(*row) for _, row in islice(ranked, k)]
+
+    # node is accepted for compatibility with BinarySearchTree; the whole catalog is returned
+    def collect_courses(self, node=None, courses=None):
+        courses = [] if courses is None else courses
+        courses.extend(self)
+        return courses
+
+    def print_courses(self, node=None):
+        for course in self:
+            print(f"{course.course_id}, {course.course_name}")
+
+    def sort_by_prerequisites(self):
+        BinarySearchTree.sort_by_prerequisites(self)
+
+# Load courses from a CSV file into a BST, calling progress(stream) after every chunk.
+# With a snapshot_path, a snapshot that still matches the CSV is loaded instead of parsing
+# the file, and a fresh snapshot is written after every full parse.
+def load_courses(file_path, bst, chunk_size=DEFAULT_CHUNK_SIZE, progress=None, snapshot_path=None):
+    try:
+        snapshot = open_current_snapshot(snapshot_path, file_path) if snapshot_path else None
+        if snapshot and bst.root is None:
+            # Prerequisite warnings were shown when this snapshot was written from the CSV
+            bst.load_snapshot(snapshot)
+            print("\n Courses loaded successfully into BST from snapshot.")
+            print(" Course lookups work now; the rest of the catalog is indexed in the background.\n")
+            return
+        if snapshot:
+            load_into(bst, (Course(*row) for row in snapshot.rows()))
+            snapshot.close()
+            print("\n Courses loaded successfully into BST from snapshot.\n")
+            print_prerequisite_warnings(bst)
+            return
+        stream = CourseCsvStream(file_path, chunk_size)
+        courses = []
+        for chunk in stream:
+            courses.extend(chunk)
+            if progress:
+                progress(stream)
+        load_into(bst, courses)
         print("\n Courses loaded successfully into BST from CSV.\n")
+        if stream.rows_skipped:
+            print(f" Skipped {stream.rows_skipped} row(s) missing a course ID or name.")
+        if snapshot_path:
+            try:
+                CatalogSnapshot.write(snapshot_path, ((course.course_id, course.course_name, course.prerequisites) for course in courses), file_path)
+            except OSError as e:
+                print(f" Warning: could not write snapshot {snapshot_path}: {e}")
+        print_prerequisite_warnings(bst)
+    except FileNotFoundError:
+        print("\n Error: File not found.\n")
+
+# Fill an empty tree in one bulk load; a tree that already holds a catalog is reloaded,
+# applying only the courses that were added, changed or removed
+def load_into(bst, courses):
+    if bst.root is None:
+        bst.bulk_load(courses)
+        return
+    changes = bst.reload(courses)
+    print(f"\n Catalog reloaded: {changes.summary()}.")
+
+# Load (or reload) every campus CSV in folder into a sharded catalog
+def load_campus_catalogs(folder, catalog):
+    try:
+        file_paths = campus_catalog_files(folder)
+    except OSError:
+        print("\n Error: Folder not found.\n")
+        return
+    if not file_paths:
+        print(f"\n No course CSV files found in {folder}.\n")
+        return
+    try:
+        changes = catalog.load(file_paths)
     except FileNotFoundError:
         print("\n Error: File not found.\n")
+        return
+    added, updated, removed = (sum(counts) for counts in zip((0, 0, 0), *changes.values()))
+    print(f"\n Loaded {len(file_paths)} campus catalogs into {len(catalog.sizes)} department shards "
+          f"({len(catalog)} courses: {added} added, {updated} updated, {removed} removed).\n")
+    print_prerequisite_warnings(catalog)
+
+# Progress callback for load_courses that keeps updating a single console line
+def print_load_progress(stream):
+    print(f"\r Loading courses... {stream.percent_complete()}% ({stream.rows_loaded} rows)", end="", flush=True)
+
+# Report prerequisite cycles and prerequisites missing from the loaded catalog
+def print_prerequisite_warnings(bst):
+    missing, cycles = bst.prerequisite_problems()
+    for prereq, courses in missing.items():
+        print(f" Warning: {prereq} is listed as a prerequisite of {', '.join(courses)} but is not in the catalog.")
+    for cycle in cycles:
+        print(f" Warning: prerequisite cycle between {', '.join(cycle)}.")
+
+# Print every course that must be taken before course_id, in study order
+def print_prerequisite_chain(bst, course_id):
+    graph = bst.prerequisite_graph()
+    if not graph.is_in_catalog(course_id):
+        print("\n Course not found in BST.\n")
+        return
+    chain = bst.all_prerequisites(course_id)
+    if not chain:
+        print(f"\n {course_id} has no prerequisites.\n")
+        return
+    print(f"\n Take these courses before {course_id}, in order:\n")
+    for prereq in chain:
+        print(f"{prereq}" if graph.is_in_catalog(prereq) else f"{prereq} (not in catalog)")
+    print()
+
+# Print a term-by-term plan for the target courses, given the courses already completed
+def print_degree_plan(bst, targets, completed, max_per_term=COURSES_PER_TERM):
+    plan = bst.degree_planner(max_per_term).plan(targets, completed)
+    print("\n Degree Plan:\n")
+    for line in format_degree_plan(plan) or ["Nothing left to take."]:
+        print(line)
+    print()
+
+# Print what the given courses unlock, i.e. what removing them would block
+def print_removal_impact(bst, course_ids):
+    lines = format_removal_impact(bst.removal_impact(course_ids))
+    print("\n Impact of Removing " + ", ".join(course_ids) + ":\n")
+    for line in lines:
+        print(line)
+    print()
+
+# Print the courses whose ID starts with prefix, walking only that part of the tree
+def print_courses_with_prefix(bst, prefix):
+    found = False
+    for course in bst.prefix(prefix):
+        if not found:
+            print(f"\n Courses starting with {prefix}:\n")
+            found = True
+        print(f"{course.course_id}, {course.course_name}")
+    if found:
+        print()
+    else:
+        print(f"\n No courses found starting with {prefix}.\n")
 
 # Function to perform an interactive search
 def interactive_search(bst):
     print("\nInteractive Search:\n")
     keyword = input("Enter part of a course ID or name to search: ").lower()
     print()
-    courses = bst.collect_courses(bst.root, [])
-    results = [course for course in courses if keyword in course.course_id.lower() or keyword in course.course_name.lower()]
+    results = bst.keyword_search(keyword)
 
     if results:
         print("Search Results:")
         for course in results:
             print(f"{course.course_id}, {course.course_name} - Prerequisites: {', '.join(course.prerequisites) if course.prerequisites else 'None'}")
     else:
-        print("No matching courses found.")
+        suggestions = bst.fuzzy_search(keyword)
+        if suggestions:
+            print("No exact matches. Closest courses:")
+            for course in suggestions:
+                print(f"{course.course_id}, {course.course_name} - Prerequisites: {', '.join(course.prerequisites) if course.prerequisites else 'None'}")
+        else:
+            print("No matching courses found.")
     print()  # Add a blank line for readability
 
-# Load courses from MongoDB
-def load_courses_from_mongodb():
+# Prerequisite IDs stored on a MongoDB course document (prerequisite_1, prerequisite_2, ...)
+def prerequisites_from_document(document):
+    prerequisites = []
+    number = 1
+    while f"prerequisite_{number}" in document:
+        if document[f"prerequisite_{number}"]:
+            prerequisites.append(document[f"prerequisite_{number}"])
+        number += 1
+    return prerequisites
+
+# MongoDB document for a course, in the same shape mongoimport gives the CSV
+def course_to_document(course):
+    document = {"course_id": course.course_id, "course_name": course.course_name}
+    for number, prereq in enumerate(course.prerequisites, start=1):
+        document[f"prerequisite_{number}"] = prereq
+    return document
+
+# Read-through cache sitting between the MongoDB search functions and the courses collection.
+# Entries are evicted least-recently-used past maxsize and expire ttl seconds after they were
+# fetched. "Not found" results are cached as None so repeated bad IDs stay local too.
+class CourseLookupCache:
+    def __init__(self, maxsize=COURSE_CACHE_SIZE, ttl=COURSE_CACHE_TTL, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        self.entries = OrderedDict()  # course ID -> (expires at, document or None)
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    # Cached documents for course_ids, plus the IDs that have to be fetched
+    def _lookup(self, course_ids):
+        now = self.clock()
+        found = {}
+        missing = []
+        with self.lock:
+            for course_id in course_ids:
+                entry = self.entries.get(course_id)
+                if entry is not None and entry[0] > now:
+                    self.hits += 1
+                    self.entries.move_to_end(course_id)
+                    found[course_id] = entry[1]
+                    continue
+                if entry is not None:
+                    del self.entries[course_id]
+                    self.expirations += 1
+                self.misses += 1
+                missing.append(course_id)
+        return found, missing
+
+    def _store(self, documents):
+        expires_at = self.clock() + self.ttl
+        with self.lock:
+            for course_id, document in documents.items():
+                self.entries[course_id] = (expires_at, document)
+                self.entries.move_to_end(course_id)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    # Document for course_id (or None), calling load(course_id) only on a miss
+    def get(self, course_id, load):
+        found, missing = self._lookup([course_id])
+        if missing:
+            found[course_id] = load(course_id)
+            self._store(found)
+        return found[course_id]
+
+    # {course_id: document} for the IDs that exist, calling load_many(missing_ids) once for
+    # every ID that is not cached; load_many returns {course_id: document} for the IDs it found
+    def get_many(self, course_ids, load_many):
+        found, missing = self._lookup(course_ids)
+        if missing:
+            fetched = load_many(missing)
+            fetched = {course_id: fetched.get(course_id) for course_id in missing}
+            self._store(fetched)
+            found.update(fetched)
+        return {course_id: document for course_id, document in found.items() if document is not None}
+
+    # Drop the given IDs, or everything when course_ids is None
+    def invalidate(self, course_ids=None):
+        with self.lock:
+            if course_ids is None:
+                self.entries.clear()
+                return
+            for course_id in course_ids:
+                self.entries.pop(course_id, None)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self.entries),
+            "maxsize": self.maxsize,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+course_lookup_cache = CourseLookupCache()
+
+# One course document through the read-through cache (None if it is not in MongoDB)
+def find_course_in_mongodb(course_id):
+    return course_lookup_cache.get(course_id, fetch_course_from_mongodb)
+
+@timed("mongo_find_one")
+def fetch_course_from_mongodb(course_id):
+    return get_courses_collection().find_one({"course_id": course_id}, COURSE_PROJECTION)
+
+# Look up many course IDs with one $in query per batch instead of one find_one per ID.
+# Returns {course_id: document} for the IDs that were found.
+# Lookups against the default collection go through the read-through cache.
+def find_courses_in_mongodb(course_ids, collection=None, batch_size=MONGO_BATCH_SIZE):
+    course_ids = list(dict.fromkeys(course_ids))  # Drop repeats, keep order
+    if collection is None:
+        return course_lookup_cache.get_many(course_ids, lambda missing: fetch_courses_from_mongodb(get_courses_collection(), missing, batch_size))
+    return fetch_courses_from_mongodb(collection, course_ids, batch_size)
+
+def fetch_courses_from_mongodb(collection, course_ids, batch_size):
+    found = {}
+    for start in range(0, len(course_ids), batch_size):
+        batch = course_ids[start:start + batch_size]
+        round_trip = time.perf_counter()
+        for document in collection.find({"course_id": {"$in": batch}}, COURSE_PROJECTION):
+            found.setdefault(document["course_id"], document)
+        if metrics.enabled:
+            metrics.record("mongo_find_batch", round_trip)
+    return found
+
+# Upsert every course in the BST into MongoDB with unordered, chunked bulk writes.
+# Documents are replaced whole so removed prerequisites do not linger.
+def sync_courses_to_mongodb(bst, collection=None, batch_size=MONGO_BATCH_SIZE):
+    collection = get_courses_collection() if collection is None else collection
+    collection.create_index("course_id")
+    totals = {"matched": 0, "upserted": 0}
+    batch = []
+    for course in bst:
+        batch.append(course)
+        if len(batch) >= batch_size:
+            write_course_batch(collection, batch, totals)
+            batch = []
+    if batch:
+        write_course_batch(collection, batch, totals)
+    return totals
+
+@timed("mongo_bulk_write")
+def write_course_batch(collection, courses, totals):
+    from pymongo import ReplaceOne
+    result = collection.bulk_write([ReplaceOne({"course_id": course.course_id}, course_to_document(course), upsert=True) for course in courses], ordered=False)
+    course_lookup_cache.invalidate(course.course_id for course in courses)
+    totals["matched"] += result.matched_count
+    totals["upserted"] += result.upserted_count
+
+# Stream course documents out of MongoDB with a projected cursor that fetches batch_size
+# documents per round-trip, so callers can show rows before the whole collection arrives
+def iter_courses_from_mongodb(collection=None, batch_size=MONGO_BATCH_SIZE):
+    collection = get_courses_collection() if collection is None else collection
+    yield from collection.find({}, COURSE_PROJECTION, batch_size=batch_size)
+
+# One display line for a MongoDB course document
+def format_course_document(document):
+    prerequisites = prerequisites_from_document(document)
+    return f"{document['course_id']}: {document['course_name']} - Prerequisites: {', '.join(prerequisites) if prerequisites else 'None'}"
+
+# Load courses from MongoDB, printing each course as its batch arrives
+def load_courses_from_mongodb(batch_size=MONGO_BATCH_SIZE):
     try:
-        courses = list(courses_collection.find())
-        if not courses:
+        count = 0
+        for course in iter_courses_from_mongodb(batch_size=batch_size):
+            if count == 0:
+                print("\n Courses loaded from MongoDB:\n")
+            print(format_course_document(course))
+            count += 1
+        if not count:
             print("\n No courses found in MongoDB. Ensure the data is uploaded.\n")
             return
-        print("\n Courses loaded from MongoDB:\n")
-        for course in courses:
-            prerequisites = [course.get(key, '') for key in ["prerequisite_1", "prerequisite_2", "prerequisite_3"] if course.get(key)]
-            prerequisites = ", ".join(prerequisites) if prerequisites else "None"
-            print(f"{course['course_id']}: {course['course_name']} - Prerequisites: {prerequisites}")
         print()
     except Exception as e:
         print(f" Error retrieving data from MongoDB: {e}")
@@ -148,9 +2577,9 @@ def load_courses_from_mongodb():
 # Search for a course in MongoDB
 def search_course_in_mongodb(course_id):
     try:
-        course = courses_collection.find_one({"course_id": course_id})
+        course = find_course_in_mongodb(course_id)
         if course:
-            prerequisites = [course.get(key, '') for key in ["prerequisite_1", "prerequisite_2", "prerequisite_3"] if course.get(key)]
+            prerequisites = prerequisites_from_document(course)
             prerequisites = ", ".join(prerequisites) if prerequisites else "None"
             print(f"\n Course Found: {course['course_id']} - {course['course_name']}")
             print(f" Prerequisites: {prerequisites}\n")
@@ -159,6 +2588,465 @@ def search_course_in_mongodb(course_id):
     except Exception as e:
         print(f" Error searching MongoDB: {e}")
 
+# Search for several courses in MongoDB with batched lookups
+def search_courses_in_mongodb(course_ids):
+    try:
+        found = find_courses_in_mongodb(course_ids)
+        print()
+        for course_id in course_ids:
+            course = found.get(course_id)
+            if course:
+                prerequisites = prerequisites_from_document(course)
+                print(f" {course['course_id']} - {course['course_name']} - Prerequisites: {', '.join(prerequisites) if prerequisites else 'None'}")
+            else:
+                print(f" {course_id} - not found in MongoDB")
+        print()
+    except Exception as e:
+        print(f" Error searching MongoDB: {e}")
+
+# Copy the loaded BST into MongoDB
+def upload_courses_to_mongodb(bst):
+    try:
+        totals = sync_courses_to_mongodb(bst)
+        print(f"\n Synced BST to MongoDB: {totals['upserted']} inserted, {totals['matched']} updated.\n")
+    except Exception as e:
+        print(f" Error writing to MongoDB: {e}")
+
+# Load a catalog without printing anything, for batch mode and its worker processes: from a
+# current snapshot when there is one, otherwise from the CSV (writing a fresh snapshot).
+# A folder of campus CSVs is loaded as a ShardedCatalog, one file after another.
+def open_catalog(file_path, use_snapshot=True):
+    if os.path.isdir(file_path):
+        return ShardedCatalog.from_folder(file_path, workers=1, use_snapshot=use_snapshot)
+    bst = BinarySearchTree(balanced=True)
+    snapshot_path = file_path + SNAPSHOT_SUFFIX
+    snapshot = open_current_snapshot(snapshot_path, file_path) if use_snapshot else None
+    if snapshot:
+        bst.load_snapshot(snapshot)  # Lookups are served from the snapshot while it loads
+        return bst
+    courses = [course for chunk in CourseCsvStream(file_path) for course in chunk]
+    bst.bulk_load(courses)
+    if use_snapshot:
+        try:
+            CatalogSnapshot.write(snapshot_path, ((course.course_id, course.course_name, course.prerequisites) for course in courses), file_path)
+        except OSError:
+            pass  # Batch answers do not depend on the snapshot
+    return bst
+
+def course_record(course):
+    return {"course_id": course.course_id, "course_name": course.course_name, "prerequisites": list(course.prerequisites)}
+
+# Answer one batch query: a course lookup when the query is a catalog course ID, otherwise a
+# keyword search, then fuzzy matches when the keyword search finds nothing. limit caps the
+# courses returned per query (None for all).
+def answer_query(bst, query, limit=None):
+    course = bst.search(query.upper())
+    if course:
+        return {"query": query, "match": "course", "courses": [course_record(course)]}
+    bst.wait_until_loaded()
+    match, courses = "keyword", bst.keyword_search(query, limit)
+    if not courses:
+        match, courses = "fuzzy", bst.fuzzy_search(query, limit or FUZZY_RESULTS)
+    if not courses:
+        match = "none"
+    return {"query": query, "match": match, "courses": [course_record(course) for course in courses[:limit]]}
+
+# Catalog used by each batch-query worker process, loaded once when the worker starts
+_worker_catalog = None
+_worker_limit = None
+
+def _start_query_worker(catalog_path, use_snapshot, limit):
+    global _worker_catalog, _worker_limit
+    _worker_catalog = open_catalog(catalog_path, use_snapshot)
+    _worker_limit = limit
+
+def _answer_in_worker(query):
+    return answer_query(_worker_catalog, query, _worker_limit)
+
+# Answers for every non-blank line of queries, in order. With workers > 1 the queries are
+# answered by a process pool, in blocks so a huge query file is never held in memory; the
+# parent writes the snapshot first so each worker maps it instead of parsing the CSV.
+def batch_answers(catalog_path, queries, workers=1, limit=None, use_snapshot=True):
+    queries = (line.strip() for line in queries if line.strip())
+    if workers <= 1:
+        bst = open_catalog(catalog_path, use_snapshot)
+        for query in queries:
+            yield answer_query(bst, query, limit)
+        return
+    # Fail here rather than in every worker's initializer (a BrokenProcessPool)
+    if not os.path.exists(catalog_path):
+        raise FileNotFoundError(f"Catalog not found: {catalog_path}")
+    if use_snapshot and not os.path.isdir(catalog_path):
+        snapshot = open_current_snapshot(catalog_path + SNAPSHOT_SUFFIX, catalog_path)
+        if snapshot:
+            snapshot.close()
+        else:
+            open_catalog(catalog_path)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_start_query_worker, initargs=(catalog_path, use_snapshot, limit)) as pool:
+        while True:
+            block = list(islice(queries, workers * BATCH_QUERY_CHUNK * 4))
+            if not block:
+                break
+            yield from pool.map(_answer_in_worker, block, chunksize=BATCH_QUERY_CHUNK)
+
+# Write batch answers as JSON Lines (one object per query) or CSV (one row per course found,
+# or a single empty row for a query with no match). Returns the number of queries written.
+def write_batch_answers(answers, output, output_format="json"):
+    count = 0
+    if output_format == "csv":
+        writer = csv.writer(output)
+        writer.writerow(["query", "match", "course_id", "course_name", "prerequisites"])
+        for answer in answers:
+            count += 1
+            if not answer["courses"]:
+                writer.writerow([answer["query"], answer["match"], "", "", ""])
+            for course in answer["courses"]:
+                writer.writerow([answer["query"], answer["match"], course["course_id"], course["course_name"], ";".join(course["prerequisites"])])
+    else:
+        for answer in answers:
+            count += 1
+            output.write(json.dumps(answer) + "\n")
+    return count
+
+# Non-interactive mode: answer every query in args.batch and write the results
+def run_batch(args):
+    try:
+        queries = sys.stdin if args.batch == "-" else open(args.batch, encoding="utf-8")
+        output = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8", newline="")
+    except OSError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    try:
+        answers = batch_answers(args.catalog, queries, args.workers, args.limit, not args.no_snapshot)
+        count = write_batch_answers(answers, output, args.format)
+    except FileNotFoundError:
+        print(f"Error: catalog {args.catalog} not found.", file=sys.stderr)
+        return 1
+    finally:
+        if queries is not sys.stdin:
+            queries.close()
+        if output is not sys.stdout:
+            output.close()
+    print(f"Answered {count} queries.", file=sys.stderr)
+    return 0
+
+# Read degree-planning requests, one JSON object per line:
+#   {"student": "s1", "targets": ["CSCI400"], "completed": ["CSCI100"]}
+# "student" defaults to the line number and "completed" to none. Returns (student, targets,
+# completed) tuples; a malformed line raises ValueError naming the line.
+def read_plan_requests(lines):
+    students = []
+    for number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+            targets = [str(course_id).strip().upper() for course_id in record["targets"]]
+            completed = [str(course_id).strip().upper() for course_id in record.get("completed", [])]
+        except (ValueError, KeyError, TypeError, AttributeError) as e:
+            raise ValueError(f"line {number}: expected {{\"targets\": [...], \"completed\": [...]}} ({e})") from None
+        students.append((record.get("student", number), targets, completed))
+    return students
+
+# Non-interactive mode: plan a degree for every student in args.plan_batch and write one
+# JSON object per student. Large files are planned on args.workers processes (plan_degrees).
+def run_plan_batch(args):
+    try:
+        requests = sys.stdin if args.plan_batch == "-" else open(args.plan_batch, encoding="utf-8")
+        try:
+            students = read_plan_requests(requests)
+        finally:
+            if requests is not sys.stdin:
+                requests.close()
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    try:
+        bst = open_catalog(args.catalog, not args.no_snapshot)
+    except FileNotFoundError:
+        print(f"Error: catalog {args.catalog} not found.", file=sys.stderr)
+        return 1
+    bst.wait_until_loaded()
+    planner = bst.degree_planner(max(1, args.per_term))
+    plans = plan_degrees(planner, [(targets, completed) for _, targets, completed in students], args.workers)
+    try:
+        output = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    except OSError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    try:
+        for (student, _, _), plan in zip(students, plans):
+            output.write(json.dumps({"student": student, **plan}) + "\n")
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    print(f"Planned {len(plans)} students.", file=sys.stderr)
+    return 0
+
+HTTP_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 500: "Internal Server Error"}
+
+# Service mode: one catalog held in memory and answered over HTTP/JSON on a single asyncio
+# event loop, so any number of clients share one copy and no request ever waits on a lock.
+# Every handler is a short synchronous read of the current catalog. A reload builds a new
+# catalog in a worker thread and then swaps it in with one assignment: requests keep being
+# answered from the old catalog until the swap, and the next request sees the new one.
+#
+#   GET  /health                              catalog size and reload count
+#   GET  /courses/<id>                        one course
+#   GET  /courses/<id>/prerequisites          every prerequisite of a course, in study order
+#   GET  /courses/<id>/dependents             courses that need a course, directly and downstream
+#   GET  /impact?remove=<id>,<id>             what removing several courses would block
+#   GET  /courses?sort=prerequisites          courses by prerequisite count (&order=least,
+#                                             &limit=N); pass a page's "next" value back as
+#                                             &after= for the following page (&offset=N
+#                                             still works but skips rows one by one)
+#   GET  /search?q=<keyword>                  keyword search, fuzzy matches when nothing is
+#                                             found (&limit=N); at least 3 characters
+#   POST /reload                              re-read the catalog without stopping the service
+class CatalogService:
+    def __init__(self, catalog_path, use_snapshot=True):
+        self.catalog_path = catalog_path
+        self.use_snapshot = use_snapshot
+        self.catalog = None
+        self.reloads = 0
+        self._reload_lock = None  # Created on the service's event loop
+        self._ready = None  # Finishes once the current catalog is loaded and compiled
+
+    def _open(self):
+        return open_catalog(self.catalog_path, self.use_snapshot)
+
+    # Wait for the catalog to finish loading and compile everything the endpoints use, so no
+    # request pays for it
+    @staticmethod
+    def _compile(catalog):
+        catalog.wait_until_loaded()
+        catalog.prerequisite_graph()
+        catalog.fuzzy_search("")
+
+    # Compile a catalog on a worker thread, then move it out of the garbage collector's reach
+    # (gc.freeze). Its objects live until the next reload; otherwise every full collection
+    # triggered by request garbage walks the whole catalog and shows up as tail latency.
+    # A catalog has no reference cycles, so a replaced one is freed by reference counting
+    # as soon as the last request using it finishes, without a collection pause. Garbage is
+    # collected first so cycles left by earlier requests are freed rather than frozen for good.
+    async def _prepare(self, catalog):
+        await asyncio.get_running_loop().run_in_executor(None, self._compile, catalog)
+        gc.collect()
+        gc.freeze()
+
+    # Concurrent reload requests share one load instead of starting several. A reloaded
+    # catalog is only swapped in once it is fully compiled.
+    async def reload(self):
+        if self._reload_lock.locked():
+            async with self._reload_lock:
+                return self.catalog
+        async with self._reload_lock:
+            catalog = await asyncio.get_running_loop().run_in_executor(None, self._open)
+            ready = asyncio.ensure_future(self._prepare(catalog))
+            await ready
+            self.catalog, self._ready = catalog, ready
+            self.reloads += 1
+        return self.catalog
+
+    # Start listening as soon as the catalog is open. With a current snapshot that is only a
+    # file mapping: course lookups are answered from it straight away, and other requests
+    # wait for the background load and compile (self._ready).
+    async def start(self, host=SERVICE_HOST, port=SERVICE_PORT):
+        self._reload_lock = asyncio.Lock()
+        self.catalog = await asyncio.get_running_loop().run_in_executor(None, self._open)
+        self._ready = asyncio.ensure_future(self._prepare(self.catalog))
+        return await asyncio.start_server(self.handle_connection, host, port)
+
+    # HTTP/1.1 with keep-alive, one request at a time per connection
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                length = int(headers.get("content-length") or 0)
+                if length:
+                    await reader.readexactly(length)  # No endpoint takes a body
+                parts = request_line.decode("latin-1").split()
+                if len(parts) == 3:
+                    method, target, version = parts
+                    status, body = await self.respond(method, target)
+                    keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                else:
+                    status, body, keep_alive = 400, {"error": "malformed request"}, False
+                payload = json.dumps(body).encode("utf-8")
+                writer.write(f"HTTP/1.1 {status} {HTTP_REASONS[status]}\r\n"
+                             f"Content-Type: application/json\r\nContent-Length: {len(payload)}\r\n"
+                             f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1") + payload)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass  # Client went away or sent something unusable
+        finally:
+            writer.close()
+
+    async def respond(self, method, target):
+        start = time.perf_counter()
+        url = urlsplit(target)
+        query = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        parts = [unquote(part) for part in url.path.strip("/").split("/")]
+        catalog, ready = self.catalog, self._ready  # Same catalog for the whole request, even if a reload lands
+        try:
+            if not (len(parts) == 2 and parts[0] == "courses" or ready.done()):
+                await ready  # Only course lookups are answered before the catalog is compiled
+            if parts == ["reload"]:
+                if method != "POST":
+                    return 405, {"error": "use POST /reload"}
+                catalog = await self.reload()
+                return 200, {"status": "reloaded", "courses": catalog.prerequisite_graph().catalog_size, "reloads": self.reloads}
+            if method != "GET":
+                return 405, {"error": f"{method} is not supported"}
+            if parts == ["health"]:
+                return 200, {"status": "ok", "courses": catalog.prerequisite_graph().catalog_size, "reloads": self.reloads}
+            if parts == ["search"]:
+                keyword = query.get("q", "")
+                if len(keyword.strip()) < SERVICE_MIN_QUERY:
+                    return 400, {"error": f"q must be at least {SERVICE_MIN_QUERY} characters"}
+                return 200, answer_query(catalog, keyword, page_limit(query))
+            if parts == ["courses"]:
+                if query.get("sort", "prerequisites") != "prerequisites":
+                    return 400, {"error": "sort must be prerequisites"}
+                offset = max(0, int(query.get("offset", 0)))
+                limit = page_limit(query)
+                after = page_cursor(query["after"]) if "after" in query else None
+                courses = list(islice(catalog.courses_by_prerequisites(query.get("order", "most") != "least", after), offset, offset + limit))
+                next_page = f"{len(courses[-1].prerequisites)}:{courses[-1].course_id}" if courses and len(courses) == limit else None
+                return 200, {"offset": offset, "courses": [course_record(course) for course in courses], "next": next_page}
+            if parts == ["impact"]:
+                course_ids = [course_id.strip().upper() for course_id in query.get("remove", "").split(",") if course_id.strip()]
+                return 200, impact_record(catalog.removal_impact(course_ids))
+            if len(parts) == 3 and parts[0] == "courses" and parts[2] == "dependents":
+                course_id = parts[1].upper()
+                return 200, {"course_id": course_id,
+                             "direct": [course.course_id for course in catalog.dependents(course_id)],
+                             "downstream": [course.course_id for course in catalog.downstream(course_id)]}
+            if len(parts) == 2 and parts[0] == "courses":
+                course = catalog.search(parts[1].upper())
+                if course is None:
+                    return 404, {"error": f"{parts[1]} is not in the catalog"}
+                return 200, course_record(course)
+            if len(parts) == 3 and parts[0] == "courses" and parts[2] == "prerequisites":
+                graph = catalog.prerequisite_graph()
+                course_id = parts[1].upper()
+                if not graph.is_in_catalog(course_id):
+                    return 404, {"error": f"{parts[1]} is not in the catalog"}
+                chain = catalog.all_prerequisites(course_id)
+                return 200, {"course_id": course_id, "prerequisites": chain,
+                             "missing": [prereq for prereq in chain if not graph.is_in_catalog(prereq)]}
+            return 404, {"error": f"no endpoint at {url.path}"}
+        except ValueError:
+            return 400, {"error": "offset and limit must be whole numbers, and after the next value of a page"}
+        except Exception as e:  # Keep serving other clients
+            return 500, {"error": str(e)}
+        finally:
+            if metrics.enabled:
+                metrics.record(f"http {parts[0] or '/'}", start)
+
+# A removal_impact() report with courses as IDs, for JSON
+def impact_record(impact):
+    return {
+        "removed": impact["removed"],
+        "blocked": [course.course_id for course in impact["blocked"]],
+        "by_course": {course_id: {"direct": [course.course_id for course in impact["direct"][course_id]],
+                                  "downstream": [course.course_id for course in impact["downstream"][course_id]]}
+                      for course_id in impact["removed"]},
+    }
+
+# The after query parameter of /courses: "<prerequisite count>:<course ID>" of the last
+# course on the previous page, as given in its "next" value
+def page_cursor(value):
+    count, separator, course_id = value.partition(":")
+    if not separator or not course_id:
+        raise ValueError(f"bad page cursor {value!r}")
+    return int(count), course_id
+
+# The limit query parameter, defaulting to SERVICE_PAGE_SIZE and capped at SERVICE_MAX_PAGE
+def page_limit(query):
+    return max(0, min(int(query.get("limit", SERVICE_PAGE_SIZE)), SERVICE_MAX_PAGE))
+
+async def serve_catalog(args):
+    service = CatalogService(args.catalog, not args.no_snapshot)
+    server = await service.start(args.host, args.port)
+    host, port = server.sockets[0].getsockname()[:2]
+    print(f"Serving {args.catalog} on http://{host}:{port}", file=sys.stderr, flush=True)
+    async with server:
+        await server.serve_forever()
+
+# Service mode: answer HTTP requests until interrupted
+def run_service(args):
+    try:
+        asyncio.run(serve_catalog(args))
+    except FileNotFoundError:
+        print(f"Error: catalog {args.catalog} not found.", file=sys.stderr)
+        return 1
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+def parse_arguments(argv=None):
+    parser = argparse.ArgumentParser(description="Course Planner. Runs the interactive menu unless --batch, --plan-batch or --serve is given.")
+    parser.add_argument("--batch", metavar="QUERIES", help="file of course IDs or keywords, one per line ('-' for stdin), answered without the menu")
+    parser.add_argument("--plan-batch", metavar="STUDENTS", help="JSON Lines file ('-' for stdin) of {\"student\", \"targets\", \"completed\"} to plan degrees for, written as JSON Lines")
+    parser.add_argument("--serve", action="store_true", help="serve the catalog over HTTP/JSON instead of showing the menu")
+    parser.add_argument("--host", default=SERVICE_HOST, help=f"address for --serve to listen on (default: {SERVICE_HOST})")
+    parser.add_argument("--port", type=int, default=SERVICE_PORT, help=f"port for --serve, 0 for any free port (default: {SERVICE_PORT})")
+    parser.add_argument("--catalog", default="courses.csv", help="course CSV, or folder of campus CSVs, to load for batch or service mode (default: courses.csv)")
+    parser.add_argument("--format", choices=("json", "csv"), default="json", help="json writes one JSON object per query per line (default: json)")
+    parser.add_argument("--output", default="-", help="file to write batch results to (default: stdout)")
+    parser.add_argument("--workers", type=int, default=1, help="worker processes for very large query or student files (default: 1)")
+    parser.add_argument("--per-term", type=int, default=COURSES_PER_TERM, help=f"most courses per term for --plan-batch (default: {COURSES_PER_TERM})")
+    parser.add_argument("--limit", type=int, default=None, help="most courses returned per query (default: all)")
+    parser.add_argument("--no-snapshot", action="store_true", help="always parse the CSV instead of using a catalog snapshot")
+    parser.add_argument("--metrics", action="store_true", help="collect timings and counters, printed to stderr at exit")
+    parser.add_argument("--profile", action="store_true", help="profile CPU and memory use, printed to stderr at exit")
+    return parser.parse_args(argv)
+
+# Show the collected metrics and let the user switch metrics or profiling on and off
+def metrics_menu(bst):
+    print("\n Performance Metrics:\n")
+    print(metrics.report())
+    if isinstance(bst, ShardedCatalog):
+        print(f"Shards: {len(bst.sizes)} in {len(bst.groups)} worker(s), largest: {max(bst.sizes.values(), default=0)} courses")
+    elif bst.balanced:
+        print(f"Tree height: {node_height(bst.root)}")
+    print(f"Prerequisite closure cache: {bst.closure_cache.stats()}")
+    print(f"MongoDB lookup cache: {course_lookup_cache.stats()}")
+    print(f"\n e) Turn metrics {'off' if metrics.enabled else 'on'}   r) Reset metrics   "
+          f"p) {'Stop profiling and show the report' if metrics.profiling else 'Start CPU and memory profiling'}")
+    choice = input(" Choose an option, or press Enter to go back: ").strip().lower()
+    if choice == 'e':
+        metrics.enabled = not metrics.enabled
+        print(f"\n Metrics are now {'on' if metrics.enabled else 'off'}.\n")
+    elif choice == 'r':
+        metrics.reset()
+        print("\n Metrics reset.\n")
+    elif choice == 'p' and metrics.profiling:
+        print()
+        print(metrics.stop_profiling())
+        print()
+    elif choice == 'p':
+        metrics.start_profiling()
+        print("\n Profiling started. Choose option 13 again to stop it and see the report.\n")
+
+# A catalog opened from a snapshot is indexed in the background; wait for it, saying why
+def wait_for_catalog(bst):
+    if not bst.loaded:
+        print(" Still indexing the catalog...\n")
+    bst.wait_until_loaded()
+
 # Display the menu
 def display_menu():
     print("\n1. Load Data Structure from CSV.")
@@ -168,10 +3056,35 @@ def display_menu():
     print("5. Interactive Search (BST).")
     print("6. Load Courses from MongoDB.")  # New MongoDB Option
     print("7. Search Course in MongoDB.")   # New MongoDB Option
-    print("9. Exit.\n")
+    print("8. Show Prerequisite Chain (BST).")
+    print("9. Exit.")
+    print("10. Sync BST Courses to MongoDB.")
+    print("11. List Courses by ID Prefix (BST).")
+    print("12. Plan a Degree Term by Term (BST).")
+    print("13. Performance Metrics and Profiling.")
+    print("14. Load Campus Catalogs from a Folder (sharded).")
+    print("15. Show What Courses Unlock / Impact of Removing Them (BST).\n")
 
 # Main function
-def main():
+def main(argv=None):
+    args = parse_arguments(argv)
+    metrics.enabled = args.metrics
+    if args.profile:
+        metrics.start_profiling()
+    try:
+        if args.serve:
+            return run_service(args)
+        if args.plan_batch:
+            return run_plan_batch(args)
+        return run_batch(args) if args.batch else run_menu()
+    finally:
+        if args.metrics:
+            print(metrics.report(), file=sys.stderr)
+        if args.profile:
+            print(metrics.stop_profiling(), file=sys.stderr)
+
+# Interactive menu
+def run_menu():
     # Title Banner
     print("=" * 60)
     print("               WELCOME TO THE COURSE PLANNER")
@@ -183,17 +3096,29 @@ def main():
     print("- View courses sorted by number of prerequisites")
     print("- Perform an interactive search")
     print("- Load courses from MongoDB")
-    print("- Search for a course in MongoDB\n")
+    print("- Search for one or more courses in MongoDB")
+    print("- Upload the loaded courses to MongoDB")
+    print("- View the full prerequisite chain for a course")
+    print("- List the courses whose ID starts with a prefix (e.g. CSCI3)")
+    print("- Plan the remaining courses for a degree, term by term")
+    print("- View performance metrics and profile slow operations")
+    print("- Load every campus catalog in a folder at once, one shard per department")
+    print("- See which courses depend on a course, and what cancelling courses would block\n")
     print("\n")
-    bst = BinarySearchTree()
+    bst = BinarySearchTree(balanced=True)
     while True:
         display_menu()
         choice = input("What would you like to do? ")
         print()
+        if choice not in ('3', '6', '7', '9'):
+            wait_for_catalog(bst)
         if choice == '1':
             file_path = input("Enter the file name: ")
             print()
-            load_courses(file_path, bst)
+            if isinstance(bst, ShardedCatalog):
+                bst.close()
+                bst = BinarySearchTree(balanced=True)
+            load_courses(file_path, bst, progress=print_load_progress, snapshot_path=file_path + SNAPSHOT_SUFFIX)
         elif choice == '2':
             print("\nCourse List (BST):\n")
             bst.print_courses(bst.root)
@@ -214,15 +3139,43 @@ def main():
         elif choice == '6':
             load_courses_from_mongodb()
         elif choice == '7':
-            course_id = input("Enter the Course ID to search in MongoDB: ").strip().upper()
-            search_course_in_mongodb(course_id)
+            course_ids = [course_id.strip() for course_id in input("Enter the Course ID(s) to search in MongoDB (comma-separated): ").upper().split(",") if course_id.strip()]
+            if len(course_ids) == 1:
+                search_course_in_mongodb(course_ids[0])
+            elif course_ids:
+                search_courses_in_mongodb(course_ids)
+        elif choice == '8':
+            course_id = input("Enter course ID to show its prerequisite chain: ").strip().upper()
+            print_prerequisite_chain(bst, course_id)
         elif choice == '9':
             print("\n Exiting program. Goodbye!")
             break
+        elif choice == '10':
+            upload_courses_to_mongodb(bst)
+        elif choice == '11':
+            prefix = input("Enter the start of the course IDs to list (e.g. CSCI3): ").strip().upper()
+            print_courses_with_prefix(bst, prefix)
+        elif choice == '12':
+            targets = [course_id.strip() for course_id in input("Enter the Course ID(s) to plan for (comma-separated): ").upper().split(",") if course_id.strip()]
+            completed = [course_id.strip() for course_id in input("Enter the Course ID(s) already completed (comma-separated, or blank): ").upper().split(",") if course_id.strip()]
+            max_per_term = input(f"Enter the most courses per term (default {COURSES_PER_TERM}): ").strip()
+            print_degree_plan(bst, targets, completed, int(max_per_term) if max_per_term.isdigit() and int(max_per_term) > 0 else COURSES_PER_TERM)
+        elif choice == '13':
+            metrics_menu(bst)
+        elif choice == '14':
+            folder = input("Enter the folder of campus catalog CSVs: ").strip()
+            print()
+            if not isinstance(bst, ShardedCatalog):
+                bst = ShardedCatalog()
+            load_campus_catalogs(folder, bst)
+        elif choice == '15':
+            course_ids = [course_id.strip() for course_id in input("Enter the Course ID(s) to check (comma-separated): ").upper().split(",") if course_id.strip()]
+            if course_ids:
+                print_removal_impact(bst, course_ids)
         else:
             print("\n Invalid choice. Please try again.\n")
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
 
 
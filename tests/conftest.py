@@ -0,0 +1,54 @@
+import csv
+import importlib.util
+import os
+import sys
+
+import pytest
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Both enhancements ship a module called course_planner, so each is imported under its own
+# name. It is also registered in sys.modules so shard worker processes can pickle from it.
+def load_planner(name, folder):
+    if name not in sys.modules:
+        spec = importlib.util.spec_from_file_location(name, os.path.join(REPO_ROOT, folder, "course_planner.py"))
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[name] = module
+        spec.loader.exec_module(module)
+    return sys.modules[name]
+
+@pytest.fixture(scope="session")
+def cli():
+    return load_planner("course_planner_cli", "Enhancement_3")
+
+@pytest.fixture(scope="session")
+def gui():
+    pytest.importorskip("tkinter")
+    return load_planner("course_planner_gui", "Enhanced_Artifact")
+
+# Write (course_id, course_name, prerequisites) rows as a catalog CSV with a header line
+def write_catalog(path, rows):
+    with open(path, "w", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(["course_id", "course_name"])
+        for course_id, course_name, prerequisites in rows:
+            writer.writerow([course_id, course_name, *prerequisites])
+    return str(path)
+
+# (course_id, course_name, prerequisites) rows for a small multi-department catalog,
+# including a missing prerequisite and a cycle that spans two departments
+def sample_rows():
+    rows = []
+    for department in ("CSCI", "MATH", "PHYS", "BIOL"):
+        for number in range(100, 160):
+            prerequisites = [f"{department}{number - 1}"] if number > 100 else []
+            if number % 7 == 0:
+                prerequisites.append(f"MATH{number - 3}")
+            rows.append((f"{department}{number}", f"{department.title()} topic {number}", prerequisites))
+    rows.append(("CSCI900", "Missing prerequisite", ["ZOOL100"]))
+    rows.append(("CSCI901", "Cycle start", ["MATH901"]))
+    rows.append(("MATH901", "Cycle end", ["CSCI901"]))
+    return rows
+
+def course_tuples(courses):
+    return [(course.course_id, course.course_name, list(course.prerequisites)) for course in courses]
@@ -0,0 +1,53 @@
+import pytest
+
+from conftest import sample_rows
+
+mongomock = pytest.importorskip("mongomock")
+pytest.importorskip("pymongo")
+
+PREREQUISITES = [f"MATH{number}" for number in range(100, 112)]  # More than 10
+
+@pytest.fixture
+def collection():
+    return mongomock.MongoClient().catalog.courses
+
+def test_round_trip_with_many_prerequisites(cli, collection):
+    rows = sample_rows() + [("CSCI999", "Capstone", PREREQUISITES)]
+    bst = cli.BinarySearchTree(balanced=True)
+    bst.bulk_load(cli.course_from_tuple(row) for row in rows)
+
+    totals = cli.sync_courses_to_mongodb(bst, collection, batch_size=50)
+    assert totals == {"matched": 0, "upserted": len(rows)}
+
+    found = cli.fetch_courses_from_mongodb(collection, ["CSCI999", "PHYS101", "NOPE100"], batch_size=2)
+    assert set(found) == {"CSCI999", "PHYS101"}
+    assert "_id" not in found["CSCI999"]
+    assert cli.prerequisites_from_document(found["CSCI999"]) == PREREQUISITES
+    assert cli.format_course_document(found["CSCI999"]).endswith(", ".join(PREREQUISITES))
+
+    streamed = sorted((document["course_id"], document["course_name"], cli.prerequisites_from_document(document))
+                      for document in cli.iter_courses_from_mongodb(collection, batch_size=40))
+    assert streamed == sorted(rows)
+
+def test_resync_drops_removed_prerequisites(cli, collection):
+    bst = cli.BinarySearchTree(balanced=True)
+    bst.bulk_load([cli.Course("CSCI999", "Capstone", PREREQUISITES)])
+    cli.sync_courses_to_mongodb(bst, collection)
+
+    bst.update_prerequisites("CSCI999", PREREQUISITES[:2])
+    totals = cli.sync_courses_to_mongodb(bst, collection)
+    assert totals == {"matched": 1, "upserted": 0}
+    document = collection.find_one({"course_id": "CSCI999"})
+    assert cli.prerequisites_from_document(document) == PREREQUISITES[:2]
+
+def test_gui_round_trip_with_many_prerequisites(gui, collection):
+    rows = sample_rows() + [("CSCI999", "Capstone", PREREQUISITES)]
+    bst = gui.BinarySearchTree(balanced=True)
+    bst.bulk_load(rows)
+    gui.sync_courses_to_mongodb(bst, collection, batch_size=50)
+
+    found = gui.fetch_courses_from_mongodb(collection, ["CSCI999"], batch_size=10)
+    assert gui.prerequisites_from_document(found["CSCI999"]) == PREREQUISITES
+    streamed = sorted((document["course_id"], document["course_name"], gui.prerequisites_from_document(document))
+                      for document in gui.iter_courses_from_mongodb(collection))
+    assert streamed == sorted(rows)
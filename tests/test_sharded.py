@@ -0,0 +1,78 @@
+import itertools
+
+import pytest
+
+from conftest import course_tuples, sample_rows, write_catalog
+
+# Split the sample catalog over three campus files. Some IDs repeat across files with a
+# different name; the first file's copy must win, as in a single tree loaded file by file.
+def write_campuses(folder):
+    rows = sample_rows()
+    campuses = [rows[0::3], rows[1::3], rows[2::3]]
+    campuses[2] = campuses[2] + [(rows[0][0], "Second copy", []), (rows[4][0], "Second copy", [])]
+    for number, campus in enumerate(campuses):
+        write_catalog(folder / f"campus{number}.csv", campus)
+    expected = {}
+    for row in itertools.chain.from_iterable(campuses):
+        expected.setdefault(row[0], row)
+    return sorted(expected.values())
+
+def ids(courses):
+    return [course.course_id for course in courses]
+
+@pytest.fixture(params=[1, 2])
+def catalogs(cli, tmp_path, request):
+    expected = write_campuses(tmp_path)
+    sharded = cli.ShardedCatalog.from_folder(str(tmp_path), workers=request.param)
+    single = cli.BinarySearchTree(balanced=True)
+    single.bulk_load(cli.course_from_tuple(row) for row in expected)
+    yield sharded, single, expected
+    sharded.close()
+
+def test_sharded_courses_match_single_tree(catalogs):
+    sharded, single, expected = catalogs
+    assert course_tuples(sharded) == expected
+    assert sharded.search("MATH133").course_name == single.search("MATH133").course_name
+    assert sharded.search("NOPE100") is None
+    assert ids(sharded.prefix("PHYS12")) == ids(single.prefix("PHYS12"))
+    assert ids(sharded.range("CSCI150", "MATH105")) == ids(single.range("CSCI150", "MATH105"))
+
+def test_sharded_queries_match_single_tree(catalogs):
+    sharded, single, _ = catalogs
+    assert ids(sharded.keyword_search("topic 12")) == ids(single.keyword_search("topic 12"))
+    assert ids(sharded.keyword_search("topic", 7)) == ids(single.keyword_search("topic", 7))
+    assert ids(sharded.fuzzy_search("tpoic 140")) == ids(single.fuzzy_search("tpoic 140"))
+    assert ids(sharded.dependents("MATH137")) == ids(single.dependents("MATH137"))
+    assert ids(sharded.downstream("MATH130")) == ids(single.downstream("MATH130"))
+    assert sharded.all_prerequisites("BIOL140") == single.all_prerequisites("BIOL140")
+    for most_first in (False, True):
+        assert ids(sharded.courses_by_prerequisites(most_first)) == ids(single.courses_by_prerequisites(most_first))
+
+def test_sharded_prerequisite_problems_match_single_tree(catalogs):
+    sharded, single, _ = catalogs
+    missing, cycles = sharded.prerequisite_problems()
+    expected_missing, expected_cycles = single.prerequisite_problems()
+    assert {key: sorted(value) for key, value in missing.items()} == {key: sorted(value) for key, value in expected_missing.items()}
+    assert "ZOOL100" in missing
+    assert sorted(map(sorted, cycles)) == sorted(map(sorted, expected_cycles)) == [["CSCI901", "MATH901"]]
+
+def test_sharded_cursor_pages_cover_listing(catalogs):
+    sharded, single, _ = catalogs
+    for most_first in (False, True):
+        listing = ids(single.courses_by_prerequisites(most_first))
+        paged, after = [], None
+        while True:
+            page = list(itertools.islice(sharded.courses_by_prerequisites(most_first, after), 25))
+            if not page:
+                break
+            paged.extend(ids(page))
+            after = (len(page[-1].prerequisites), page[-1].course_id)
+        assert paged == listing
+
+def test_sharded_reload_applies_changes(cli, catalogs, tmp_path):
+    sharded, _, expected = catalogs
+    write_catalog(tmp_path / "campus3.csv", [("ZOOL100", "Zoology", ["BIOL101"])])
+    changes = sharded.load(cli.campus_catalog_files(str(tmp_path)))
+    assert changes["ZOOL"] == (1, 0, 0)
+    assert course_tuples(sharded) == sorted(expected + [("ZOOL100", "Zoology", ["BIOL101"])])
+    assert "ZOOL100" not in sharded.prerequisite_problems()[0]
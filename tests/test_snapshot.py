@@ -0,0 +1,68 @@
+import os
+
+import pytest
+
+from conftest import course_tuples, sample_rows, write_catalog
+
+@pytest.fixture(params=["cli", "gui"])
+def planner(request):
+    return request.getfixturevalue(request.param)
+
+def test_snapshot_round_trip(planner, tmp_path):
+    rows = sample_rows()
+    source = write_catalog(tmp_path / "catalog.csv", rows)
+    snapshot_path = str(tmp_path / "catalog.snap")
+    planner.CatalogSnapshot.write(snapshot_path, rows, source)
+
+    snapshot = planner.open_current_snapshot(snapshot_path, source)
+    assert snapshot is not None
+    try:
+        assert snapshot.course_count == len(rows)
+        assert list(snapshot.rows()) == sorted(rows)
+        assert snapshot.search("PHYS123") == ("PHYS123", "Phys topic 123", ["PHYS122"])
+        assert snapshot.search("AAAA100") is None
+        assert snapshot.search("ZZZZ100") is None
+    finally:
+        snapshot.close()
+
+def test_tree_loads_from_snapshot(cli, tmp_path):
+    rows = sample_rows()
+    source = write_catalog(tmp_path / "catalog.csv", rows)
+    snapshot_path = str(tmp_path / "catalog.snap")
+    cli.CatalogSnapshot.write(snapshot_path, rows, source)
+
+    bst = cli.BinarySearchTree(balanced=True)
+    bst.load_snapshot(cli.open_current_snapshot(snapshot_path, source))
+    assert bst.search("CSCI901").prerequisites == ["MATH901"]  # Answered from the mapped file
+    bst.wait_until_loaded()
+    assert course_tuples(bst) == sorted(rows)
+
+def test_stale_snapshot_is_rejected(planner, tmp_path):
+    rows = sample_rows()
+    source = write_catalog(tmp_path / "catalog.csv", rows)
+    snapshot_path = str(tmp_path / "catalog.snap")
+    planner.CatalogSnapshot.write(snapshot_path, rows, source)
+
+    write_catalog(source, rows[:-1])
+    assert planner.open_current_snapshot(snapshot_path, source) is None
+
+def test_touched_source_keeps_snapshot(planner, tmp_path):
+    rows = sample_rows()
+    source = write_catalog(tmp_path / "catalog.csv", rows)
+    snapshot_path = str(tmp_path / "catalog.snap")
+    planner.CatalogSnapshot.write(snapshot_path, rows, source)
+
+    stat = os.stat(source)
+    os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    snapshot = planner.open_current_snapshot(snapshot_path, source)
+    assert snapshot is not None  # Same content hash
+    snapshot.close()
+
+def test_corrupt_snapshot_is_rejected(planner, tmp_path):
+    source = write_catalog(tmp_path / "catalog.csv", sample_rows())
+    snapshot_path = tmp_path / "catalog.snap"
+    snapshot_path.write_bytes(b"not a snapshot" * 10)
+    with pytest.raises(ValueError):
+        planner.CatalogSnapshot(str(snapshot_path))
+    assert planner.open_current_snapshot(str(snapshot_path), source) is None
+    assert planner.open_current_snapshot(str(tmp_path / "missing.snap"), source) is None
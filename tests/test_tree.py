@@ -0,0 +1,111 @@
+import random
+
+import pytest
+
+from conftest import course_tuples, sample_rows
+
+# Walk the tree checking the BST order, stored heights and AVL balance; returns its IDs in order
+def check_avl(root, course_id=lambda node: node.course.course_id):
+    ids = []
+
+    def visit(node):
+        if node is None:
+            return 0
+        left = visit(node.left)
+        ids.append(course_id(node))
+        right = visit(node.right)
+        assert node.height == 1 + max(left, right)
+        assert abs(left - right) <= 1
+        return node.height
+
+    visit(root)
+    assert ids == sorted(ids)
+    return ids
+
+def shuffled_ids(count, seed):
+    ids = [f"CSCI{number:04d}" for number in range(count)]
+    random.Random(seed).shuffle(ids)
+    return ids
+
+@pytest.mark.parametrize("order", ["sorted", "shuffled"])
+def test_insert_keeps_avl_invariants(cli, order):
+    ids = sorted(shuffled_ids(500, 1)) if order == "sorted" else shuffled_ids(500, 1)
+    bst = cli.BinarySearchTree(balanced=True)
+    for course_id in ids:
+        bst.insert(cli.Course(course_id, f"Course {course_id}", []))
+    assert check_avl(bst.root) == sorted(ids)
+    assert bst.root.height <= 12  # AVL height stays under 1.44 log2(n + 2)
+
+def test_delete_keeps_avl_invariants(cli):
+    ids = shuffled_ids(400, 2)
+    bst = cli.BinarySearchTree(balanced=True)
+    bst.bulk_load(cli.Course(course_id, "Course", []) for course_id in ids)
+    removed = ids[:300]
+    for number, course_id in enumerate(removed, start=1):
+        assert bst._unlink(course_id).course.course_id == course_id
+        if number % 25 == 0:
+            check_avl(bst.root)
+    assert check_avl(bst.root) == sorted(ids[300:])
+    assert bst._unlink("NOPE100") is None
+
+def test_search_and_prefix(cli):
+    bst = cli.BinarySearchTree.from_rows([[course_id, name, *prerequisites] for course_id, name, prerequisites in sample_rows()])
+    assert bst.search("MATH120").course_name == "Math topic 120"
+    assert bst.search("MATH999") is None
+    assert [course.course_id for course in bst.prefix("PHYS15")] == [f"PHYS15{digit}" for digit in range(10)]
+
+def test_gui_insert_and_delete_keep_avl_invariants(gui):
+    ids = shuffled_ids(400, 3)
+    bst = gui.BinarySearchTree(balanced=True)
+    for course_id in ids:
+        bst.insert(course_id, f"Course {course_id}", [])
+    assert check_avl(bst.root, lambda node: node.course_id) == sorted(ids)
+    for course_id in ids[:250]:
+        bst._unlink(course_id)
+    assert check_avl(bst.root, lambda node: node.course_id) == sorted(ids[250:])
+
+def test_reload_applies_diff(cli):
+    rows = sample_rows()
+    bst = cli.BinarySearchTree(balanced=True)
+    bst.bulk_load(cli.course_from_tuple(row) for row in rows)
+
+    edited = [row for row in rows if row[0] != "BIOL130"]
+    edited[0] = (edited[0][0], "Renamed", ["PHYS100"])
+    edited.append(("ZOOL100", "Zoology", ["BIOL101"]))
+    changes = bst.diff(cli.course_from_tuple(row) for row in edited)
+    assert [course.course_id for course in changes.deleted] == ["BIOL130"]
+    assert [course.course_id for course, _, _ in changes.updated] == [edited[0][0]]
+    assert [course.course_id for course in changes.inserted] == ["ZOOL100"]
+    assert bst.search("BIOL130") is not None  # diff() changes nothing
+
+    bst.apply_changes(changes)
+    assert course_tuples(bst) == sorted(edited)
+    check_avl(bst.root)
+    assert [course.course_id for course in bst.keyword_search("zoology")] == ["ZOOL100"]
+    assert "ZOOL100" in [course.course_id for course in bst.dependents("BIOL101")]
+    assert "BIOL130" not in [course.course_id for course in bst.dependents("BIOL129")]
+    assert bst.all_prerequisites("ZOOL100") == ["BIOL100", "BIOL101"]
+
+    again = bst.diff(cli.course_from_tuple(row) for row in edited)
+    assert not (again.inserted or again.updated or again.deleted)
+
+def test_reload_rebuilds_after_large_change(cli):
+    rows = sample_rows()
+    bst = cli.BinarySearchTree(balanced=True)
+    bst.bulk_load(cli.course_from_tuple(row) for row in rows)
+    kept = rows[::3]
+    bst.reload(cli.course_from_tuple(row) for row in kept)
+    assert course_tuples(bst) == sorted(kept)
+    check_avl(bst.root)
+
+def test_gui_reload_applies_diff(gui):
+    rows = sample_rows()
+    bst = gui.BinarySearchTree(balanced=True)
+    bst.bulk_load(rows)
+    edited = [row for row in rows if row[0] not in ("CSCI110", "MATH140")]
+    edited.append(("ZOOL100", "Zoology", []))
+    bst.apply_changes(bst.diff(edited))
+    assert course_tuples(bst.courses_from()) == sorted(edited)
+    check_avl(bst.root, lambda node: node.course_id)
+    again = bst.diff(edited)
+    assert not (again.inserted or again.updated or again.deleted)